@@ -0,0 +1,148 @@
+# core/block_compiler.py
+"""Компиляция линейных участков кода в функции Python.
+
+Блок — команды подряд от адреса входа до первого ветвления, JMP,
+команды, работающей с R7 как с регистром (R7, (R7), -(R7), @-(R7),
+MFPS/MTPS R7), или до останова; не длиннее BLOCK_MAX команд. Для блока
+генерируется одна функция: вызовы обработчиков идут подряд с адресами
+команд и операндами, подставленными константами, без возврата в цикл G
+между командами. Суперкоманды core.fusion входят в блок как одна
+команда — они всегда заканчиваются ветвлением и потому стоят последними.
+
+Функция блока вызывается как обработчик, handler(pc), и, как суперкоманда,
+сама ставит R7 и возвращает extra_words = -1. Запись в память, задевшая
+закешированный код (CPU._code_gen изменился), прерывает блок после
+записавшей команды: остаток исполнится уже по новому коду, его шаги
+и такты возвращаются циклу G. Исключение в команде блока выходит наружу
+как BlockFault с адресом этой команды.
+"""
+from .fusion import MAX_FUSED
+from .timing import cycles as cycles_of
+
+# самый длинный блок, команд (суперкоманда считается по числу своих команд)
+BLOCK_MAX = 16
+assert BLOCK_MAX >= MAX_FUSED
+
+_BRANCHES = frozenset({'op_br', 'op_bne', 'op_beq', 'op_bpl', 'op_bmi', 'op_jmp'})
+_WRITES = frozenset({'op_mov', 'op_movb', 'op_add', 'op_sub',
+                     'op_clr', 'op_com', 'op_inc', 'op_dec', 'op_neg'})
+
+
+class BlockFault(Exception):
+    """Исключение в команде блока: pc и word этой команды, done — сколько
+    команд блока исполнено до неё, cycles — такты блока по эту команду
+    включительно, error — исходное исключение."""
+
+    def __init__(self, error: Exception, pc: int, word: int, done: int, cycles: int):
+        super().__init__(str(error))
+        self.error = error
+        self.pc = pc
+        self.word = word
+        self.done = done
+        self.cycles = cycles
+
+
+def _name(ent) -> str:
+    return getattr(ent[0], '__name__', '')
+
+
+def _ends_block(ent) -> bool:
+    if ent[7] > 1:
+        return True
+    name = _name(ent)
+    if name in _BRANCHES:
+        return True
+    if name in ('op_mfps', 'op_mtps'):
+        return ent[1][0] == 7
+    # R7 как регистр: PC меняется или читается командой
+    return any(op.reg == 7 and op.mode in (0, 1, 4, 5) for op in ent[1] if hasattr(op, 'mode'))
+
+
+def _writes_memory(ent) -> bool:
+    dst = ent[5]
+    return _name(ent) in _WRITES and dst is not None and dst.mode != 0
+
+
+class BlockCompiler:
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        # сколько блоков построено (для статистики и отладки)
+        self.compiled = 0
+
+    def compile(self, pc: int, entry_at):
+        """Запись кеша декодирования для блока с входом pc или None, если
+        блок вышел бы из одной команды. entry_at(addr) — команда или
+        суперкоманда по адресу (None — декодировать нельзя)."""
+        parts = []
+        at = pc
+        total = 0
+        while True:
+            ent = entry_at(at)
+            if ent is None or ent[0] is None or total + ent[7] > BLOCK_MAX:
+                break
+            parts.append((at, ent))
+            total += ent[7]
+            if _ends_block(ent):
+                break
+            nxt = at + 2 + 2 * ent[2]
+            if nxt > 0xFFFE:
+                break
+            at = nxt
+        if len(parts) < 2:
+            return None
+        fn = self._generate(parts, total)
+        last_pc, last = parts[-1]
+        words = ((last_pc - pc) >> 1) + last[2] + 1
+        self.compiled += 1
+        return (fn, (), words - 1, parts[0][1][3], None, None,
+                sum(e[6] for _, e in parts), total)
+
+    def _generate(self, parts, total):
+        """Исходный текст функции блока -> функция (через exec)."""
+        env = {'cpu': self.cpu, 'regs': self.cpu.regs, 'BlockFault': BlockFault}
+        body = []
+        where = {}          # номер строки -> (pc, word, done, cycles)
+        done = 0
+        spent = 0           # такты команд до текущей
+        cost = sum(e[6] for _, e in parts)
+        last = len(parts) - 1
+        for i, (at, ent) in enumerate(parts):
+            env[f'h{i}'] = ent[0]
+            names = []
+            for j, a in enumerate(ent[1]):
+                env[f'a{i}_{j}'] = a
+                names.append(f'a{i}_{j}')
+            call = f"h{i}({', '.join([f'{at:#o}'] + names)})"
+            # ошибку у суперкоманды даёт только первая команда
+            fault = (at, ent[3], done, spent + cycles_of(ent[3]))
+            if i < last:
+                where[len(body)] = fault
+                body.append(f"        {call}")
+                done += ent[7]
+                spent += ent[6]
+                if _writes_memory(ent):
+                    # код под записью сброшен — дальше по новому коду
+                    nxt = (at + 2 + 2 * ent[2]) & 0xFFFF
+                    body.append(f"        if cpu._code_gen != gen:")
+                    body.append(f"            regs[7] = {nxt:#o}")
+                    body.append(f"            cpu._fuse_short += {total - done}")
+                    body.append(f"            cpu.cycles -= {cost - spent}")
+                    body.append(f"            return 'BLOCK', -1")
+            else:
+                body.append(f"        regs[7] = {at:#o}")
+                where[len(body)] = fault
+                body.append(f"        _, x = {call}")
+                body.append(f"        if x >= 0 and regs[7] == {at:#o}:")
+                body.append(f"            regs[7] = {at:#o} + 2 + 2 * x & 0xFFFF")
+        head = ["def block(pc):",
+                "    gen = cpu._code_gen",
+                "    try:"]
+        tail = ["    except Exception as e:",
+                "        n = e.__traceback__.tb_lineno",
+                "        raise BlockFault(e, *where[n]) from e",
+                "    return 'BLOCK', -1"]
+        # номера строк в where — от начала тела; в тексте тело идёт после head
+        env['where'] = {n + len(head) + 1: v for n, v in where.items()}
+        exec("\n".join(head + body + tail), env)
+        return env['block']
@@ -0,0 +1,139 @@
+# core/breakpoints.py
+"""Точки останова по PC и точки наблюдения за словами памяти.
+
+Наличие точки проверяется индексом в bytearray-битовой карте, поэтому
+цикл G и пути памяти платят одно обращение к массиву независимо от
+числа точек. Условие (если есть) вычисляется только при попадании.
+
+Условие: <что><оп><восьмеричное>, где
+  что — R0..R7, RS (PSW), V (значение чтения/записи, только для WP)
+        или @адрес (слово памяти);
+  оп  — = == != < > <= >= или & (истина, если (что & число) != 0).
+Примеры: R3=0, RS&4, V>177, @2000!=0.
+"""
+import operator
+import re
+
+_OPS = {
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+    '&': lambda a, b: (a & b) != 0,
+}
+# пустые карты, общие для всех Breakpoints без точек (только чтение);
+# своя bytearray создаётся при первой точке — развилке CPU (CPU.fork)
+# без точек карты ничего не стоят
+_NO_PC = bytes(0x10000)
+_NO_WORDS = bytes(0x8000)
+
+_re_cond = re.compile(r'^\s*(R[0-7]|RS|V|@[0-7]+)\s*(==|!=|<=|>=|=|<|>|&)\s*([0-7]+)\s*$', re.IGNORECASE)
+
+
+class Condition:
+    __slots__ = ('text', '_what', '_arg', '_op', '_rhs')
+
+    def __init__(self, text: str, allow_value: bool = True):
+        m = _re_cond.match(text or "")
+        if not m:
+            raise ValueError(f"Неверное условие: {text}")
+        what, op, rhs = m.group(1).upper(), m.group(2), m.group(3)
+        if what == 'V' and not allow_value:
+            raise ValueError("V допустимо только в условии WP")
+        self.text = f"{what}{op}{rhs}"
+        if what.startswith('@'):
+            self._what, self._arg = '@', int(what[1:], 8) & 0xFFFE
+        elif what in ('RS', 'V'):
+            self._what, self._arg = what, None
+        else:
+            self._what, self._arg = 'R', int(what[1])
+        self._op = _OPS[op]
+        self._rhs = int(rhs, 8)
+
+    def check(self, cpu, value: int | None = None) -> bool:
+        what = self._what
+        if what == 'R':
+            lhs = cpu.regs[self._arg]
+        elif what == 'RS':
+            lhs = cpu.get_psw()
+        elif what == 'V':
+            lhs = value
+        else:
+            # без _mem_read_word: не задеваем трассировку и точки чтения
+            lhs = cpu.db.mem.read_word(self._arg)
+        return self._op(lhs, self._rhs)
+
+
+class Breakpoints:
+    # режимы точек наблюдения
+    READ, WRITE = 1, 2
+    _MODES = {'R': READ, 'W': WRITE, 'RW': READ | WRITE, 'WR': READ | WRITE}
+
+    def __init__(self):
+        self.pc = _NO_PC                # адрес -> 1, если там точка останова
+        self.rd = _NO_WORDS             # слово (addr >> 1) -> 1, если наблюдается чтение
+        self.wr = _NO_WORDS             # то же для записи
+        self._bp = {}                   # addr -> Condition | None
+        self._wp = {}                   # addr -> (mode, Condition | None)
+
+    # ---------- PC ----------
+    def set_break(self, addr: int, cond: str | None = None):
+        a = int(addr) & 0xFFFF
+        self._bp[a] = Condition(cond, allow_value=False) if cond else None
+        if self.pc is _NO_PC:
+            self.pc = bytearray(_NO_PC)
+        self.pc[a] = 1
+
+    def clear_break(self, addr: int | None = None):
+        for a in ([int(addr) & 0xFFFF] if addr is not None else list(self._bp)):
+            if a not in self._bp:
+                raise ValueError(f"Нет точки останова {a:06o}")
+            del self._bp[a]
+            self.pc[a] = 0
+
+    def hit_break(self, cpu, addr: int) -> bool:
+        cond = self._bp.get(addr)
+        return cond is None or cond.check(cpu)
+
+    # ---------- Память ----------
+    def set_watch(self, addr: int, mode: str = 'W', cond: str | None = None):
+        a = int(addr) & 0xFFFE
+        try:
+            m = self._MODES[(mode or 'W').upper()]
+        except KeyError:
+            raise ValueError(f"Режим наблюдения R, W или RW: {mode}")
+        self._wp[a] = (m, Condition(cond) if cond else None)
+        if self.rd is _NO_WORDS:
+            self.rd, self.wr = bytearray(_NO_WORDS), bytearray(_NO_WORDS)
+        self.rd[a >> 1] = 1 if m & self.READ else 0
+        self.wr[a >> 1] = 1 if m & self.WRITE else 0
+
+    def clear_watch(self, addr: int | None = None):
+        for a in ([int(addr) & 0xFFFE] if addr is not None else list(self._wp)):
+            if a not in self._wp:
+                raise ValueError(f"Нет точки наблюдения {a:06o}")
+            del self._wp[a]
+            self.rd[a >> 1] = 0
+            self.wr[a >> 1] = 0
+
+    def hit_watch(self, cpu, addr: int, value: int) -> bool:
+        cond = self._wp[addr & 0xFFFE][1]
+        return cond is None or cond.check(cpu, value)
+
+    # ---------- Состояние ----------
+    @property
+    def has_breaks(self) -> bool:
+        return bool(self._bp)
+
+    @property
+    def has_watches(self) -> bool:
+        return bool(self._wp)
+
+    def describe(self) -> list[str]:
+        lines = []
+        for a in sorted(self._bp):
+            cond = self._bp[a]
+            lines.append(f"BP {a:06o}" + (f" IF {cond.text}" if cond else ""))
+        names = {self.READ: 'R', self.WRITE: 'W', self.READ | self.WRITE: 'RW'}
+        for a in sorted(self._wp):
+            m, cond = self._wp[a]
+            lines.append(f"WP {a:06o} {names[m]}" + (f" IF {cond.text}" if cond else ""))
+        return lines
@@ -1,33 +1,52 @@
+from .flags import (
+    cc_clr, cc_mov, cc_movb, cc_tst, cc_com, cc_inc, cc_dec, cc_neg, cc_add, cc_sub,
+)
+
+
 class CommandHandlers:
 
+    # Группы кодов операций: (первое слово, последнее слово, обработчик, разбор полей).
+    # Новая команда — новая строка здесь, а не ещё одна ветка elif.
+    _GROUPS = [
+        # двухоперандные: OSSDD
+        (0o010000, 0o017777, 'op_mov',  '_fields_two'),
+        (0o110000, 0o117777, 'op_movb', '_fields_two_byte'),
+        (0o060000, 0o067777, 'op_add',  '_fields_two'),
+        (0o160000, 0o167777, 'op_sub',  '_fields_two'),
+        # однооперандные: слово (0...) и байт (1...)
+        (0o005000, 0o005077, 'op_clr',  '_fields_one'),
+        (0o105000, 0o105077, 'op_clr',  '_fields_one'),
+        (0o005100, 0o005177, 'op_com',  '_fields_one'),
+        (0o105100, 0o105177, 'op_com',  '_fields_one'),
+        (0o005200, 0o005277, 'op_inc',  '_fields_one'),
+        (0o105200, 0o105277, 'op_inc',  '_fields_one'),
+        (0o005300, 0o005377, 'op_dec',  '_fields_one'),
+        (0o105300, 0o105377, 'op_dec',  '_fields_one'),
+        (0o005400, 0o005477, 'op_neg',  '_fields_one'),
+        (0o105400, 0o105477, 'op_neg',  '_fields_one'),
+        (0o005700, 0o005777, 'op_tst',  '_fields_one'),
+        (0o105700, 0o105777, 'op_tst',  '_fields_one'),
+        (0o006700, 0o006777, 'op_mfps', '_fields_reg'),
+        (0o106700, 0o106777, 'op_mfps', '_fields_reg'),
+        (0o006400, 0o006477, 'op_mtps', '_fields_reg'),
+        (0o106400, 0o106477, 'op_mtps', '_fields_reg'),
+        # ветвления
+        (0o000400, 0o000777, 'op_br',   '_fields_branch'),
+        (0o001000, 0o001377, 'op_bne',  '_fields_branch'),
+        (0o001400, 0o001777, 'op_beq',  '_fields_branch'),
+        (0o100000, 0o100377, 'op_bpl',  '_fields_branch'),
+        (0o100400, 0o100777, 'op_bmi',  '_fields_branch'),
+        (0o000100, 0o000177, 'op_jmp',  '_fields_jmp'),
+    ]
+
+    # Таблица на все 65536 слов: word -> (имя обработчика, операнды, константы, extra_words),
+    # где операнды — кортеж (mode, reg, is_word). Общая для всех CPU,
+    # заполняется лениво целой группой при первом обращении.
+    _table = [None] * 0x10000
+    _table[0] = (None, (), (), 0)   # 000000 — останов
+
     def __init__(self, cpu):
         self.cpu = cpu
-        self._one = {
-            '050': self.op_clr,
-            '051': self.op_com,
-            '052': self.op_inc,
-            '053': self.op_dec,
-            '054': self.op_neg,
-            '057': self.op_tst,
-            '067': self.op_mfps,   
-            '064': self.op_mtps,   
-
-        }
-        self._branch = {
-            0o000400: self.op_br,   # BR offset
-            0o001000: self.op_bne,  # BNE offset
-            0o001400: self.op_beq,  # BEQ offset
-            0o010000: self.op_bpl,  # BPL offset
-            0o010400: self.op_bmi,  # BMI offset
-            0o000100: self.op_jmp,  # JMP <dst>
-        }       
-    
-        self._two = {
-            0o01: self.op_mov,   
-            0o11: self.op_movb,  
-            0o06: self.op_add,
-            0o16: self.op_sub,
-        }
 
     # ---------- Диспетчер ----------
     def execute(self, *, pc: int, raw_word: str):
@@ -38,313 +57,238 @@ class CommandHandlers:
         except Exception:
             return (f"UNKNOWN {raw}", 0)
 
-        opcode_high = (word >> 12) & 0o17
-
-        # --- двухоперандные ---
-        if opcode_high in self._two:
-            src_mode = (word >> 9) & 0o7
-            src_reg  = (word >> 6) & 0o7
-            dst_mode = (word >> 3) & 0o7
-            dst_reg  = word & 0o7
-            handler = self._two[opcode_high]
-            return handler(pc, f"{raw[:2]}", src_mode, src_reg, dst_mode, dst_reg, raw)
-
-        # --- однооперандные ---
-        op3 = raw[1:4]
-        if op3 in self._one:
-            wb_flag = raw[0]
-            mode    = int(raw[4], 8)
-            reg     = int(raw[5], 8)
-            return self._one[op3](pc, wb_flag, mode, reg, raw)
-
-        # --- Ветвления ---
-        opcode8 = (word >> 8) & 0xFF
-        offset  = word & 0xFF
-        if 0o0400 <= word <= 0o0777:
-            return self.op_br(pc, word)
-        elif 0o001000 <= word <= 0o001377:
-            return self.op_bne(pc, word)
-        elif 0o001400 <= word <= 0o001777:
-            return self.op_beq(pc, word)
-        elif 0o100000 <= word <= 0o100377:
-            return self.op_bpl(pc, word)
-        elif 0o100400 <= word <= 0o100777:
-            return self.op_bmi(pc, word)
-        elif 0o0100 <= word <= 0o0177:
-            return self.op_jmp(pc, word)
-
-        return (f"UNKNOWN {raw}", 0)
-
-
-
-
-    # ---------- Декодеры ----------
-    def decode_src(self, is_word: bool, pc: int, mode: int, reg: int):
-        val, wb, extra, ea = self.cpu.resolve_operand(
-            is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=False
-        )
-        return val, wb, extra, ea
+        handler, args, _ = self.decode(word)
+        if handler is None:
+            return (f"UNKNOWN {raw}", 0)
+        return handler(pc, *args)
+
+    def decode(self, word: int):
+        """Разбирает слово команды по таблице диспетчеризации.
+        Возвращает (handler, args, extra_words); handler вызывается как
+        handler(pc, *args), операнды в args — готовые объекты CPU.operand().
+        Для слова 0 (останов) handler = None."""
+        name, specs, consts, extra = self.entry(word & 0xFFFF)
+        if name is None:
+            return None, (), 0
+        operand = self.cpu.operand
+        args = tuple(operand(*spec) for spec in specs) + consts
+        return getattr(self, name), args, extra
+
+    @classmethod
+    def entry(cls, word: int) -> tuple:
+        """Строка таблицы для слова 0..0o177777: (имя обработчика, операнды,
+        константы, extra_words); имя None — останов."""
+        ent = cls._table[word]
+        if ent is None:
+            ent = cls._fill_group(word)
+        return ent
+
+    @classmethod
+    def _fill_group(cls, word: int):
+        table = cls._table
+        for first, last, name, fields in cls._GROUPS:
+            if first <= word <= last:
+                parse = getattr(cls, fields)
+                for w in range(first, last + 1):
+                    table[w] = (name,) + parse(w)
+                return table[word]
+        table[word] = ('op_unknown', (), (f"{word:06o}",), 0)
+        return table[word]
+
+    # ---------- Разбор полей ----------
+    @staticmethod
+    def _operand_words(mode: int, reg: int) -> int:
+        # X(R), @X(R), #imm, @#abs — по одному дополнительному слову
+        if mode >= 6 or (reg == 7 and mode in (2, 3)):
+            return 1
+        return 0
+
+    @classmethod
+    def _fields_two(cls, word: int):
+        src_mode = (word >> 9) & 0o7
+        src_reg  = (word >> 6) & 0o7
+        dst_mode = (word >> 3) & 0o7
+        dst_reg  = word & 0o7
+        extra = cls._operand_words(src_mode, src_reg) + cls._operand_words(dst_mode, dst_reg)
+        return ((src_mode, src_reg, True), (dst_mode, dst_reg, True)), (), extra
+
+    @classmethod
+    def _fields_two_byte(cls, word: int):
+        (src, dst), consts, extra = cls._fields_two(word)
+        return ((src[0], src[1], False), (dst[0], dst[1], False)), consts, extra
+
+    @classmethod
+    def _fields_one(cls, word: int):
+        mode = (word >> 3) & 0o7
+        reg  = word & 0o7
+        is_word = not (word & 0o100000)
+        return ((mode, reg, is_word),), (), cls._operand_words(mode, reg)
+
+    @staticmethod
+    def _fields_reg(word: int):
+        # MFPS/MTPS работают только с регистром
+        return (), (word & 0o7,), 0
+
+    @staticmethod
+    def _fields_branch(word: int):
+        offset = word & 0xFF
+        if offset & 0x80:  # отрицательное
+            offset -= 0x100
+        return (), (offset * 2,), 0
 
-    def decode_dst(self, is_word: bool, pc: int, mode: int, reg: int):
-        val, wb, extra, ea = self.cpu.resolve_operand(
-            is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True
-        )
-        return val, wb, extra, ea
+    @classmethod
+    def _fields_jmp(cls, word: int):
+        mode = (word >> 3) & 0o7
+        reg = word & 0o7
+        return ((mode, reg, True),), (), cls._operand_words(mode, reg)
 
-    # ---------- Флаги ----------
-    def _set_nz(self, value: int, is_word: bool):
-        mask = 0xFFFF if is_word else 0xFF
-        sign_bit = 15 if is_word else 7
-        v = value & mask
-        n = (v >> sign_bit) & 1
-        z = 1 if v == 0 else 0
-        self.cpu._set_flag("N", n)
-        self.cpu._set_flag("Z", z)
+    def op_unknown(self, pc, raw):
+        return (f"UNKNOWN {raw}", 0)
 
     # ---------- CLR / CLRB ----------
-    def op_clr(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        _, wb, extra, _ = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True)
-        wb(0)
-        self.cpu._set_flag("N", 0)
-        self.cpu._set_flag("Z", 1)
-        self.cpu._set_flag("V", 0)
-        self.cpu._set_flag("C", 0)
-        return ("CLR" if is_word else "CLRB"), extra
+    def op_clr(self, pc, dst):
+        dst.write(pc, 0)
+        self.cpu.set_cc(cc_clr, 0)
+        return ("CLR" if dst.is_word else "CLRB"), dst.extra
 
     # ---------- COM / COMB ----------
-    def op_com(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        val, wb, extra, _ = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True)
-        newv = (~val) & (0xFFFF if is_word else 0xFF)
-        wb(newv)
-        self.cpu._set_flag("N", (newv & (0x8000 if is_word else 0x80)) != 0)
-        self.cpu._set_flag("Z", newv == 0)
-        self.cpu._set_flag("V", 0)
-        self.cpu._set_flag("C", 1)
-        return ("COM" if is_word else "COMB"), extra
+    def op_com(self, pc, dst):
+        is_word = dst.is_word
+        newv = (~dst.fetch(pc)) & (0xFFFF if is_word else 0xFF)
+        dst.store(newv)
+        self.cpu.set_cc(cc_com, newv, is_word=is_word)
+        return ("COM" if is_word else "COMB"), dst.extra
 
     # ---------- INC / INCB ----------
-    def op_inc(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        val, wb, extra, ea = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True)
-
-        if is_word:
-            newv = (val + 1) & 0xFFFF
-            wb(newv)
-            self.cpu._set_flag("N", (newv & 0x8000) != 0)
-            self.cpu._set_flag("Z", newv == 0)
-            self.cpu._set_flag("C", newv == 0)
-            self.cpu._set_flag("V", newv == 0x8000)   # overflow при +1 к 0x7FFF
-            return "INC", extra
-        else:
-            newv = (val + 1) & 0xFF
-            if ea is None:
-                full_old = self.cpu.get_register(f"R{reg}")
-                full_new = (full_old & 0xFF00) | newv
-                wb(full_new)
-            else:
-                wb(newv)
-            self.cpu._set_flag("N", (newv & 0x80) != 0)
-            self.cpu._set_flag("Z", newv == 0)
-            self.cpu._set_flag("C", newv == 0)
-            self.cpu._set_flag("V", newv == 0x80)     # overflow при +1 к 0x7F
-            return "INCB", extra
-        
+    def op_inc(self, pc, dst):
+        is_word = dst.is_word
+        # V — overflow при +1 к 0x7FFF / 0x7F
+        newv = (dst.fetch(pc) + 1) & (0xFFFF if is_word else 0xFF)
+        dst.store(newv)
+        self.cpu.set_cc(cc_inc, newv, is_word=is_word)
+        return ("INC" if is_word else "INCB"), dst.extra
+
     # ---------- DEC / DECB ----------
-    def op_dec(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        val, wb, extra, _ = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True)
-        newv = (val - 1) & (0xFFFF if is_word else 0xFF)
-        wb(newv)
-        self.cpu._set_flag("N", (newv & (0x8000 if is_word else 0x80)) != 0)
-        self.cpu._set_flag("Z", newv == 0)
-        self.cpu._set_flag("C", newv == (0xFFFF if is_word else 0xFF))
-        self.cpu._set_flag("V", newv == (0x7FFF if is_word else 0x7F))
-        return ("DEC" if is_word else "DECB"), extra
+    def op_dec(self, pc, dst):
+        is_word = dst.is_word
+        newv = (dst.fetch(pc) - 1) & (0xFFFF if is_word else 0xFF)
+        dst.store(newv)
+        self.cpu.set_cc(cc_dec, newv, is_word=is_word)
+        return ("DEC" if is_word else "DECB"), dst.extra
 
     # ---------- NEG / NEGB ----------
-    def op_neg(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        val, wb, extra, _ = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc, as_dest=True)
-        mask = 0xFFFF if is_word else 0xFF
-        newv = ((~val) + 1) & mask
-        wb(newv)
-        self.cpu._set_flag("N", (newv & (0x8000 if is_word else 0x80)) != 0)
-        self.cpu._set_flag("Z", newv == 0)
-        self.cpu._set_flag("C", val != 0)
-        self.cpu._set_flag("V", val == (0x8000 if is_word else 0x80))
-        return ("NEG" if is_word else "NEGB"), extra
+    def op_neg(self, pc, dst):
+        is_word = dst.is_word
+        val = dst.fetch(pc)
+        newv = ((~val) + 1) & (0xFFFF if is_word else 0xFF)
+        dst.store(newv)
+        self.cpu.set_cc(cc_neg, newv, src=val, is_word=is_word)
+        return ("NEG" if is_word else "NEGB"), dst.extra
 
     # ---------- MOV ----------
-    def op_mov(self, pc, kind2, sm, sr, dm, dr, raw):
-        s_val, _, s_ex, _ = self.decode_src(True, pc, sm, sr)
-        dst_pc = (pc + s_ex * 2) & 0xFFFF
-        _, d_wb, d_ex, _ = self.decode_dst(True, dst_pc, dm, dr)
-        d_wb(s_val & 0xFFFF)
-        self.cpu._set_flag("N", (s_val & 0x8000) != 0)
-        self.cpu._set_flag("Z", s_val == 0)
-        self.cpu._set_flag("V", 0)
-        return "MOV", s_ex + d_ex
+    def op_mov(self, pc, src, dst):
+        s_val = src.read(pc)
+        dst.write((pc + src.extra * 2) & 0xFFFF, s_val)
+        self.cpu.set_cc(cc_mov, s_val)
+        return "MOV", src.extra + dst.extra
 
     # ---------- MOVB ----------
-    def op_movb(self, pc, kind2, sm, sr, dm, dr, raw):
-        # MOVB — копирование байта (8 бит)
-        s_val, _, s_ex, s_ea = self.decode_src(False, pc, sm, sr)
-        dst_pc = (pc + s_ex * 2) & 0xFFFF
-        _, d_wb, d_ex, d_ea = self.decode_dst(False, dst_pc, dm, dr)
-
-        # если это память — читаем и записываем только нужный байт
-        if d_ea is not None:
-            dest_base = int(d_ea) & ~1
-            old_word = self.cpu._mem_read_word(dest_base)
-
-            if (int(d_ea) & 1):
-                # нечётный адрес → старший байт
-                new_word = ((s_val & 0xFF) << 8) | (old_word & 0x00FF)
-            else:
-                # чётный адрес → младший байт
-                new_word = (old_word & 0xFF00) | (s_val & 0xFF)
-
-            self.cpu._mem_write_word(dest_base, new_word)
-        else:
-            # если регистр — записываем только младший байт
-            old_full = self.cpu.get_register(f"R{dr}")
-            new_full = (old_full & 0xFF00) | (s_val & 0xFF)
-            self.cpu.set_register(f"R{dr}", new_full)
-
-        # Флаги
-        self.cpu._set_flag("N", (s_val & 0x80) != 0)
-        self.cpu._set_flag("Z", (s_val & 0xFF) == 0)
-        self.cpu._set_flag("V", 0)
-
-        # PDP-11: флаг C копируется из старшего бита исходного байта
-        self.cpu._set_flag("C", (s_val >> 7) & 1)
-
-        return "MOVB", s_ex + d_ex
-
-    
+    def op_movb(self, pc, src, dst):
+        # MOVB — копирование байта; в регистр пишется только младший байт
+        s_val = src.read(pc)
+        dst.write((pc + src.extra * 2) & 0xFFFF, s_val)
+        # Флаги; C копируется из старшего бита исходного байта
+        self.cpu.set_cc(cc_movb, s_val, is_word=False)
+        return "MOVB", src.extra + dst.extra
+
     # ---------- ADD ----------
-    def op_add(self, pc, kind2, sm, sr, dm, dr, raw):
-        s_val, _, s_ex, _ = self.decode_src(True, pc, sm, sr)
-        dst_pc = (pc + s_ex * 2) & 0xFFFF
-        d_val, d_wb, d_ex, _ = self.decode_dst(True, dst_pc, dm, dr)
-        full = d_val + s_val
-        res = full & 0xFFFF
-        d_wb(res)
-        self.cpu._set_flag("N", (res & 0x8000) != 0)
-        self.cpu._set_flag("Z", res == 0)
-        self.cpu._set_flag("C", full > 0xFFFF)
-        self.cpu._set_flag("V", ((s_val ^ res) & (d_val ^ res) & 0x8000) != 0)
-        return "ADD", s_ex + d_ex
+    def op_add(self, pc, src, dst):
+        s_val = src.read(pc)
+        d_val = dst.fetch((pc + src.extra * 2) & 0xFFFF)
+        res = (d_val + s_val) & 0xFFFF
+        dst.store(res)
+        self.cpu.set_cc(cc_add, res, s_val, d_val)
+        return "ADD", src.extra + dst.extra
 
     # ---------- SUB ----------
-    def op_sub(self, pc, kind2, sm, sr, dm, dr, raw):
-        s_val, _, s_ex, _ = self.decode_src(True, pc, sm, sr)
-        dst_pc = (pc + s_ex * 2) & 0xFFFF
-        d_val, d_wb, d_ex, _ = self.decode_dst(True, dst_pc, dm, dr)
+    def op_sub(self, pc, src, dst):
+        s_val = src.read(pc)
+        d_val = dst.fetch((pc + src.extra * 2) & 0xFFFF)
         res = (d_val - s_val) & 0xFFFF
-        d_wb(res)
-        self.cpu._set_flag("N", (res & 0x8000) != 0)
-        self.cpu._set_flag("Z", res == 0)
-        self.cpu._set_flag("C", d_val < s_val)
-        self.cpu._set_flag("V", ((d_val ^ s_val) & (d_val ^ res) & 0x8000) != 0)
-        return "SUB", s_ex + d_ex
-    
+        dst.store(res)
+        self.cpu.set_cc(cc_sub, res, s_val, d_val)
+        return "SUB", src.extra + dst.extra
+
     # ---------- TST / TSTB ----------
-    def op_tst(self, pc, wb_flag, mode, reg, raw):
-        is_word = (wb_flag == '0')
-        val, _, extra, _ = self.cpu.resolve_operand(is_word=is_word, mode=mode, reg=reg, pc=pc)
-        if is_word:
-            self.cpu._set_flag("N", (val & 0x8000) != 0)
-            self.cpu._set_flag("Z", val == 0)
-        else:
-            self.cpu._set_flag("N", (val & 0x80) != 0)
-            self.cpu._set_flag("Z", (val & 0xFF) == 0)
-        self.cpu._set_flag("V", 0)
-        self.cpu._set_flag("C", 0)
-        return ("TST" if is_word else "TSTB"), extra
+    def op_tst(self, pc, dst):
+        is_word = dst.is_word
+        self.cpu.set_cc(cc_tst, dst.read(pc), is_word=is_word)
+        return ("TST" if is_word else "TSTB"), dst.extra
 
 
     # ---------- MFPS ----------
-    def op_mfps(self, pc, wb_flag, mode, reg, raw):
-        regname = f"R{reg}"
-        psw = self.cpu.db.get_psw() & 0xFF
-        old = self.cpu.get_register(regname)
-        new = (old & 0xFF00) | psw
-        self.cpu.set_register(regname, new)
-        return f"MFPS {regname}", 0
+    def op_mfps(self, pc, reg):
+        regs = self.cpu.regs
+        regs[reg] = (regs[reg] & 0xFF00) | self.cpu.get_psw()
+        return f"MFPS R{reg}", 0
 
     # ---------- MTPS ----------
-    def op_mtps(self, pc, wb_flag, mode, reg, raw):
-        regname = f"R{reg}"
-        reg_val = self.cpu.get_register(regname) & 0xFF
-        self.cpu.db.set_psw(reg_val)
-        return f"MTPS {regname}", 0
+    def op_mtps(self, pc, reg):
+        self.cpu.set_psw(self.cpu.regs[reg] & 0xFF)
+        return f"MTPS R{reg}", 0
 
     # ---------- ВЕТВЛЕНИЯ ----------
+    # Выполненный переход возвращает extra_words = -1: следующую команду
+    # цикл G берёт из R7, даже если это та же самая команда (BR .).
 
-    def _get_psw_flag(self, name):
-        psw = self.cpu.db.get_psw()
-        mask = {"C":1, "V":2, "Z":4, "N":8}[name]
-        return 1 if (psw & mask) else 0
-
-    def _branch_offset(self, pc, word):
-        offset = word & 0xFF
-        if offset & 0x80:  # отрицательное
-            offset -= 0x100
-        return (pc + 2 + offset * 2) & 0xFFFF
-
-    def op_br(self, pc, word):
-        new_pc = self._branch_offset(pc, word)
-        self.cpu.set_register("R7", new_pc)
-        return f"BR {new_pc:06o}", 0
+    def op_br(self, pc, disp):
+        new_pc = (pc + 2 + disp) & 0xFFFF
+        self.cpu._set_pc(new_pc)
+        return f"BR {new_pc:06o}", -1
 
-    def op_bne(self, pc, word):
+    def op_bne(self, pc, disp):
         z = self.cpu._get_flag("Z")
-        if self.cpu.debug:
-            print(f"[BNE] pc={pc:06o} Z={z}")
+        if self.cpu.trace.branch:
+            self.cpu.trace.emit('branch', f"BNE pc={pc:06o} Z={z}")
         if z == 0:
-            new_pc = self._branch_offset(pc, word)
+            new_pc = (pc + 2 + disp) & 0xFFFF
             self.cpu._set_pc(new_pc)
-            return f"BNE {new_pc:06o}", 0
+            return f"BNE {new_pc:06o}", -1
         return "BNE (no branch)", 0
 
-    def op_beq(self, pc, word):
+    def op_beq(self, pc, disp):
         z = self.cpu._get_flag("Z")
-        if self.cpu.debug:
-            print(f"[BEQ] pc={pc:06o} Z={z}")
+        if self.cpu.trace.branch:
+            self.cpu.trace.emit('branch', f"BEQ pc={pc:06o} Z={z}")
         if z == 1:
-            new_pc = self._branch_offset(pc, word)
+            new_pc = (pc + 2 + disp) & 0xFFFF
             self.cpu._set_pc(new_pc)
-            return f"BEQ {new_pc:06o}", 0
+            return f"BEQ {new_pc:06o}", -1
         return "BEQ (no branch)", 0
 
-    def op_bpl(self, pc, word):
+    def op_bpl(self, pc, disp):
         n = self.cpu._get_flag("N")
-        if self.cpu.debug:
-            print(f"[BPL] pc={pc:06o} N={n}")
+        if self.cpu.trace.branch:
+            self.cpu.trace.emit('branch', f"BPL pc={pc:06o} N={n}")
         if n == 0:
-            new_pc = self._branch_offset(pc, word)
+            new_pc = (pc + 2 + disp) & 0xFFFF
             self.cpu._set_pc(new_pc)
-            return f"BPL {new_pc:06o}", 0
+            return f"BPL {new_pc:06o}", -1
         return "BPL (no branch)", 0
 
-    def op_bmi(self, pc, word):
+    def op_bmi(self, pc, disp):
         n = self.cpu._get_flag("N")
-        if self.cpu.debug:
-            print(f"[BMI] pc={pc:06o} N={n}")
+        if self.cpu.trace.branch:
+            self.cpu.trace.emit('branch', f"BMI pc={pc:06o} N={n}")
         if n == 1:
-            new_pc = self._branch_offset(pc, word)
+            new_pc = (pc + 2 + disp) & 0xFFFF
             self.cpu._set_pc(new_pc)
-            return f"BMI {new_pc:06o}", 0
+            return f"BMI {new_pc:06o}", -1
         return "BMI (no branch)", 0
 
-    def op_jmp(self, pc, word):
-        mode = (word >> 3) & 0x7
-        reg = word & 0x7
-        _, _, _, ea = self.cpu.resolve_operand(is_word=True, mode=mode, reg=reg, pc=pc)
+    def op_jmp(self, pc, dst):
+        ea = dst.address(pc)
         if ea is not None:
-            self.cpu.set_register("R7", ea & 0xFFFF)
-            return f"JMP {ea:06o}", 0
+            self.cpu._set_pc(ea)
+            return f"JMP {ea:06o}", -1
         return "JMP (invalid)", 0
@@ -5,15 +5,56 @@ class CommandParser:
 
     _re_mem_write = re.compile(r'^\s*([0-7]+)\s*/\s*([0-7]+)\s*$')
     _re_mem_read  = re.compile(r'^\s*([0-7]+)\s*/\s*$')
+    _re_mem_dump  = re.compile(r'^\s*([0-7]+)\s*,\s*([0-7]+)\s*/\s*$')   # начало,конец /
 
     _re_reg_write = re.compile(r'^\s*[Rr]([0-7])\s*/\s*([0-7]+)\s*$')
     _re_reg_read  = re.compile(r'^\s*[Rr]([0-7])\s*/\s*$')
 
-    _re_exec_at   = re.compile(r'^\s*([0-7]+)\s*[Gg]\s*$')
+    # пределы запуска: N=<команд> T=<секунд>, 0 — без ограничения
+    _LIMITS = r'((?:\s+[NnTt]\s*=\s*[0-9]+(?:\.[0-9]*)?)*)'
+    _re_limit_opt = re.compile(r'([NnTt])\s*=\s*([0-9]+(?:\.[0-9]*)?)')
+
+    _re_exec_at   = re.compile(r'^\s*([0-7]+)\s*[Gg]' + _LIMITS + r'\s*$')
+    _re_continue  = re.compile(r'^\s*(?:C|CONT|CONTINUE)' + _LIMITS + r'\s*$', re.IGNORECASE)
+    _re_limit     = re.compile(r'^\s*LIMIT' + _LIMITS + r'\s*$', re.IGNORECASE)
 
     _re_psw_write = re.compile(r'^\s*[Rr][Ss]\s*/\s*([0-7]+)\s*$')   # RS / <octal>
     _re_psw_read  = re.compile(r'^\s*[Rr][Ss]\s*/\s*$', re.IGNORECASE)  # RS /
 
+    # TRACE [категория|ALL] [ON|OFF|VERBOSE|0-2]
+    _re_trace     = re.compile(r'^\s*TRACE(?:\s+([A-Za-z]+)(?:\s+([A-Za-z0-9]+))?)?\s*$', re.IGNORECASE)
+
+    # HIST [n] | HIST ON|OFF | HIST DEPTH <n> | HIST SAVE <файл>
+    _re_hist      = re.compile(r'^\s*HIST(?:\s+(ON|OFF)|\s+(DEPTH|SAVE)\s+(\S+)|\s+(\d+))?\s*$', re.IGNORECASE)
+
+    # BP [адрес [IF условие]] | BC [адрес] | WP [адрес [R|W|RW] [IF условие]] | WC [адрес]
+    _re_break     = re.compile(r'^\s*(BP|BC|WP|WC)(?:\s+([0-7]+)(?:\s+(RW|WR|R|W))?(?:\s+IF\s+(.+?))?)?\s*$', re.IGNORECASE)
+
+    # PROF [n] | PROF ON|OFF|RESET | PROF SAVE <файл>
+    _re_prof      = re.compile(r'^\s*PROF(?:\s+(ON|OFF|RESET)|\s+(SAVE)\s+(\S+)|\s+(\d+))?\s*$', re.IGNORECASE)
+
+    # SAVE <файл> [Z] | LOAD <файл> — снимок машины (Z — сжать)
+    _re_snapshot  = re.compile(r'^\s*(SAVE|LOAD)\s+(\S+?)(?:\s+(Z))?\s*$', re.IGNORECASE)
+
+    # DIFF — изменения последнего запуска; DIFF <снимок> [<снимок>] — сравнение снимков
+    _re_diff      = re.compile(r'^\s*DIFF((?:\s+\S+){0,2})\s*$', re.IGNORECASE)
+
+    # PROG <файл> — восьмеричный листинг; PROG <файл> <адрес> — двоичный образ
+    _re_program   = re.compile(r'^\s*PROG\s+(\S+?)(?:\s+([0-7]+))?\s*$', re.IGNORECASE)
+
+    # S — один шаг, nS — n шагов (n десятичное)
+    _re_step      = re.compile(r'^\s*([0-9]*)\s*[Ss]\s*$')
+
+    @classmethod
+    def _limits(cls, text: str | None) -> dict:
+        limits = {'steps': None, 'seconds': None}
+        for key, val in cls._re_limit_opt.findall(text or ""):
+            if key.upper() == 'N':
+                limits['steps'] = int(float(val))
+            else:
+                limits['seconds'] = float(val)
+        return limits
+
     def parse(self, raw: str) -> dict:
         s = (raw or "").strip()
 
@@ -23,6 +64,61 @@ class CommandParser:
         if s.upper() in ('QUIT', 'Q'):
             return {'type': 'QUIT'}
 
+        m = self._re_trace.match(s)
+        if m:
+            return {'type': 'TRACE', 'category': m.group(1), 'level': m.group(2) or 'ON'}
+
+        m = self._re_prof.match(s)
+        if m:
+            action = (m.group(1) or m.group(2) or '').upper() or None
+            return {'type': 'PROF', 'action': action, 'arg': m.group(3) or m.group(4)}
+
+        m = self._re_snapshot.match(s)
+        if m:
+            action = m.group(1).upper()
+            if action == 'LOAD' and m.group(3):
+                raise ValueError("Сжатие задаётся только для SAVE")
+            return {'type': 'SNAPSHOT', 'action': action, 'path': m.group(2),
+                    'compress': bool(m.group(3))}
+
+        m = self._re_diff.match(s)
+        if m:
+            return {'type': 'DIFF', 'paths': m.group(1).split()}
+
+        m = self._re_program.match(s)
+        if m:
+            return {'type': 'PROGRAM', 'path': m.group(1), 'addr': m.group(2)}
+
+        m = self._re_step.match(s)
+        if m:
+            return {'type': 'STEP', 'count': int(m.group(1)) if m.group(1) else 1}
+
+        m = self._re_continue.match(s)
+        if m:
+            return {'type': 'CONTINUE', **self._limits(m.group(1))}
+
+        m = self._re_limit.match(s)
+        if m:
+            return {'type': 'LIMIT', **self._limits(m.group(1))}
+
+        m = self._re_break.match(s)
+        if m:
+            cmd = m.group(1).upper()
+            kind = 'BP' if cmd[0] == 'B' else 'WP'
+            if cmd.endswith('C'):
+                action = 'clear'
+            else:
+                action = 'set' if m.group(2) else 'list'
+            if kind == 'BP' and m.group(3):
+                raise ValueError("Режим R/W задаётся только для WP")
+            return {'type': 'BREAK', 'kind': kind, 'action': action, 'addr': m.group(2),
+                    'mode': m.group(3), 'cond': m.group(4)}
+
+        m = self._re_hist.match(s)
+        if m:
+            action = (m.group(1) or m.group(2) or '').upper() or None
+            return {'type': 'HIST', 'action': action, 'arg': m.group(3) or m.group(4)}
+
         # PSW write (RS / val)
         m = self._re_psw_write.match(s)
         if m:
@@ -46,12 +142,16 @@ class CommandParser:
         if m:
             return {'type': 'MEM_READ', 'addr': m.group(1)}
 
+        m = self._re_mem_dump.match(s)
+        if m:
+            return {'type': 'MEM_DUMP', 'start': m.group(1), 'end': m.group(2)}
+
         m = self._re_reg_read.match(s)
         if m:
             return {'type': 'REG_READ', 'reg': f"R{m.group(1)}"}
 
         m = self._re_exec_at.match(s)
         if m:
-            return {'type': 'EXEC_AT', 'addr': m.group(1)}
+            return {'type': 'EXEC_AT', 'addr': m.group(1), **self._limits(m.group(2))}
 
         raise ValueError("Неизвестная команда 2")
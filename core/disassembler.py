@@ -0,0 +1,68 @@
+# core/disassembler.py
+"""Дизассемблер команды по таблице CommandHandlers.entry.
+
+Адреса PC-относительных операндов считаются так же, как их исполняет
+CPU (база — pc + 4 от начала операнда), поэтому текст совпадает
+с тем, что реально произойдёт при исполнении.
+"""
+from .command_handlers import CommandHandlers
+from .trace_buffer import _BYTE_SUFFIX, _COND_BRANCH
+
+
+def _operand(mode: int, reg: int, pc: int, read_word) -> str:
+    """pc — адрес, от которого операнд берёт своё слово (pc + 2)."""
+    r = f"R{reg}"
+    if mode == 0:
+        return r
+    if mode == 1:
+        return f"({r})"
+    if mode == 2:
+        return f"#{read_word((pc + 2) & 0xFFFF):06o}" if reg == 7 else f"({r})+"
+    if mode == 3:
+        return f"@#{read_word((pc + 2) & 0xFFFF):06o}" if reg == 7 else f"@({r})+"
+    if mode == 4:
+        return f"-({r})"
+    if mode == 5:
+        return f"@-({r})"
+    x = read_word((pc + 2) & 0xFFFF)
+    if reg == 7:
+        target = (pc + 4 + x) & 0xFFFF
+        return f"{target:06o}" if mode == 6 else f"@{target:06o}"
+    return f"{x:06o}({r})" if mode == 6 else f"@{x:06o}({r})"
+
+
+def mnemonic(word: int) -> str:
+    """Мнемоника слова команды без операндов (MOV, CLRB, BNE, HALT, ...)."""
+    ent = CommandHandlers.entry(word)
+    name = ent[0]
+    if name is None:
+        return "HALT"
+    if name == 'op_unknown':
+        return "UNKNOWN"
+    if name in _BYTE_SUFFIX and word & 0x8000:
+        return name[3:].upper() + "B"
+    return name[3:].upper()
+
+
+def disassemble(read_word, pc: int) -> tuple[str, int]:
+    """Текст команды по адресу pc и её длина в словах.
+    read_word(addr) -> слово памяти."""
+    word = read_word(pc & 0xFFFE)
+    ent = CommandHandlers.entry(word)
+    name, specs, consts, extra = ent
+    if name is None:
+        return "HALT", 1
+    if name == 'op_unknown':
+        return f"UNKNOWN {word:06o}", 1
+    mnem = mnemonic(word)
+    if name in ('op_mfps', 'op_mtps'):
+        return f"{mnem} R{consts[0]}", 1
+    if name == 'op_br' or name in _COND_BRANCH:
+        return f"{mnem} {(pc + 2 + consts[0]) & 0xFFFF:06o}", 1
+    parts = []
+    at = pc
+    for mode, reg, _ in specs:
+        parts.append(_operand(mode, reg, at, read_word))
+        if CommandHandlers._operand_words(mode, reg):
+            at += 2
+    return f"{mnem} {','.join(parts)}", 1 + extra
@@ -0,0 +1,88 @@
+# core/flags.py
+"""Ленивые признаки N/Z/V/C.
+
+Обработчик команды не пишет PSW, а запоминает в CPU кортеж
+(функция, результат, src, dst, is_word) через CPU.set_cc(). Признаки
+вычисляются одной из функций ниже только тогда, когда PSW реально нужен:
+ветвление, MFPS, RS/, синхронизация с БД.
+
+Каждая функция возвращает новые младшие 4 бита PSW (N Z V C).
+"""
+
+N, Z, V, C = 8, 4, 2, 1
+
+
+def _nz(res, is_word):
+    if is_word:
+        return (N if res & 0x8000 else 0) | (0 if res & 0xFFFF else Z)
+    return (N if res & 0x80 else 0) | (0 if res & 0xFF else Z)
+
+
+def cc_clr(res, src, dst, is_word, psw):
+    return Z
+
+
+def cc_mov(res, src, dst, is_word, psw):
+    # MOV: V=0, C не меняется
+    return _nz(res, is_word) | (psw & C)
+
+
+def cc_movb(res, src, dst, is_word, psw):
+    # MOVB: C копируется из старшего бита байта
+    return _nz(res, False) | (C if res & 0x80 else 0)
+
+
+def cc_tst(res, src, dst, is_word, psw):
+    return _nz(res, is_word)
+
+
+def cc_com(res, src, dst, is_word, psw):
+    return _nz(res, is_word) | C
+
+
+def cc_inc(res, src, dst, is_word, psw):
+    r = res & (0xFFFF if is_word else 0xFF)
+    cc = _nz(r, is_word)
+    if r == 0:
+        cc |= C
+    if r == (0x8000 if is_word else 0x80):
+        cc |= V
+    return cc
+
+
+def cc_dec(res, src, dst, is_word, psw):
+    r = res & (0xFFFF if is_word else 0xFF)
+    cc = _nz(r, is_word)
+    if r == (0xFFFF if is_word else 0xFF):
+        cc |= C
+    if r == (0x7FFF if is_word else 0x7F):
+        cc |= V
+    return cc
+
+
+def cc_neg(res, src, dst, is_word, psw):
+    # src — исходное значение операнда
+    cc = _nz(res, is_word)
+    if src != 0:
+        cc |= C
+    if src == (0x8000 if is_word else 0x80):
+        cc |= V
+    return cc
+
+
+def cc_add(res, src, dst, is_word, psw):
+    cc = _nz(res, True)
+    if dst + src > 0xFFFF:
+        cc |= C
+    if (src ^ res) & (dst ^ res) & 0x8000:
+        cc |= V
+    return cc
+
+
+def cc_sub(res, src, dst, is_word, psw):
+    cc = _nz(res, True)
+    if dst < src:
+        cc |= C
+    if (dst ^ src) & (dst ^ res) & 0x8000:
+        cc |= V
+    return cc
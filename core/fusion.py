@@ -0,0 +1,240 @@
+# core/fusion.py
+"""Слияние частых последовательностей команд в одну (суперкоманды).
+
+Циклы учебных программ почти целиком состоят из нескольких шаблонов:
+  DEC Rn ; BNE                      — счётчик цикла;
+  TST(B) dst ; BEQ | BNE            — проверка и ветвление;
+  MOV (Rs)+,(Rd)+ ; DEC Rn ; BNE    — копирование блока;
+  CLR (Ra)+ ; DEC Rn ; BNE          — заполнение нулями.
+Для каждого шаблона здесь есть обработчик, который выполняет всю
+последовательность за один вызов из цикла G: без повторной диспетчеризации,
+без материализации признаков для ветвления и с адресами переходов,
+посчитанными при декодировании.
+
+Если два последних шаблона — это весь цикл (BNE ведёт на MOV / CLR),
+обработчик исполняет сразу много итераций одной операцией над образом
+памяти (DatabaseManager.copy_words / fill_words), а последнюю — обычным
+путём, так что регистры, PSW и PC получаются те же, что после
+поитерационного исполнения. Массово цикл не исполняется, если область
+записи задевает сам цикл, копирование «вперёд внахлёст» (источник
+перечитал бы уже записанное), адреса нечётные или выходят за конец
+памяти, включена трассировка памяти или до предела шагов слишком мало
+команд (CPU._bulk_room).
+
+Обработчик суперкоманды вызывается как обычный — handler(pc, *args) —
+но сам ставит R7 на следующую команду и возвращает extra_words = -1,
+чтобы цикл G взял R7 как есть (в том числе переход на саму себя).
+Видимое состояние — регистры, память, PSW, PC — совпадает с пошаговым
+исполнением; CPU включает слияние только когда шаги не пишутся в историю
+и нет точек останова, наблюдения, профилировщика и трассировки ветвлений.
+"""
+from .flags import cc_clr, cc_dec, cc_mov, cc_tst
+
+# самая длинная суперкоманда, команд
+MAX_FUSED = 3
+
+
+class FusedHandlers:
+
+    def __init__(self, cpu):
+        self.cpu = cpu
+        self.regs = cpu.regs
+
+    # ---------- Распознавание ----------
+    def fuse(self, pc: int, ent: tuple, entry_at):
+        """Суперкоманда, начинающаяся с команды ent по адресу pc, или None.
+        entry_at(addr) — декодированная команда по адресу (запись кеша CPU)."""
+        word = ent[3]
+        if (word & 0o177770) == 0o005300 and (word & 7) != 7:
+            # DEC Rn ; BNE
+            nxt = (pc + 2) & 0xFFFF
+            br = entry_at(nxt)
+            if _is_branch(br, 0o001000):
+                return self._entry(self.op_dec_bne, (word & 7,) + _targets(nxt, br),
+                                   pc, nxt, (ent, br))
+            return None
+        if (word & 0o077700) == 0o005700 and (word & 0o67) != 0o47:
+            # TST(B) dst ; BEQ | BNE (кроме -(PC) и @-(PC), меняющих сам PC)
+            nxt = (pc + 2 + ent[2] * 2) & 0xFFFF
+            br = entry_at(nxt)
+            if _is_branch(br, 0o001000):
+                handler = self.op_tst_bne
+            elif _is_branch(br, 0o001400):
+                handler = self.op_tst_beq
+            else:
+                return None
+            return self._entry(handler, (ent[5],) + _targets(nxt, br), pc, nxt, (ent, br))
+        if (word & 0o177070) == 0o012020 and (word & 0o700) != 0o700 and (word & 7) != 7:
+            # MOV (Rs)+,(Rd)+ ; DEC Rn ; BNE
+            tail = self._count_down(pc, entry_at)
+            if tail is None:
+                return None
+            dec, br = tail
+            s, d, c = (word >> 6) & 7, word & 7, dec[3] & 7
+            targets = _targets((pc + 4) & 0xFFFF, br)
+            parts = (ent, dec, br)
+            rest = _cycles(parts[1:])
+            if targets[0] == pc and len({s, d, c}) == 3:
+                return self._entry(self.op_copy_loop,
+                                   (ent[4], ent[5], s, d, c) + targets + (_cycles(parts), rest),
+                                   pc, (pc + 4) & 0xFFFF, parts)
+            return self._entry(self.op_copy_dec_bne, (ent[4], ent[5], c) + targets + (rest,),
+                               pc, (pc + 4) & 0xFFFF, parts)
+        if (word & 0o177770) == 0o005020 and (word & 7) != 7:
+            # CLR (Ra)+ ; DEC Rn ; BNE
+            tail = self._count_down(pc, entry_at)
+            if tail is None:
+                return None
+            dec, br = tail
+            a, c = word & 7, dec[3] & 7
+            targets = _targets((pc + 4) & 0xFFFF, br)
+            parts = (ent, dec, br)
+            rest = _cycles(parts[1:])
+            if targets[0] == pc and a != c:
+                return self._entry(self.op_clear_loop, (ent[5], a, c) + targets + (_cycles(parts), rest),
+                                   pc, (pc + 4) & 0xFFFF, parts)
+            return self._entry(self.op_clear_dec_bne, (ent[5], c) + targets + (rest,),
+                               pc, (pc + 4) & 0xFFFF, parts)
+        return None
+
+    @staticmethod
+    def _count_down(pc, entry_at):
+        """(DEC Rn, BNE) сразу за однословной командой по адресу pc или None."""
+        dec = entry_at((pc + 2) & 0xFFFF)
+        if dec is None or (dec[3] & 0o177770) != 0o005300 or (dec[3] & 7) == 7:
+            return None
+        br = entry_at((pc + 4) & 0xFFFF)
+        if not _is_branch(br, 0o001000):
+            return None
+        return dec, br
+
+    @staticmethod
+    def _entry(handler, args, pc, last, parts):
+        # запись кеша декодирования: extra_words покрывает все слова
+        # последовательности, такты складываются, число команд — len(parts)
+        extra = ((last - pc) & 0xFFFF) >> 1
+        return (handler, args, extra, parts[0][3], None, None, _cycles(parts), len(parts))
+
+    # ---------- Обработчики ----------
+    def op_dec_bne(self, pc, reg, target, after):
+        regs = self.regs
+        v = (regs[reg] - 1) & 0xFFFF
+        regs[reg] = v
+        self.cpu.set_cc(cc_dec, v)
+        regs[7] = target if v else after
+        return "DEC+BNE", -1
+
+    def op_tst_bne(self, pc, dst, target, after):
+        val = dst.read(pc)
+        self.cpu.set_cc(cc_tst, val, is_word=dst.is_word)
+        self.regs[7] = target if val else after
+        return "TST+BNE", -1
+
+    def op_tst_beq(self, pc, dst, target, after):
+        val = dst.read(pc)
+        self.cpu.set_cc(cc_tst, val, is_word=dst.is_word)
+        self.regs[7] = after if val else target
+        return "TST+BEQ", -1
+
+    def op_copy_dec_bne(self, pc, src, dst, reg, target, after, rest):
+        regs = self.regs
+        val = src.read(pc)
+        dst.write(pc, val)
+        cpu = self.cpu
+        cpu.set_cc(cc_mov, val)
+        if ((dst.ea - pc - 2) & 0xFFFF) < 4:
+            # MOV переписал DEC/BNE этой же последовательности — дальше
+            # пошагово; цикл G учтёт две неисполненные команды, их такты
+            # (rest) возвращаются
+            cpu._fuse_short += 2
+            cpu.cycles -= rest
+            regs[7] = (pc + 2) & 0xFFFF
+            return "MOV", -1
+        v = (regs[reg] - 1) & 0xFFFF
+        regs[reg] = v
+        cpu.set_cc(cc_dec, v)
+        regs[7] = target if v else after
+        return "MOV+DEC+BNE", -1
+
+    def op_clear_dec_bne(self, pc, dst, reg, target, after, rest):
+        regs = self.regs
+        dst.write(pc, 0)
+        cpu = self.cpu
+        cpu.set_cc(cc_clr, 0)
+        if ((dst.ea - pc - 2) & 0xFFFF) < 4:
+            # см. op_copy_dec_bne
+            cpu._fuse_short += 2
+            cpu.cycles -= rest
+            regs[7] = (pc + 2) & 0xFFFF
+            return "CLR", -1
+        v = (regs[reg] - 1) & 0xFFFF
+        regs[reg] = v
+        cpu.set_cc(cc_dec, v)
+        regs[7] = target if v else after
+        return "CLR+DEC+BNE", -1
+
+    # ---------- Циклы целиком ----------
+    def op_copy_loop(self, pc, src, dst, s, d, c, target, after, cycles, rest):
+        regs = self.regs
+        k = self._bulk_iterations(regs[c])
+        if k:
+            sa, da = regs[s], regs[d]
+            span = 2 * k
+            if self._writable(pc, da, span) and not (sa & 1) and sa + span <= 0x10000 \
+                    and not (sa < da < sa + span):
+                self.cpu.db.copy_words(sa, da, k)
+                regs[s] = (sa + span) & 0xFFFF
+                self._bulk_done(pc, d, c, k, cycles)
+        return self.op_copy_dec_bne(pc, src, dst, c, target, after, rest)
+
+    def op_clear_loop(self, pc, dst, a, c, target, after, cycles, rest):
+        regs = self.regs
+        k = self._bulk_iterations(regs[c])
+        if k and self._writable(pc, regs[a], 2 * k):
+            self.cpu.db.fill_words(regs[a], k, 0)
+            self._bulk_done(pc, a, c, k, cycles)
+        return self.op_clear_dec_bne(pc, dst, c, target, after, rest)
+
+    def _bulk_iterations(self, count: int) -> int:
+        """Сколько итераций (кроме последней) можно исполнить массово; 0 — ни одной."""
+        cpu = self.cpu
+        if cpu.trace.mem:
+            return 0
+        k = min((count or 0x10000) - 1, cpu._bulk_room // 3)
+        return k if k > 1 else 0
+
+    @staticmethod
+    def _writable(pc: int, addr: int, span: int) -> bool:
+        # запись не задевает сам цикл (pc..pc+5) и не уходит за конец памяти
+        return not (addr & 1) and addr + span <= 0x10000 and (addr >= pc + 6 or addr + span <= pc)
+
+    def _bulk_done(self, pc, d, c, k, cycles):
+        """Итог k итераций: указатель приёмника и счётчик, учёт шагов и тактов,
+        сброс кеша декодирования под записанной областью."""
+        regs = self.regs
+        cpu = self.cpu
+        da = regs[d]
+        regs[d] = (da + 2 * k) & 0xFFFF
+        regs[c] = (regs[c] - k) & 0xFFFF
+        cpu._fuse_short -= 3 * k
+        cpu._bulk_room -= 3 * k
+        cpu.cycles += k * cycles
+        refs = cpu._code_refs
+        lo, hi = da >> 1, (da >> 1) + k
+        if refs.count(0, lo, hi) != k:
+            for w in range(lo, hi):
+                if refs[w]:
+                    cpu._invalidate_code_at(w << 1)
+
+
+def _cycles(parts) -> int:
+    return sum(p[6] for p in parts)
+
+
+def _is_branch(ent, base: int) -> bool:
+    return ent is not None and (ent[3] & 0o177400) == base
+
+
+def _targets(at: int, br: tuple) -> tuple[int, int]:
+    """(адрес перехода, адрес следующей команды) для ветвления по адресу at."""
+    return (at + 2 + br[1][0]) & 0xFFFF, (at + 2) & 0xFFFF
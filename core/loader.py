@@ -0,0 +1,91 @@
+# core/loader.py
+"""Загрузка программы целиком: восьмеричный листинг или двоичный образ.
+
+Листинг — текст, в котором на строке может стоять:
+  1000/012701              — адрес/слово, как в консоли;
+  1000: 012701 002000      — адрес, за ним слова подряд;
+  1000:                    — только адрес, слова — на следующих строках;
+  005221 000777            — слова с текущего адреса (после предыдущих).
+Всё после ';' или '#' — комментарий. Числа восьмеричные, адреса чётные.
+
+Двоичный образ — слова little-endian подряд с заданного адреса.
+
+Разбор даёт список участков (адрес, array('H')) — слова, идущие подряд,
+собираются в один участок, и CPU пишет каждый участок в память одним
+присваиванием среза (DatabaseManager.write_range), а не по слову.
+"""
+import sys
+from array import array
+
+_SWAP = sys.byteorder != 'little'
+
+
+def _octal(token: str, what: str, line_no: int) -> int:
+    try:
+        v = int(token, 8)
+    except ValueError:
+        raise ValueError(f"строка {line_no}: {what} {token!r} — не восьмеричное число") from None
+    if v > 0xFFFF:
+        raise ValueError(f"строка {line_no}: {what} {token} больше 177777")
+    return v
+
+
+def parse_listing(text: str) -> list[tuple[int, array]]:
+    """Текст листинга -> участки (адрес, слова)."""
+    runs = []
+    addr = None
+
+    def put(at: int, word: int):
+        if runs and runs[-1][0] + 2 * len(runs[-1][1]) == at:
+            runs[-1][1].append(word)
+        else:
+            runs.append((at, array('H', [word])))
+
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.split(';', 1)[0].split('#', 1)[0].strip()
+        if not line:
+            continue
+        if '/' in line:
+            head, _, value = line.partition('/')
+            addr = _octal(head.strip(), "адрес", line_no)
+            words = [value.strip()]
+        elif ':' in line:
+            head, _, rest = line.partition(':')
+            addr = _octal(head.strip(), "адрес", line_no)
+            words = rest.split()
+        else:
+            words = line.split()
+        if addr is None:
+            raise ValueError(f"строка {line_no}: слова без адреса")
+        if addr & 1:
+            raise ValueError(f"строка {line_no}: нечётный адрес {addr:06o}")
+        for token in words:
+            if addr > 0xFFFE:
+                raise ValueError(f"строка {line_no}: выход за конец памяти")
+            put(addr, _octal(token, "слово", line_no))
+            addr += 2
+    return runs
+
+
+def parse_binary(data: bytes, addr: int) -> list[tuple[int, array]]:
+    """Двоичный образ (слова little-endian) с адреса addr -> участки."""
+    if addr & 1:
+        raise ValueError(f"нечётный адрес {addr:06o}")
+    if len(data) & 1:
+        raise ValueError("длина двоичного образа нечётная")
+    if addr + len(data) > 0x10000:
+        raise ValueError("образ выходит за конец памяти")
+    words = array('H')
+    words.frombytes(data)
+    if _SWAP:
+        words.byteswap()
+    return [(addr, words)] if words else []
+
+
+def read_program(path: str, addr: int | None = None) -> list[tuple[int, array]]:
+    """Файл программы -> участки; addr задан — файл считается двоичным образом."""
+    if addr is not None:
+        with open(path, 'rb') as fh:
+            return parse_binary(fh.read(), addr)
+    with open(path, encoding='utf-8') as fh:
+        return parse_listing(fh.read())
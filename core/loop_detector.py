@@ -0,0 +1,51 @@
+# core/loop_detector.py
+"""Обнаружение зацикливания без продвижения (BR ., пустой цикл и т.п.).
+
+Машина детерминирована: ни ввода, ни прерываний, ни часов. Если полное
+состояние — регистры (с PC), PSW и память — в два разных момента совпало,
+дальше программа будет повторяться вечно, и запуск можно остановить сразу.
+
+Состояние снимается редко — в тех же точках, где цикл G проверяет часы
+(раз в config.TIME_CHECK_EVERY команд), поэтому в самом цикле проверка
+ничего не стоит. Пары моментов для сравнения выбираются по алгоритму
+Брента: опорный снимок обновляется через 1, 2, 4, 8, ... проверок, и цикл
+с любым периодом рано или поздно попадает в сравнение. Память опорного
+снимка — список страниц MemoryImage.freeze() (копируются только страницы,
+записанные после него), сравнивается она только при совпавших регистрах
+и PSW, и только страницы, которые больше не те же объекты.
+"""
+
+
+class LoopDetector:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._ref = None        # регистры + PSW опорного снимка
+        self._ref_mem = None    # память опорного снимка
+        self._probe = 0
+        self._power = 1
+        self.checks = 0         # сколько раз выполнена проверка
+
+    @staticmethod
+    def _state(cpu) -> bytes:
+        return cpu.regs.tobytes() + bytes((cpu.get_psw(),))
+
+    @staticmethod
+    def _same_memory(ref, pages) -> bool:
+        return all(a is b or a == b for a, b in zip(ref, pages))
+
+    def check(self, cpu) -> bool:
+        """True, если состояние CPU совпало с опорным — программа зациклилась."""
+        self.checks += 1
+        state = self._state(cpu)
+        if state == self._ref and self._same_memory(self._ref_mem, cpu.db.mem.pages):
+            return True
+        self._probe += 1
+        if self._probe == self._power:
+            self._ref = state
+            self._ref_mem = cpu.db.mem.freeze()
+            self._probe = 0
+            self._power *= 2
+        return False
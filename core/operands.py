@@ -0,0 +1,243 @@
+# core/operands.py
+"""Объекты-операнды для режимов адресации Сфера-36 (PDP-11 подобные).
+
+Для каждой тройки (режим, регистр, слово/байт) CPU один раз — при первой
+команде с таким операндом (CPU.operand) — создаёт объект класса
+operand_class() и переиспользует его во всех декодированных командах:
+никаких замыканий и кортежей на каждый операнд.
+
+Интерфейс операнда:
+  read(pc)       — значение операнда-источника;
+  fetch(pc)      — чтение приёмника для read-modify-write;
+  store(v)       — запись по адресу, найденному последним fetch();
+  write(pc, v)   — запись в приёмник без предварительного чтения;
+  address(pc)    — исполнительный адрес (None для регистра и #imm);
+  extra          — сколько слов операнд занимает в потоке команд;
+  ea             — адрес последнего обращения (None для регистра),
+                   его читает история исполнения.
+
+Объект хранит ссылку на cpu.regs, поэтому массив регистров CPU
+изменяется только на месте.
+
+Operand — абстрактная база, operand_class() её не возвращает. Операнд
+в памяти задаёт только _address(), остальное берёт у базы; регистровый
+(RegWord, RegByte) переопределяет read/fetch/store/write/address целиком
+и до _address() не доходит.
+"""
+
+
+class Operand:
+    __slots__ = ('cpu', 'regs', 'mode', 'reg', 'is_word', 'step', 'extra', 'ea', '_rd', '_wr')
+
+    def __init__(self, cpu, mode: int, reg: int, is_word: bool):
+        self.cpu = cpu
+        self.regs = cpu.regs
+        self.mode = mode
+        self.reg = reg
+        self.is_word = is_word
+        self.step = 2 if is_word else 1
+        self.extra = 0
+        self.ea = None
+        self._rd = cpu._mem_read_word if is_word else cpu._mem_read_byte
+        self._wr = cpu._mem_write_word if is_word else cpu._mem_write_byte
+
+    # абстрактный: операнд в памяти вычисляет здесь исполнительный адрес
+    # (и двигает регистр для (R)+ / -(R)); база его не реализует
+    def _address(self, pc: int) -> int:
+        raise NotImplementedError(f"{type(self).__name__}._address")
+
+    def read(self, pc: int) -> int:
+        ea = self.ea = self._address(pc)
+        return self._rd(ea)
+
+    def fetch(self, pc: int) -> int:
+        ea = self.ea = self._address(pc)
+        return self._rd(ea)
+
+    def store(self, v: int):
+        self._wr(self.ea, v)
+
+    def write(self, pc: int, v: int):
+        ea = self.ea = self._address(pc)
+        self._wr(ea, v)
+
+    def address(self, pc: int):
+        ea = self.ea = self._address(pc)
+        return ea
+
+
+# ----------------- mode 0: R -----------------
+class RegWord(Operand):
+    __slots__ = ()
+
+    def read(self, pc):
+        return self.regs[self.reg]
+
+    fetch = read
+
+    def store(self, v):
+        self.regs[self.reg] = v & 0xFFFF
+
+    def write(self, pc, v):
+        self.regs[self.reg] = v & 0xFFFF
+
+    def address(self, pc):
+        return None
+
+
+class RegByte(Operand):
+    __slots__ = ()
+
+    def read(self, pc):
+        return self.regs[self.reg] & 0xFF
+
+    fetch = read
+
+    def store(self, v):
+        regs = self.regs
+        regs[self.reg] = (regs[self.reg] & 0xFF00) | (v & 0xFF)
+
+    def write(self, pc, v):
+        self.store(v)
+
+    def address(self, pc):
+        return None
+
+
+# ----------------- mode 1: @R -----------------
+class Deferred(Operand):
+    __slots__ = ()
+
+    def _address(self, pc):
+        return self.regs[self.reg]
+
+
+# ----------------- mode 2: (R)+ -----------------
+class AutoInc(Operand):
+    __slots__ = ()
+
+    def _address(self, pc):
+        regs = self.regs
+        ea = regs[self.reg]
+        regs[self.reg] = (ea + self.step) & 0xFFFF
+        return ea
+
+
+# ----------------- mode 2, R7: #imm -----------------
+class Immediate(Operand):
+    __slots__ = ()
+
+    def __init__(self, cpu, mode, reg, is_word):
+        super().__init__(cpu, mode, reg, is_word)
+        self.extra = 1
+
+    def _address(self, pc):
+        # слово находится в потоке команды по адресу (pc + 2)
+        return (pc + 2) & 0xFFFF
+
+    def read(self, pc):
+        # байтовая команда берёт младший байт слова-операнда
+        ea = self.ea = (pc + 2) & 0xFFFF
+        imm = self.cpu._mem_read_word(ea)
+        return imm if self.is_word else imm & 0xFF
+
+    fetch = read
+
+    def address(self, pc):
+        self.ea = None
+        return None
+
+
+# ----------------- mode 3: @(R)+ -----------------
+class AutoIncDeferred(Operand):
+    __slots__ = ()
+
+    def _address(self, pc):
+        regs = self.regs
+        ptr = regs[self.reg]
+        ea = self.cpu._mem_read_word(ptr)
+        regs[self.reg] = (ptr + 2) & 0xFFFF
+        return ea
+
+
+# ----------------- mode 3, R7: @#abs -----------------
+class Absolute(Operand):
+    __slots__ = ()
+
+    def __init__(self, cpu, mode, reg, is_word):
+        super().__init__(cpu, mode, reg, is_word)
+        self.extra = 1
+
+    def _address(self, pc):
+        return self.cpu._mem_read_word((pc + 2) & 0xFFFF)
+
+
+# ----------------- mode 4: -(R) -----------------
+class AutoDec(Operand):
+    __slots__ = ()
+
+    def _address(self, pc):
+        regs = self.regs
+        ea = regs[self.reg] = (regs[self.reg] - self.step) & 0xFFFF
+        return ea
+
+
+# ----------------- mode 5: @-(R) -----------------
+class AutoDecDeferred(Operand):
+    __slots__ = ()
+
+    def _address(self, pc):
+        regs = self.regs
+        ptr = regs[self.reg] = (regs[self.reg] - 2) & 0xFFFF
+        return self.cpu._mem_read_word(ptr)
+
+
+# ----------------- mode 6: X(R) / PC-rel -----------------
+class Indexed(Operand):
+    __slots__ = ()
+
+    def __init__(self, cpu, mode, reg, is_word):
+        super().__init__(cpu, mode, reg, is_word)
+        self.extra = 1
+
+    def _address(self, pc):
+        cpu = self.cpu
+        disp = cpu._mem_read_word((pc + 2) & 0xFFFF)
+        # база — Rn, для R7 (PC) — pc + 4
+        base = self.regs[self.reg] if self.reg != 7 else (pc + 4) & 0xFFFF
+        ea = (base + disp) & 0xFFFF
+        if cpu.trace.resolve:
+            cpu.trace.emit('resolve', f"M6 pc={pc:06o} reg=R{self.reg} base={base:06o} disp={disp:06o} -> ea={ea:06o}")
+        return ea
+
+
+# ----------------- mode 7: @X(R) / PC-rel deferred -----------------
+class IndexedDeferred(Operand):
+    __slots__ = ()
+
+    def __init__(self, cpu, mode, reg, is_word):
+        super().__init__(cpu, mode, reg, is_word)
+        self.extra = 1
+
+    def _address(self, pc):
+        cpu = self.cpu
+        disp = cpu._mem_read_word((pc + 2) & 0xFFFF)
+        base = self.regs[self.reg] if self.reg != 7 else (pc + 4) & 0xFFFF
+        ptr = (base + disp) & 0xFFFF
+        ea = cpu._mem_read_word(ptr)
+        if cpu.trace.resolve:
+            cpu.trace.emit('resolve', f"M7 pc={pc:06o} reg=R{self.reg} base={base:06o} disp={disp:06o} ptr={ptr:06o} -> ea={ea:06o}")
+        return ea
+
+
+def operand_class(mode: int, reg: int, is_word: bool):
+    """Конкретный класс операнда для режима и регистра (никогда не Operand)."""
+    if mode == 0:
+        return RegWord if is_word else RegByte
+    if reg == 7 and mode == 2:
+        return Immediate
+    if reg == 7 and mode == 3:
+        return Absolute
+    return (None, Deferred, AutoInc, AutoIncDeferred, AutoDec, AutoDecDeferred,
+            Indexed, IndexedDeferred)[mode]
+
@@ -1,17 +1,119 @@
 
-from types import SimpleNamespace
+import asyncio
+import threading
+import time
+from array import array
+from types import MappingProxyType, SimpleNamespace
 from data.database import DatabaseManager
+from utils import config
+from utils.logger import Tracer
 from .command_handlers import CommandHandlers
+from .breakpoints import Breakpoints
 from .command_parser import CommandParser
+from .disassembler import disassemble
+from .profiler import Profiler
+from . import snapshot as snapshots
+from .snapshot import Snapshot
+from .loader import read_program
+from .timing import cycles as cycles_of
+from .flags import cc_mov
+from .fusion import FusedHandlers
+from .loop_detector import LoopDetector
+from .block_compiler import BlockCompiler, BlockFault, BLOCK_MAX
+from .operands import Operand, operand_class
+from .trace_buffer import TraceBuffer, F_JUMP
+
+# общая пустая карта _code_refs: своя заводится при первом декодировании
+_NO_CODE = bytes(0x8000)
+# пустой кеш для цикла G при TRACE fetch: каждая команда идёт через выборку
+_NO_ENTRIES = MappingProxyType({})
 
 class CPU:
 
-    def __init__(self, db_manager=None, db_debug=False, debug=True):
+    def __init__(self, db_manager=None, db_debug=False, debug=False, tracer=None,
+                 history_depth: int = TraceBuffer.DEFAULT_DEPTH):
         self.db = db_manager or DatabaseManager(debug=db_debug)
         self.parser = CommandParser()
         self.op = CommandHandlers(self)
-        self.flags = SimpleNamespace(N=0, Z=0, C=0)
+        # debug — записывать шаги G в self.history (команда HIST ON). По
+        # умолчанию выключено: пока шаги пишутся, суперкоманды и блоки не
+        # работают. Отладочный вывод по категориям включается отдельно
+        # через self.trace (команда TRACE)
         self.debug = debug
+        self.trace = tracer or Tracer()
+        self.history = TraceBuffer(history_depth)
+
+        # пределы запуска G (0 — без ограничения); по умолчанию из utils.config
+        self.max_steps = config.MAX_STEPS
+        self.max_seconds = config.MAX_SECONDS
+        # точки останова / наблюдения; карты rd/wr проверяются прямо в путях памяти
+        # (карты создаются при первой точке, _run_loop берёт их заново)
+        self.breakpoints = Breakpoints()
+        self._watch_rd = self.breakpoints.rd
+        self._watch_wr = self.breakpoints.wr
+        # сработавшая точка наблюдения: (R|W, адрес, значение) — до конца команды
+        self._watch_hit = None
+        # журнал записей {адрес: старое слово} — ведётся, пока не None (шаги S)
+        self._write_log = None
+        # профилировщик (PROF ON); None — выключен и ничего не стоит
+        self.profiler = None
+        # оценка времени на реальной машине (core.timing): такты с начала
+        # последнего G; C продолжает счёт
+        self.cycles = 0
+
+        # чем кончился последний запуск: 'halt', 'steps', 'time', 'break',
+        # 'breakpoint', 'watch', 'loop' или None;
+        # после останова по пределу resume_pc — откуда продолжит команда C
+        self.stop_reason = None
+        self.resume_pc = None
+        # состояние перед последним запуском (G, C, S) и после него — для DIFF:
+        # Snapshot со списком страниц MemoryImage.freeze() вместо байтов
+        # памяти; _run_end = None, пока запуск идёт
+        self._run_base = None
+        self._run_end = None
+        # запрос останова из другого потока (кнопка «Стоп» в UI)
+        self._stop_requested = False
+        # останов программы, чьё полное состояние повторилось (core.loop_detector);
+        # self.detect_loops = False — крутить такую до предела шагов / времени
+        self.loop_detector = LoopDetector()
+        self.detect_loops = config.DETECT_LOOPS
+        # сериализует доступ к состоянию CPU между потоком UI и исполнением
+        self.lock = threading.RLock()
+
+        # регистровый файл и PSW живут в процессоре; в БД — только при sync().
+        # regs меняется только на месте: на него ссылаются объекты-операнды
+        self.regs = array('H', self.db.get_registers())
+        self._psw = self.db.get_psw() & 0xFF
+        # отложенные признаки: (функция из core.flags, res, src, dst, is_word) или None
+        self._cc = None
+
+        # кеш декодированных команд:
+        # addr -> (handler, args, extra_words, word, src_operand, dst_operand, cycles, n),
+        # n — сколько команд исполняет запись (больше 1 у суперкоманд);
+        # _code_refs[addr >> 1] — сколько закешированных команд покрывают слово
+        # (до первой команды в кеше — общая пустая _NO_CODE)
+        self._decoded = {}
+        self._code_refs = _NO_CODE
+        # тот же кеш, но со суперкомандами (core.fusion) там, где они нашлись;
+        # self.fusion = False — исполнять строго по одной команде
+        self._fused = {}
+        self.fused = FusedHandlers(self)
+        self.fusion = config.FUSION
+        # блоки (core.block_compiler) в том же кеше; _block_cover[addr >> 1] —
+        # входы блоков, покрывающих слово; _code_gen растёт при каждом сбросе
+        # кеша записью, по нему блок замечает, что переписал сам себя
+        self.compiler = BlockCompiler(self)
+        self.compile_blocks = config.BLOCKS
+        self._block_cover = {}
+        self._code_gen = 0
+        # сколько команд суперкоманды не исполнили (< 0 — исполнили сверх
+        # записи кеша) и сколько ещё им можно исполнить; см. _run_loop
+        self._fuse_short = 0
+        self._bulk_room = 0
+
+        # операнды по (is_word << 6) | (mode << 3) | reg, каждый создаётся
+        # один раз — при первой команде с ним (см. operand)
+        self._operands = [None] * 128
 
         self._lowpage_base = self.db.MIN_ADDR  # 0o1000
         self.last_read = None  # ('mem', addr) или ('reg', 'R1')
@@ -52,7 +154,7 @@ class CPU:
         elif kind == 'reg':
             _, reg_idx = self.last_read
             next_reg = (int(reg_idx) + 1) % 8
-            val = self.db.get_register_value(next_reg) & 0xFFFF
+            val = self.regs[next_reg]
             self.last_read = ('reg', next_reg)
             return f"{val:06o}"
 
@@ -60,21 +162,61 @@ class CPU:
 
     # ---------- Регистры ----------
     def get_register(self, reg_name: str) -> int:
-        reg_num = int(reg_name[1:])
-        return self.db.get_register_value(reg_num) & 0xFFFF
+        return self.regs[int(reg_name[1:])]
 
     def set_register(self, reg_name: str, value: int):
-        reg_num = int(reg_name[1:])
-        self.db.set_register_value(reg_num, int(value) & 0xFFFF)
+        self.regs[int(reg_name[1:])] = int(value) & 0xFFFF
 
     def _get_pc(self) -> int:
-        return self.get_register("R7")
+        return self.regs[7]
 
     def _set_pc(self, value: int):
-        self.set_register("R7", int(value) & 0xFFFF)
+        self.regs[7] = int(value) & 0xFFFF
+
+    # ---------- PSW ----------
+    def get_psw(self) -> int:
+        if self._cc is not None:
+            self._materialize_cc()
+        return self._psw
+
+    def set_psw(self, value: int):
+        self._cc = None
+        self._psw = int(value) & 0xFF
+        if self.trace.psw:
+            self.trace.emit('psw', f"set psw={self._psw:03o}")
+
+    def set_cc(self, fn, res: int, src: int = 0, dst: int = 0, is_word: bool = True):
+        """Запоминает результат команды; N/Z/V/C посчитаются при чтении PSW."""
+        cc = self._cc
+        # все функции перезаписывают N/Z/V; C сохраняет только MOV —
+        # ему нужен настоящий C от предыдущей команды
+        if fn is cc_mov and cc is not None and cc[0] is not cc_mov:
+            self._materialize_cc()
+        self._cc = (fn, res, src, dst, is_word)
+
+    def _materialize_cc(self):
+        fn, res, src, dst, is_word = self._cc
+        self._cc = None
+        psw = self._psw
+        self._psw = (psw & ~0o17) | fn(res, src, dst, is_word, psw)
+
+    @property
+    def flags(self) -> SimpleNamespace:
+        psw = self.get_psw()
+        return SimpleNamespace(
+            N=1 if (psw & 8) else 0,
+            Z=1 if (psw & 4) else 0,
+            V=1 if (psw & 2) else 0,
+            C=1 if (psw & 1) else 0,
+            T=1 if (psw & 16) else 0,
+        )
 
         # ---------- Консольные команды ----------
     def execute(self, raw_command: str):
+        with self.lock:
+            return self._execute(raw_command)
+
+    def _execute(self, raw_command: str):
         try:
             if raw_command is not None and raw_command.strip() == "":
                 return self._line_feed()
@@ -116,6 +258,16 @@ class CPU:
                     self.last_read = ('mem', addr, 'byte')
                     return f"{addr:06o}/ {v:03o}"
 
+            # ---------- дамп диапазона памяти ----------
+            if parsed['type'] == 'MEM_DUMP':
+                start, end = int(parsed['start'], 8), int(parsed['end'], 8)
+                try:
+                    self._check_bus(start)
+                    self._check_bus(end)
+                except RuntimeError:
+                    return "BUS ERROR"
+                return "\n".join(self.dump_memory(start, end))
+
             # ---------- запись памяти ----------
             if parsed['type'] == 'MEM_WRITE':
                 addr = int(parsed['addr'], 8)
@@ -147,24 +299,71 @@ class CPU:
                     self._check_bus(addr)
                 except RuntimeError:
                     return "BUS ERROR"
-                self._set_pc(addr)
-                self.last_read = None
-                self._run_program()
+                self.run_at(addr, parsed['steps'], parsed['seconds'])
+                r7_val = self.get_register("R7")
+                return f"{addr:06o}G {r7_val:06o}" + self.timing_note() + self.stop_note()
+
+            # ---------- продолжение после останова по пределу ----------
+            if parsed['type'] == 'CONTINUE':
+                self.resume(parsed['steps'], parsed['seconds'])
                 r7_val = self.get_register("R7")
-                return f"{addr:06o}G {r7_val:06o}"
+                return f"C {r7_val:06o}" + self.timing_note() + self.stop_note()
+
+            # ---------- пределы запуска ----------
+            if parsed['type'] == 'LIMIT':
+                if parsed['steps'] is not None:
+                    self.max_steps = parsed['steps']
+                if parsed['seconds'] is not None:
+                    self.max_seconds = parsed['seconds']
+                return f"LIMIT N={self.max_steps} T={self.max_seconds:g}"
 
             # ---------- чтение PSW ----------
             if parsed['type'] == 'PSW_READ':
-                psw = self.db.get_psw()
+                psw = self.get_psw()
                 return f"RS/ {psw:03o}"
 
             # ---------- запись PSW ----------
             if parsed['type'] == 'PSW_WRITE':
-                old_val = self.db.get_psw()
+                old_val = self.get_psw()
                 new_val = int(parsed['value'], 8)
-                self.db.set_psw(new_val)
+                self.set_psw(new_val)
                 return f"RS/{old_val:03o} {new_val:03o}"
 
+            # ---------- трассировка ----------
+            if parsed['type'] == 'TRACE':
+                if parsed['category']:
+                    self.trace.set_level(parsed['category'], parsed['level'])
+                return f"TRACE {self.trace.describe()}"
+
+            # ---------- история исполнения ----------
+            if parsed['type'] == 'HIST':
+                return self._history_command(parsed['action'], parsed['arg'])
+
+            # ---------- пошаговое исполнение ----------
+            if parsed['type'] == 'STEP':
+                return self.step(parsed['count'])
+
+            # ---------- профилировщик ----------
+            if parsed['type'] == 'PROF':
+                return self._profile_command(parsed['action'], parsed['arg'])
+
+            # ---------- загрузка программы ----------
+            if parsed['type'] == 'PROGRAM':
+                addr = int(parsed['addr'], 8) if parsed['addr'] is not None else None
+                return self._program_command(parsed['path'], addr)
+
+            # ---------- различия состояний ----------
+            if parsed['type'] == 'DIFF':
+                return self._diff_command(parsed['paths'])
+
+            # ---------- снимки машины ----------
+            if parsed['type'] == 'SNAPSHOT':
+                return self._snapshot_command(parsed)
+
+            # ---------- точки останова / наблюдения ----------
+            if parsed['type'] == 'BREAK':
+                return self._break_command(parsed)
+
             if parsed['type'] == 'QUIT':
                 return "QUIT"
 
@@ -178,60 +377,680 @@ class CPU:
 
 
     # ---------- Исполнение программы ----------
-    def _run_program(self):
-        out = []
+    def run_at(self, addr: int, max_steps: int | None = None, max_seconds: float | None = None,
+               progress=None) -> int:
+        """G: исполнение с адреса addr; возвращает номер первой записи
+        истории этого запуска (текст шагов — history.lines(номер))."""
+        with self.lock:
+            self._check_bus(addr)
+            self._set_pc(addr)
+            self.last_read = None
+            self.cycles = 0
+            return self._run_program(max_steps, max_seconds, progress)
+
+    def resume(self, max_steps: int | None = None, max_seconds: float | None = None,
+               progress=None) -> int:
+        """C: продолжение с resume_pc после останова по пределу; возвращает
+        то же, что run_at."""
+        with self.lock:
+            if self.resume_pc is None:
+                raise RuntimeError("нет прерванного запуска")
+            self._set_pc(self.resume_pc)
+            self.last_read = None
+            return self._run_program(max_steps, max_seconds, progress)
+
+    def request_stop(self):
+        """Просит идущий запуск остановиться; безопасно вызывать из другого потока."""
+        self._stop_requested = True
+
+    def _run_program(self, max_steps: int | None = None, max_seconds: float | None = None,
+                     progress=None) -> int:
+        """Исполняет с текущего PC до останова (слово 0), предела или request_stop().
+        max_steps / max_seconds — пределы этого запуска (None — глобальные
+        self.max_steps / self.max_seconds, 0 — без ограничения). progress(steps, pc)
+        вызывается из цикла раз в config.TIME_CHECK_EVERY команд. После
+        останова по пределу PC сохранён в resume_pc, команда C продолжает.
+        Текст шагов не строится: возвращается номер первой записи истории
+        запуска, строки по нему делает тот, кому они нужны (HIST, UI)."""
+        with self.lock:
+            self._stop_requested = False
+            self.loop_detector.reset()
+            self._mark_run_base()
+            start = self.history.count
+            self._run_loop(max_steps, max_seconds, progress)
+            self._run_end = self._freeze_state()
+            # конец G — точка синхронизации образа памяти с БД
+            self.sync()
+            return start
+
+    def _run_loop(self, max_steps, max_seconds, progress=None, record=None):
+        """Сам цикл исполнения; record — писать шаги в историю (None — по self.debug)."""
+        if max_steps is None:
+            max_steps = self.max_steps
+        if max_seconds is None:
+            max_seconds = self.max_seconds
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        check_mask = config.TIME_CHECK_EVERY - 1
+
         pc = self._get_pc()
         self.executing = True
+        self.stop_reason = None
+        self.resume_pc = None
+        self._watch_hit = None
+        points = self.breakpoints
+        bp = points.pc
+        self._watch_rd, self._watch_wr = points.rd, points.wr
+        # без точек проверки в цикле сводятся к двум локальным флагам
+        breaking = points.has_breaks
+        watching = points.has_watches
+
+        decoded = self._decoded
+        history = self.history
+        # шаги пишутся в историю при debug; ошибки — всегда
+        hist = history if (self.debug if record is None else record) else None
+        prof = self.profiler
+        clock = time.perf_counter_ns
+        looping = self.loop_detector if self.detect_loops else None
+        steps = 0
+        cycles = 0
+
+        # суперкоманды — только когда никто не смотрит на отдельные шаги;
+        # за BLOCK_MAX команд до предела шагов цикл переходит на обычный кеш.
+        # Команды, которые суперкоманда исполнила сверх n (циклы целиком)
+        # или не исполнила, копятся в _fuse_short и учитываются раз
+        # в check_mask шагов; _bulk_room — сколько команд можно исполнить
+        # сверх учтённых, не перейдя предел до следующей сверки
+        limit = max_steps or 1 << 62
+        fusing = (self.fusion and hist is None and prof is None and not breaking and not watching
+                  and self._write_log is None
+                  and not (self.trace.fetch or self.trace.branch or self.trace.psw)
+                  and (not max_steps or max_steps >= BLOCK_MAX))
+        if fusing:
+            decoded, decode = self._fused, self._decode_fused
+            if max_steps:
+                limit = max_steps - (BLOCK_MAX - 1)
+        elif self.trace.fetch:
+            # строка fetch на каждую исполненную команду, а не только
+            # на первое декодирование: кеш цикл не видит
+            decoded, decode = _NO_ENTRIES, self._decode_traced
+        else:
+            decode = self._decode_pc
+        self._fuse_short = 0
+        self._bulk_room = limit - check_mask - BLOCK_MAX - 1 if fusing else 0
 
         while True:
-            raw = self._raw_mem_fetch(pc)
-            try:
-                wval = int(raw, 8)
-            except ValueError:
-                out.append(f"{pc:06o}: Ошибка: некорректное слово {raw}")
-                break
+            ent = decoded.get(pc)
+            if ent is None:
+                ent = decode(pc)
+            handler, args, n = ent[0], ent[1], ent[7]
 
-            if wval == 0:
+            if handler is None:
                 self._set_pc((pc + 2) & 0xFFFF)
+                self.stop_reason = 'halt'
                 break
+            cycles += ent[6]
 
             try:
 
-                text, extra_words = self.op.execute(pc=pc, raw_word=raw)
-
-               
-                new_pc = self.get_register("R7")
-                if new_pc != pc:
-                    pc = new_pc
+                if prof is None:
+                    _, extra_words = handler(pc, *args)
                 else:
-                    pc = (pc + 2 + (extra_words * 2)) & 0xFFFF
-
-                if self.debug and text:
-                    out.append(f"{pc:06o}: {text}")
-
+                    t0 = clock()
+                    _, extra_words = handler(pc, *args)
+                    prof.count(pc, ent[3], clock() - t0)
 
-                if len(out) > 2000:
-                    out.append("ОШИБКА: превышено количество шагов")
-                    break
+                new_pc = self.regs[7]
+                if new_pc != pc or extra_words < 0:
+                    jumped = F_JUMP
+                else:
+                    new_pc = (pc + 2 + (extra_words * 2)) & 0xFFFF
+                    jumped = 0
+                if hist is not None:
+                    hist.record(pc, ent[3], ent[4], ent[5], new_pc, self.get_psw(), jumped)
+                pc = new_pc
 
             except Exception as e:
-                out.append(f"{pc:06o}: Ошибка: {e}")
+                word = ent[3]
+                if isinstance(e, BlockFault):
+                    # ошибка посреди блока: команды до неё исполнены,
+                    # такты остальных возвращаются
+                    cycles -= ent[6] - e.cycles
+                    pc, word, n, e = e.pc, e.word, e.done + 1, e.error
+                else:
+                    # у суперкоманды ошибку даёт только первая команда
+                    if n > 1:
+                        cycles -= ent[6] - cycles_of(word)
+                    n = 1
+                history.record_error(pc, word, str(e), self.get_psw())
                 pc = (pc + 2) & 0xFFFF
 
             self._set_pc(pc)
 
-        return "\n".join(out) if out else ""
-
+            steps += n
+            if watching and self._watch_hit is not None:
+                self.stop_reason = 'watch'
+            elif breaking and bp[pc] and points.hit_break(self, pc):
+                # останов перед командой по адресу pc; C продолжит с неё
+                self.stop_reason = 'breakpoint'
+            elif steps >= limit:
+                if fusing:
+                    # последние команды до предела — по одной
+                    fusing = False
+                    decoded, decode = self._decoded, self._decode_pc
+                    steps -= self._fuse_short
+                    self._fuse_short = self._bulk_room = 0
+                    limit = max_steps
+                    if steps < limit:
+                        continue
+                self.stop_reason = 'steps'
+            elif (steps & check_mask) >= n:
+                continue
+            else:
+                if fusing:
+                    steps -= self._fuse_short
+                    self._fuse_short = 0
+                    self._bulk_room = limit - steps - check_mask - BLOCK_MAX - 1
+                if self._stop_requested:
+                    self.stop_reason = 'break'
+                elif looping is not None and looping.check(self):
+                    self.stop_reason = 'loop'
+                elif deadline is not None and time.monotonic() > deadline:
+                    self.stop_reason = 'time'
+                else:
+                    if progress is not None:
+                        progress(steps, pc)
+                    continue
+            self.resume_pc = pc
+            break
+        self.cycles += cycles
+
+    # ---------- Пошаговое исполнение ----------
+    _PSW_BITS = (('T', 16), ('N', 8), ('Z', 4), ('V', 2), ('C', 1))
+
+    def step(self, count: int = 1) -> str:
+        """S / nS: исполняет count команд с текущего PC. Для каждой — строка
+        с текстом команды и только изменившимися регистрами, битами PSW
+        и словами памяти (по журналу записей). Останавливается на HALT,
+        точке останова или наблюдения и по request_stop(); C продолжает
+        с нового PC."""
+        if count < 1:
+            raise ValueError("Число шагов должно быть > 0")
+        lines = []
+        read_word = self.db.mem.read_word
+        with self.lock:
+            self.last_read = None
+            self._stop_requested = False
+            self._mark_run_base()
+            try:
+                for _ in range(count):
+                    pc = self.regs[7]
+                    text = disassemble(read_word, pc)[0]
+                    regs = self.regs.tolist()
+                    psw = self.get_psw()
+                    self._write_log = {}
+                    self._run_loop(1, 0)
+                    lines.append(self._step_line(pc, text, regs, psw, self._write_log))
+                    self._write_log = None
+                    if self.stop_reason != 'steps':
+                        break
+                    if self._stop_requested:
+                        # кнопка «Стоп» во время nS; C продолжит с PC
+                        self.stop_reason = 'break'
+                        break
+            finally:
+                self._write_log = None
+                self._run_end = self._freeze_state()
+                self.sync()
+        if self.stop_reason in ('breakpoint', 'watch', 'break'):
+            lines.append(self.stop_note().lstrip("\n"))
+        return "\n".join(lines)
+
+    def _step_line(self, pc: int, text: str, regs: list, psw: int, writes: dict) -> str:
+        parts = [f"{pc:06o}: {text:<24}"]
+        now = self.regs
+        changed = [f"R{r} {regs[r]:06o}->{now[r]:06o}" for r in range(7) if regs[r] != now[r]]
+        new_psw = self.get_psw()
+        changed += [f"{name} {int(bool(psw & bit))}->{int(bool(new_psw & bit))}"
+                    for name, bit in self._PSW_BITS if (psw ^ new_psw) & bit]
+        read_word = self.db.mem.read_word
+        for addr in sorted(writes):
+            new = read_word(addr)
+            if new != writes[addr]:
+                changed.append(f"{addr:06o} {writes[addr]:06o}->{new:06o}")
+        if changed:
+            parts.append("  " + ", ".join(changed))
+        return "".join(parts).rstrip()
+
+    # ---------- asyncio ----------
+    async def run(self, addr: int | None = None, max_steps: int | None = None,
+                  max_seconds: float | None = None, yield_every: int = 1024) -> str:
+        """Корутина G: исполняет порциями по yield_every команд, между ними
+        отдаёт управление циклу событий. addr=None — продолжить с resume_pc.
+        Пределы — как у G (None — глобальные, 0 — без ограничения).
+        Возвращает stop_reason. Отмена задачи оставляет программу
+        в продолжаемом состоянии (stop_reason 'break')."""
+        async for _ in self._run_slices(addr, max_steps, max_seconds, yield_every, None):
+            pass
+        return self.stop_reason
+
+    async def events(self, addr: int | None = None, max_steps: int | None = None,
+                     max_seconds: float | None = None, yield_every: int = 1024):
+        """Асинхронный итератор событий трассировки: TraceRecord на каждую
+        исполненную команду. Закрытие итератора (aclose(), contextlib.aclosing)
+        прерывает программу так же, как отмена run()."""
+        history = self.history
+        # порция не длиннее истории, иначе записи затрутся до выдачи
+        slices = self._run_slices(addr, max_steps, max_seconds, min(yield_every, history.depth), True)
+        try:
+            async for start in slices:
+                for rec in history.records(start):
+                    yield rec
+        finally:
+            await slices.aclose()
+
+    async def _run_slices(self, addr, max_steps, max_seconds, yield_every, record):
+        """Исполняет порциями; после каждой выдаёт номер первой записи истории порции."""
+        if max_steps is None:
+            max_steps = self.max_steps
+        if max_seconds is None:
+            max_seconds = self.max_seconds
+        yield_every = max(int(yield_every), 1)
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        with self.lock:
+            if addr is None:
+                if self.resume_pc is None:
+                    raise RuntimeError("нет прерванного запуска")
+                addr = self.resume_pc
+            else:
+                self.cycles = 0
+            self._check_bus(addr)
+            self._set_pc(addr)
+            self.last_read = None
+            self._stop_requested = False
+            self.loop_detector.reset()
+            self._mark_run_base()
+
+        done = 0
+        finished = False
+        try:
+            while True:
+                n = yield_every if not max_steps else min(yield_every, max_steps - done)
+                with self.lock:
+                    start = self.history.count
+                    left = deadline - time.monotonic() if deadline is not None else 0
+                    self._run_loop(n, max(left, 1e-9) if deadline is not None else 0, None, record)
+                    reason = self.stop_reason
+                yield start
+                if reason != 'steps':
+                    break
+                done += n
+                if max_steps and done >= max_steps:
+                    break
+                if self._stop_requested:
+                    self.stop_reason = 'break'
+                    break
+                if self.detect_loops and self.loop_detector.check(self):
+                    self.stop_reason = 'loop'
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    self.stop_reason = 'time'
+                    break
+                await asyncio.sleep(0)
+            finished = True
+        finally:
+            if not finished and self.resume_pc is not None:
+                # отмена задачи или выход из async for посреди программы
+                self.stop_reason = 'break'
+            with self.lock:
+                self._run_end = self._freeze_state()
+            self.sync()
+
+    def timing_note(self) -> str:
+        """Оценка времени исполнения на реальной машине (с ведущим
+        переводом строки) или "", если вывод выключен в config."""
+        if not config.SHOW_TIMING:
+            return ""
+        us = self.cycles * 1e6 / config.CPU_CLOCK_HZ
+        t = f"{us:.1f} мкс" if us < 10_000 else f"{us / 1000:.3f} мс"
+        return f"\nВремя: {self.cycles} тактов ≈ {t}"
+
+    def stop_note(self) -> str:
+        """Строка о прерванном запуске (с ведущим переводом строки) или ""."""
+        if self.resume_pc is None:
+            return ""
+        if self.stop_reason == 'loop':
+            return (f"\nОСТАНОВ: программа зациклилась — регистры, PSW и память"
+                    f" повторились, PC={self.resume_pc:06o}")
+        if self.stop_reason == 'break':
+            why = "по запросу"
+        elif self.stop_reason == 'breakpoint':
+            why = "точка останова"
+        elif self.stop_reason == 'watch':
+            kind, addr, value = self._watch_hit
+            why = f"{'чтение' if kind == 'R' else 'запись'} {addr:06o} = {value:06o}"
+        else:
+            why = "превышен предел " + ("шагов" if self.stop_reason == 'steps' else "времени")
+        return f"\nОСТАНОВ: {why}, PC={self.resume_pc:06o} (C — продолжить)"
+
+    def _break_command(self, parsed: dict) -> str:
+        points = self.breakpoints
+        kind, action, addr = parsed['kind'], parsed['action'], parsed['addr']
+        a = int(addr, 8) if addr is not None else None
+        if action == 'set':
+            if kind == 'BP':
+                points.set_break(a, parsed['cond'])
+            else:
+                points.set_watch(a, parsed['mode'], parsed['cond'])
+        elif action == 'clear':
+            if kind == 'BP':
+                points.clear_break(a)
+            else:
+                points.clear_watch(a)
+        lines = points.describe()
+        return "\n".join(lines) if lines else "Точек останова нет"
+
+    # ---------- Профилировщик ----------
+    def set_profiler(self, profiler: Profiler | None):
+        """Включает (Profiler) или выключает (None) профилирование. Счётчики
+        памяти ведут отдельные версии _mem_read_word/_mem_write_word,
+        подставляемые только на время профилирования; операнды и кеш
+        декодирования, держащие старые методы, пересобираются."""
+        with self.lock:
+            self.profiler = profiler
+            if profiler is not None:
+                self._mem_read_word = self._mem_read_word_profiled
+                self._mem_write_word = self._mem_write_word_profiled
+            else:
+                self.__dict__.pop('_mem_read_word', None)
+                self.__dict__.pop('_mem_write_word', None)
+            self._operands = [None] * 128
+            self.invalidate_code()
+
+    def _mem_read_word_profiled(self, addr: int) -> int:
+        val = CPU._mem_read_word(self, addr)
+        self.profiler.reads[(int(addr) & 0xFFFF) >> 1] += 1
+        return val
 
-    # ---------- Нормализация ----------
-    def _raw_mem_fetch(self, addr: int) -> str:
+    def _mem_write_word_profiled(self, addr: int, value: int):
+        CPU._mem_write_word(self, addr, value)
+        self.profiler.writes[(int(addr) & 0xFFFF) >> 1] += 1
+
+    def _profile_command(self, action, arg):
+        if action == 'ON':
+            if self.profiler is None:
+                self.set_profiler(Profiler())
+            return "PROF ON"
+        if action == 'OFF':
+            self.set_profiler(None)
+            return "PROF OFF"
+        if self.profiler is None:
+            return "Профилировщик выключен (PROF ON)"
+        if action == 'RESET':
+            self.profiler.reset()
+            return "PROF RESET"
+        if action == 'SAVE':
+            self.profiler.dump(arg)
+            return f"PROF SAVE {arg}"
+        return "\n".join(self.profiler.report(self.db.mem.read_word, int(arg) if arg else 10))
+
+    def _history_command(self, action, arg):
+        history = self.history
+        if action in ('ON', 'OFF'):
+            self.debug = action == 'ON'
+            return f"HIST {action}"
+        if action == 'DEPTH':
+            history.resize(int(arg))
+            return f"HIST DEPTH {history.depth}"
+        if action == 'SAVE':
+            n = history.export(arg)
+            return f"HIST SAVE {arg}: {n} зап."
+        lines = history.tail(int(arg) if arg else 20)
+        if lines:
+            return "\n".join(lines)
+        return "История пуста" + ("" if self.debug else " (запись шагов — HIST ON)")
+
+    # ---------- Дамп памяти ----------
+    DUMP_WORDS = 8      # слов в строке дампа
+
+    def dump_memory(self, start: int, end: int):
+        """Строки дампа слов start..end (включительно): адрес и до DUMP_WORDS
+        слов. Диапазон читается из памяти одним куском, строки выдаются по
+        одной; LF после дампа продолжает со слова за end."""
+        start, end = int(start) & 0xFFFE, int(end) & 0xFFFE
+        if end < start:
+            raise ValueError("Конец диапазона меньше начала")
+        with self.lock:
+            words = self.db.read_range(start, ((end - start) >> 1) + 1)
+            self.last_read = ('mem', end, 'word')
+        step = self.DUMP_WORDS
+        for i in range(0, len(words), step):
+            yield f"{start + 2 * i:06o}/ " + " ".join(f"{w:06o}" for w in words[i:i + step])
+
+    # ---------- Загрузка программ ----------
+    def load_words(self, runs) -> int:
+        """Пишет участки [(адрес, слова), ...] в память, каждый одним срезом;
+        возвращает число слов. Участки проверяются на BUS ERROR до записи."""
+        with self.lock:
+            for addr, words in runs:
+                self._check_bus(addr)
+                self._check_bus(addr + 2 * len(words) - 2)
+            refs = self._code_refs
+            total = 0
+            for addr, words in runs:
+                self.db.write_range(addr, words)
+                lo, hi = addr >> 1, (addr >> 1) + len(words)
+                if refs.count(0, lo, hi) != len(words):
+                    for w in range(lo, hi):
+                        if refs[w]:
+                            self._invalidate_code_at(w << 1)
+                total += len(words)
+            self.last_read = None
+            return total
+
+    def load_program(self, path: str, addr: int | None = None) -> int:
+        """Загружает файл программы (core.loader): восьмеричный листинг или,
+        если задан addr, двоичный образ с этого адреса. Возвращает число слов."""
+        return self.load_words(read_program(path, addr))
+
+    def _program_command(self, path: str, addr: int | None) -> str:
+        runs = read_program(path, addr)
+        n = self.load_words(runs)
+        parts = [f"{a:06o}..{a + 2 * len(w) - 2:06o}" for a, w in runs]
+        return f"PROG {path}: {n} слов" + (f", {', '.join(parts)}" if parts else "")
+
+    # ---------- Снимки ----------
+    def snapshot(self) -> Snapshot:
+        """Текущее состояние машины: память, регистры, PSW."""
+        with self.lock:
+            return Snapshot(self.db.memory_image(), self.regs.tolist(), self.get_psw())
+
+    def restore(self, snap: Snapshot):
+        """Возвращает машину в состояние snap. Прерванный запуск забывается,
+        кеш декодирования сбрасывается, результат сразу уходит в БД."""
+        with self.lock:
+            self.db.load_memory_image(snap.memory)
+            self.regs[:] = array('H', snap.regs)
+            self._cc = None
+            self._psw = int(snap.psw) & 0xFF
+            self.invalidate_code()
+            self.resume_pc = None
+            self.stop_reason = None
+            self.last_read = None
+            self.sync()
+
+    def save_snapshot(self, path: str, compress: bool = False) -> int:
+        """Пишет снимок в файл (core.snapshot); возвращает размер файла."""
+        return snapshots.save(path, self.snapshot(), compress)
+
+    def load_snapshot(self, path: str):
+        self.restore(snapshots.load(path))
+
+    def _freeze_state(self) -> Snapshot:
+        # страницы не копируются: после freeze() образ сам копирует
+        # страницу при первой записи в неё
+        return Snapshot(self.db.mem.freeze(), self.regs.tolist(), self.get_psw())
+
+    def _mark_run_base(self):
+        self._run_base = self._freeze_state()
+        self._run_end = None
+
+    def changes_since_run(self) -> list[str]:
+        """Что изменил последний запуск (G, C, S): регистры, PSW, слова памяти.
+        Сравнивается с состоянием на конец запуска, так что правки из консоли
+        после него сюда не попадают; идущий запуск — с текущим состоянием."""
+        with self.lock:
+            base = self._run_base
+            if base is None:
+                raise RuntimeError("запусков ещё не было")
+            end = self._run_end
+            if end is None:
+                end = Snapshot(self.db.mem.pages, self.regs.tolist(), self.get_psw())
+            return snapshots.diff(base, end, snapshots.diff_pages(base.memory, end.memory))
+
+    def _diff_command(self, paths: list[str]) -> str:
+        if not paths:
+            lines = self.changes_since_run()
+        elif len(paths) == 1:
+            lines = snapshots.diff(snapshots.load(paths[0]), self.snapshot())
+        else:
+            lines = snapshots.diff(snapshots.load(paths[0]), snapshots.load(paths[1]))
+        return "\n".join(lines) if lines else "Изменений нет"
+
+    def _snapshot_command(self, parsed: dict) -> str:
+        path = parsed['path']
+        if parsed['action'] == 'SAVE':
+            size = self.save_snapshot(path, parsed['compress'])
+            return f"SAVE {path}: {size} байт"
+        self.load_snapshot(path)
+        return f"LOAD {path}: PC={self.regs[7]:06o}"
+
+    # ---------- Развилка ----------
+    def fork(self, history_depth: int | None = None) -> 'CPU':
+        """Новая машина в том же состоянии. Память общая с этой до первой
+        записи в страницу (копия при записи), регистры, PSW, пределы
+        и режимы исполнения — свои копии. БД у развилки нет
+        (DatabaseManager.fork); история пуста (глубина history_depth, по
+        умолчанию 1 — развилок бывают тысячи; HIST DEPTH у развилки
+        увеличит её), точки останова и профилировщик не наследуются."""
+        with self.lock:
+            child = CPU(db_manager=self.db.fork(self.regs, self.get_psw()), debug=self.debug,
+                        history_depth=history_depth or 1)
+            child.max_steps = self.max_steps
+            child.max_seconds = self.max_seconds
+            child.fusion = self.fusion
+            child.compile_blocks = self.compile_blocks
+            child.detect_loops = self.detect_loops
+            return child
+
+    # ---------- Синхронизация с БД ----------
+    def sync(self):
+        with self.lock:
+            self.db.flush(registers=self.regs, psw=self.get_psw())
+
+    def shutdown(self):
+        with self.lock:
+            self.sync()
+            self.db.close()
+
+
+    # ---------- Выборка и декодирование ----------
+    def _mem_fetch(self, addr: int) -> int:
         base = int(addr) & ~1
         phys = self._map_addr(base, for_code=True)
-        hi, lo = self.db.get_memory_bytes(phys)  
-        word = ((hi << 8) | lo) & 0xFFFF
-        if self.debug:
-            print(f"[DBG FETCH] logical {base:o} -> phys {phys:o} : {word:06o} (hi={hi:03o} lo={lo:03o})")
-        return f"{word:06o}"
+        word = self.db.mem.read_word(phys)
+        if self.trace.fetch:
+            self.trace.emit('fetch', f"logical {base:o} -> phys {phys:o} : {word:06o} (hi={word >> 8:03o} lo={word & 0xFF:03o})")
+        return word
+
+    def _decode_at(self, pc: int, word: int):
+        handler, args, extra = self.op.decode(word)
+        ops = [a for a in args if isinstance(a, Operand)]
+        src = ops[0] if len(ops) == 2 else None
+        dst = ops[-1] if ops else None
+        ent = (handler, args, extra, word, src, dst, cycles_of(word), 1)
+        if pc & 1:
+            # нечётный PC не кешируем: инвалидация работает по словам
+            return ent
+        self._decoded[pc] = ent
+        refs = self._code_refs
+        if refs is _NO_CODE:
+            refs = self._code_refs = bytearray(0x8000)
+        for i in range(extra + 1):
+            refs[((pc + 2 * i) & 0xFFFF) >> 1] += 1
+        return ent
+
+    def _decode_pc(self, pc: int):
+        return self._decode_at(pc, self._mem_fetch(pc))
+
+    def _decode_traced(self, pc: int):
+        """Как _decode_pc, но слово выбирается (и попадает в трассировку)
+        и тогда, когда команда уже в кеше."""
+        word = self._mem_fetch(pc)
+        ent = self._decoded.get(pc)
+        return ent if ent is not None else self._decode_at(pc, word)
+
+    def _decode_fused(self, pc: int):
+        """Запись кеша _fused для pc: блок, суперкоманда или обычная команда."""
+        ent = self._decoded.get(pc)
+        if ent is None:
+            ent = self._decode_pc(pc)
+        if pc & 1 or ent[0] is None:
+            return ent
+        block = self.compiler.compile(pc, self._fast_entry_at) if self.compile_blocks else None
+        if block is not None:
+            cover = self._block_cover
+            for i in range(block[2] + 1):
+                cover.setdefault(((pc + 2 * i) & 0xFFFF) >> 1, []).append(pc)
+            ent = block
+        else:
+            ent = self.fused.fuse(pc, ent, self._entry_at) or ent
+        self._fused[pc] = ent
+        return ent
+
+    def _fast_entry_at(self, addr: int):
+        """Суперкоманда или обычная команда по адресу — звено блока."""
+        ent = self._entry_at(addr)
+        if ent is None or ent[0] is None:
+            return ent
+        return self.fused.fuse(addr, ent, self._entry_at) or ent
+
+    def _entry_at(self, addr: int):
+        ent = self._decoded.get(addr)
+        if ent is None:
+            try:
+                ent = self._decode_pc(addr)
+            except Exception:
+                # за концом памяти — просто не сливаем
+                return None
+        return ent
+
+    def _invalidate_code_at(self, addr: int):
+        base = int(addr) & 0xFFFE
+        refs = self._code_refs
+        fused = self._fused
+        self._code_gen += 1
+        starts = self._block_cover.pop(base >> 1, None)
+        if starts:
+            for start in starts:
+                fused.pop(start, None)
+        for back in (0, 2, 4):
+            start = (base - back) & 0xFFFF
+            ent = fused.get(start)
+            if ent is not None and (back >> 1) <= ent[2]:
+                del fused[start]
+            ent = self._decoded.get(start)
+            if ent is not None and (back >> 1) <= ent[2]:
+                del self._decoded[start]
+                for i in range(ent[2] + 1):
+                    refs[((start + 2 * i) & 0xFFFF) >> 1] -= 1
+
+    def invalidate_code(self):
+        """Сбрасывает весь кеш декодирования (после массовой замены памяти)."""
+        self._decoded.clear()
+        self._fused.clear()
+        self._block_cover.clear()
+        self._code_gen += 1
+        self._code_refs = _NO_CODE
 
 
 
@@ -256,21 +1075,27 @@ class CPU:
     def _mem_read_word(self, addr: int) -> int:
         base = int(addr) & ~1
         phys = self._map_addr(base)
-        hi, lo = self.db.get_memory_bytes(phys)
-        val = ((hi << 8) | lo) & 0xFFFF
-        if self.debug:
-            print(f"[DBG READ ] logical {base:o} -> phys {phys:o} : {val:06o} (hi={hi:03o} lo={lo:03o})")
+        val = self.db.mem.read_word(phys)
+        if self.trace.mem:
+            self.trace.emit('mem', f"READ  logical {base:o} -> phys {phys:o} : {val:06o} (hi={val >> 8:03o} lo={val & 0xFF:03o})")
+        if self._watch_rd[phys >> 1] and self.breakpoints.hit_watch(self, phys, val):
+            self._watch_hit = ('R', phys, val)
         return val
 
     def _mem_write_word(self, addr: int, value: int):
         base = int(addr) & ~1
         phys = self._map_addr(base)
         v = int(value) & 0xFFFF
-        hi = (v >> 8) & 0xFF
-        lo = v & 0xFF
-        if self.debug:
-            print(f"[DBG WRITE] logical {base:o} -> phys {phys:o} : {v:06o} (hi={hi:03o} lo={lo:03o})")
-        self.db.set_memory_bytes(phys, hi, lo)
+        if self.trace.mem:
+            self.trace.emit('mem', f"WRITE logical {base:o} -> phys {phys:o} : {v:06o} (hi={v >> 8:03o} lo={v & 0xFF:03o})")
+        if self._code_refs[phys >> 1]:
+            self._invalidate_code_at(phys)
+        if self._watch_wr[phys >> 1] and self.breakpoints.hit_watch(self, phys, v):
+            self._watch_hit = ('W', phys, v)
+        log = self._write_log
+        if log is not None and phys not in log:
+            log[phys] = self.db.mem.read_word(phys)
+        self.db.set_word(phys, v)
 
     def _mem_read_byte(self, addr: int) -> int:
         a = int(addr) & 0xFFFF
@@ -281,40 +1106,23 @@ class CPU:
     def _mem_write_byte(self, addr: int, val: int):
         a = int(addr) & 0xFFFF
         base = a & ~1
-        cur = self._mem_read_word(base)
+        phys = self._map_addr(base)
+        # старое слово — мимо _mem_read_word: запись байта не чтение,
+        # точки наблюдения R и счётчики чтений её не видят
+        cur = self.db.mem.read_word(phys)
         if a & 1:
             new = ((int(val) & 0xFF) << 8) | (cur & 0x00FF)
         else:
             new = (cur & 0xFF00) | (int(val) & 0xFF)
-        # dbg
-        if self.debug:
-            phys = self._map_addr(base)
-            print(f"[DBG WRITE-B] logical {a:o} -> phys {phys:o} : byte {int(val)&0xFF:03o}, old_word={cur:06o} -> new_word={new:06o}")
+        if self.trace.mem >= 2:
+            self.trace.emit('mem', f"WRITE-B logical {a:o} -> phys {phys:o} : byte {int(val)&0xFF:03o}, old_word={cur:06o} -> new_word={new:06o}")
         self._mem_write_word(base, new)
 
-    def _set_flag(self, flag: str, value: int):
-        mask = {"C":1, "V":2, "Z":4, "N":8, "T":16}[flag]
-        psw = self.db.get_psw()
-        if value:
-            psw |= mask
-        else:
-            psw &= ~mask
-        self.db.set_psw(psw)
-
-        # синхронизируем кеш-флаги в CPU (все флаги)
-        psw_now = self.db.get_psw()
-        self.flags.N = 1 if (psw_now & 8) else 0
-        self.flags.Z = 1 if (psw_now & 4) else 0
-        self.flags.C = 1 if (psw_now & 1) else 0
-        self.flags.V = 1 if (psw_now & 2) else 0
-        self.flags.T = 1 if (psw_now & 16) else 0
-
     def _get_flag(self, flag: str) -> int:
         mask = {"C":1, "V":2, "Z":4, "N":8, "T":16}[flag]
-        psw = self.db.get_psw() & 0xFF
-
-        print(f"[DBG PSW] psw={psw:03o} flag={flag} -> {(psw & mask)!=0}")
-
+        psw = self.get_psw()
+        if self.trace.psw:
+            self.trace.emit('psw', f"psw={psw:03o} flag={flag} -> {(psw & mask)!=0}")
         return 1 if (psw & mask) else 0
 
 
@@ -323,157 +1131,28 @@ class CPU:
 
 
     # ---------- Адресация ----------
+    def operand(self, mode: int, reg: int, is_word: bool):
+        i = (int(is_word) << 6) | (mode << 3) | reg
+        op = self._operands[i]
+        if op is None:
+            op = self._operands[i] = operand_class(mode, reg, is_word)(self, mode, reg, is_word)
+        return op
+
     def resolve_operand(self, *, is_word: bool, mode: int, reg: int, pc: int, as_dest: bool = False):
         """
         Режимы адресации для Сфера-36 (PDP-11 подобные).
         Возвращает:
           value, write_back_fn, extra_words, effective_address
+        Обработчики команд работают с объектами operand() напрямую,
+        эта обёртка оставлена для внешнего кода.
         """
-
-        data_step = 2 if is_word else 1  
-        ptr_step = 2                     
-        reg_name = f"R{reg}"
-
-        # ----------------- helpers -----------------
-        def read_ea(addr: int) -> int:
-            return self._mem_read_word(addr) if is_word else self._mem_read_byte(addr)
-
-        def write_ea(addr: int, v: int):
-            if is_word:
-                self._mem_write_word(addr, v & 0xFFFF)
-            else:
-                self._mem_write_byte(addr, v & 0xFF)
-
-        # ----------------- mode 0: R -----------------
-        if mode == 0:
-            cur = self.get_register(reg_name) & 0xFFFF
-            if is_word:
-                def wb_word(v):
-                    self.set_register(reg_name, int(v) & 0xFFFF)
-                return cur, (wb_word if as_dest else None), 0, None
-            else:
-                lo = cur & 0xFF
-                def wb_byte(v):
-                    hi = (cur >> 8) & 0xFF
-                    nv = ((hi << 8) | (int(v) & 0xFF)) & 0xFFFF
-                    self.set_register(reg_name, nv)
-                return lo, (wb_byte if as_dest else None), 0, None
-
-        # ----------------- mode 1: @R -----------------
-        if mode == 1:
-            ea = self.get_register(reg_name) & 0xFFFF
-            val = read_ea(ea)
-            wb = (lambda v, a=ea: write_ea(a, v)) if as_dest else None
-            return val, wb, 0, ea
-
-        # ----------------- mode 2: (R)+ / #imm -----------------
-        if mode == 2:
-            if reg == 7:
-                # immediate — слово находится в потоке команды по адресу (pc + 2)
-                imm_addr = (pc + 2) & 0xFFFF
-                imm = self._mem_read_word(imm_addr)
-
-                if as_dest:
-                    val = imm if is_word else (imm & 0xFF)
-                    def wb(v, a=imm_addr):
-
-                        write_ea(a, v)
-
-                    return val, wb, 1, imm_addr
-
-                val = imm if is_word else (imm & 0xFF)
-                return val, None, 1, None
-
-            ea = self.get_register(reg_name) & 0xFFFF
-            val = read_ea(ea)
-            self.set_register(reg_name, (ea + data_step) & 0xFFFF)
-            wb = (lambda v, a=ea: write_ea(a, v)) if as_dest else None
-            return val, wb, 0, ea
-
-        # ---------- MODE 3: @(Rn)+ OR @#abs if Rn==7 ----------
-        if mode == 3:
-            if reg == 7:
-                abs_addr = self._mem_read_word((pc + 2) & 0xFFFF)
-                val = read_ea(abs_addr)
-                wb = (lambda v, a=abs_addr: write_ea(a, v)) if as_dest else None
-                return val, wb, 1, abs_addr
-
-            ptr_addr = self.get_register(reg_name) & 0xFFFF
-            ea = self._mem_read_word(ptr_addr)  
-            self.set_register(reg_name, (ptr_addr + ptr_step) & 0xFFFF)  
-            val = read_ea(ea)  
-            wb = (lambda v, a=ea: write_ea(a, v)) if as_dest else None
-            return val, wb, 0, ea
-
-
-        # ----------------- mode 4: -(R) -----------------
-        if mode == 4:
-            new_addr = (self.get_register(reg_name) - data_step) & 0xFFFF
-            self.set_register(reg_name, new_addr)
-            val = read_ea(new_addr)
-            wb = (lambda v, a=new_addr: write_ea(a, v)) if as_dest else None
-            return val, wb, 0, new_addr
-
-        # ----------------- mode 5: @-(R) -----------------
-        if mode == 5:
-            new_addr = (self.get_register(reg_name) - ptr_step) & 0xFFFF
-            self.set_register(reg_name, new_addr)
-            ea = self._mem_read_word(new_addr)
-            val = read_ea(ea)
-            wb = (lambda v, a=ea: write_ea(a, v)) if as_dest else None
-            return val, wb, 0, ea
-
-                # ----------------- mode 6: X(R) / PC-rel (Indexed) -----------------
-        if mode == 6:
-            # displacement word is in the instruction stream at pc+2
-            disp_addr = (pc + 2) & 0xFFFF
-            disp = self._mem_read_word(disp_addr)
-            extra_words = 1
-
-            # base is Rn except when reg == 7 (PC) -> base = pc + 4  (note: pc+4 here!)
-            base = (self.get_register(reg_name) if reg != 7 else (pc + 4)) & 0xFFFF
-            ea = (base + disp) & 0xFFFF
-
-            if self.debug:
-                print(f"[DBG RESOLVE M6] pc={pc:06o} reg=R{reg} base={base:06o} disp={disp:06o} -> ea={ea:06o}")
-
-            if is_word:
-                val = self._mem_read_word(ea)
-                wb = (lambda v, a=ea: self._mem_write_word(a, v)) if as_dest else None
-                return val, wb, extra_words, ea
-            else:
-                val = self._mem_read_byte(ea)
-                wb = (lambda v, a=ea: self._mem_write_byte(a, v)) if as_dest else None
-                return val, wb, extra_words, ea
-
-
-        # ----------------- mode 7: @X(R) / PC-rel deferred (Indirect Indexed) -----------------
-        if mode == 7:
-            # displacement word is in the instruction stream at pc+2
-            disp_addr = (pc + 2) & 0xFFFF
-            disp = self._mem_read_word(disp_addr)
-            extra_words = 1
-
-            # base is Rn except when reg == 7 (PC) -> base = pc + 4  (note: pc+4 here!)
-            base = (self.get_register(reg_name) if reg != 7 else (pc + 4)) & 0xFFFF
-            ptr = (base + disp) & 0xFFFF
-
-            ea = self._mem_read_word(ptr) & 0xFFFF
-
-            if self.debug:
-                print(f"[DBG RESOLVE M7] pc={pc:06o} reg=R{reg} base={base:06o} disp={disp:06o} ptr={ptr:06o} -> ea={ea:06o}")
-
-            if is_word:
-                val = self._mem_read_word(ea)
-                wb = (lambda v, a=ea: self._mem_write_word(a, v)) if as_dest else None
-                return val, wb, extra_words, ea
-            else:
-                val = self._mem_read_byte(ea)
-                wb = (lambda v, a=ea: self._mem_write_byte(a, v)) if as_dest else None
-                return val, wb, extra_words, ea
-
-
-
-        raise ValueError(f"Unknown addressing mode: {mode} for R{reg}")
-
-
+        if not (0 <= mode <= 7):
+            raise ValueError(f"Unknown addressing mode: {mode} for R{reg}")
+        opnd = self.operand(mode, reg, is_word)
+        val = opnd.fetch(pc)
+        if mode == 2 and reg == 7:
+            ea = opnd.ea if as_dest else None
+        else:
+            ea = opnd.ea
+        wb = opnd.store if as_dest else None
+        return val, wb, opnd.extra, ea
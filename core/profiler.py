@@ -0,0 +1,109 @@
+# core/profiler.py
+"""Профилировщик исполнения G.
+
+Счётчики лежат в заранее выделенных массивах, индексируемых числами:
+  pc_counts[pc]       — сколько раз исполнена команда по адресу;
+  word_counts[word]   — сколько раз исполнено слово команды;
+  word_ns[word]       — время обработчика для этого слова, нс;
+  reads[addr >> 1]    — чтения слова памяти операндами;
+  writes[addr >> 1]   — записи слова памяти.
+Мнемоники и обработчики собираются из word_* только при построении
+отчёта, так что в цикле нет ни строк, ни словарей.
+"""
+import json
+from array import array
+
+from .command_handlers import CommandHandlers
+from .disassembler import disassemble, mnemonic
+
+
+class Profiler:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.pc_counts = array('L', [0]) * 0x10000
+        self.word_counts = array('L', [0]) * 0x10000
+        self.word_ns = array('Q', [0]) * 0x10000
+        self.reads = array('L', [0]) * 0x8000
+        self.writes = array('L', [0]) * 0x8000
+        self.steps = 0
+
+    def count(self, pc: int, word: int, ns: int):
+        self.pc_counts[pc] += 1
+        self.word_counts[word] += 1
+        self.word_ns[word] += ns
+        self.steps += 1
+
+    # ---------- Сводки ----------
+    @staticmethod
+    def _top(counts, n: int, scale: int = 1) -> list[tuple[int, int]]:
+        hits = [(c, i * scale) for i, c in enumerate(counts) if c]
+        hits.sort(reverse=True)
+        return [(addr, c) for c, addr in hits[:n]]
+
+    def mnemonics(self) -> dict:
+        """мнемоника -> [команд, нс]"""
+        out = {}
+        ns = self.word_ns
+        for word, c in enumerate(self.word_counts):
+            if c:
+                acc = out.setdefault(mnemonic(word), [0, 0])
+                acc[0] += c
+                acc[1] += ns[word]
+        return out
+
+    def handlers(self) -> dict:
+        """имя обработчика CommandHandlers -> [вызовов, нс]"""
+        out = {}
+        ns = self.word_ns
+        entry = CommandHandlers.entry
+        for word, c in enumerate(self.word_counts):
+            if c:
+                acc = out.setdefault(entry(word)[0] or 'halt', [0, 0])
+                acc[0] += c
+                acc[1] += ns[word]
+        return out
+
+    # ---------- Отчёт ----------
+    def report(self, read_word, n: int = 10) -> list[str]:
+        """Текстовый отчёт о горячих точках; read_word — для дизассемблирования."""
+        total = self.steps
+        if not total:
+            return ["Профиль пуст"]
+        lines = [f"Профиль: {total} команд"]
+        lines.append("Горячие адреса:")
+        for addr, c in self._top(self.pc_counts, n):
+            lines.append(f"  {addr:06o} {c:>10} {100 * c / total:6.2f}%  {disassemble(read_word, addr)[0]}")
+        lines.append("Команды:")
+        for name, (c, ns) in sorted(self.mnemonics().items(), key=lambda kv: -kv[1][0])[:n]:
+            lines.append(f"  {name:<8} {c:>10} {100 * c / total:6.2f}%")
+        lines.append("Обработчики (время):")
+        for name, (c, ns) in sorted(self.handlers().items(), key=lambda kv: -kv[1][1])[:n]:
+            lines.append(f"  {name:<8} {c:>10} {ns / 1e6:9.2f} мс {ns / c:8.0f} нс/вызов")
+        lines.append("Память (чтение / запись):")
+        for addr, c in self._top(self.reads, n, 2):
+            lines.append(f"  {addr:06o} r={c} w={self.writes[addr >> 1]}")
+        for addr, c in self._top(self.writes, n, 2):
+            if not self.reads[addr >> 1]:
+                lines.append(f"  {addr:06o} r=0 w={c}")
+        return lines
+
+    def dump(self, path: str):
+        """Машиночитаемый дамп (JSON); адреса — восьмеричные строки,
+        в словарях только ненулевые счётчики."""
+        def nz(counts, scale=1):
+            return {f"{i * scale:06o}": c for i, c in enumerate(counts) if c}
+
+        data = {
+            'version': 1,
+            'steps': self.steps,
+            'pc': nz(self.pc_counts),
+            'mnemonics': {k: {'count': c, 'ns': ns} for k, (c, ns) in self.mnemonics().items()},
+            'handlers': {k: {'count': c, 'ns': ns} for k, (c, ns) in self.handlers().items()},
+            'mem_reads': nz(self.reads, 2),
+            'mem_writes': nz(self.writes, 2),
+        }
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=1)
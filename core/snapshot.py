@@ -0,0 +1,126 @@
+# core/snapshot.py
+"""Снимок всей машины: память, регистры и PSW.
+
+Снимок — это то, что нужно, чтобы вернуть машину в точности в то же
+состояние без БД и без повторного ввода программы: 64 КБ памяти одним
+блоком, R0..R7 и PSW. Память пишется и читается целиком (см.
+MemoryImage.to_bytes / load_bytes), а не по словам.
+
+Формат файла (little-endian):
+  заголовок  '<4sHH8HBxI'  — b'S36S', версия, флаги, R0..R7, PSW,
+                             длина данных;
+  данные                   — 64 КБ памяти (слова little-endian, как
+                             страницы в БД), при F_ZLIB сжатые zlib.
+
+diff() сравнивает два снимка: память — сначала страницами целиком
+(сравнение байтов идёт на C), по словам — только внутри различающихся
+страниц, поэтому полное сравнение 64 КБ почти ничего не стоит.
+diff_pages() делает то же для списков страниц MemoryImage.freeze():
+страница, оставшаяся тем же объектом, не менялась и не сравнивается.
+"""
+import struct
+import sys
+import zlib
+from array import array
+from collections import namedtuple
+
+from data.memory import PAGE_COUNT, PAGE_SIZE
+
+# флаги заголовка
+F_ZLIB = 1      # данные сжаты zlib
+
+_MAGIC = b'S36S'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHH8HBxI')
+MEMORY_SIZE = PAGE_COUNT * PAGE_SIZE
+_SWAP = sys.byteorder != 'little'
+
+# memory — bytes (MEMORY_SIZE), regs — 8 слов, psw — байт
+Snapshot = namedtuple('Snapshot', 'memory regs psw')
+
+
+def pack(snap: Snapshot, compress: bool = False) -> bytes:
+    """Снимок -> содержимое файла."""
+    data = zlib.compress(snap.memory, 6) if compress else bytes(snap.memory)
+    header = _HEADER.pack(_MAGIC, _VERSION, F_ZLIB if compress else 0,
+                          *(int(r) & 0xFFFF for r in snap.regs), int(snap.psw) & 0xFF, len(data))
+    return header + data
+
+
+def unpack(data: bytes) -> Snapshot:
+    """Содержимое файла pack() -> снимок."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Неверный формат снимка")
+    magic, version, flags, *regs, psw, size = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError("Неверный формат снимка")
+    if version != _VERSION:
+        raise ValueError(f"Снимок версии {version} не поддерживается (есть {_VERSION})")
+    memory = data[_HEADER.size:_HEADER.size + size]
+    if len(memory) != size:
+        raise ValueError("Снимок обрезан")
+    if flags & F_ZLIB:
+        memory = zlib.decompress(memory)
+    if len(memory) != MEMORY_SIZE:
+        raise ValueError("Неверный размер памяти в снимке")
+    return Snapshot(memory, regs, psw)
+
+
+def save(path: str, snap: Snapshot, compress: bool = False) -> int:
+    """Пишет снимок в файл; возвращает размер файла в байтах."""
+    data = pack(snap, compress)
+    with open(path, 'wb') as fh:
+        fh.write(data)
+    return len(data)
+
+
+def load(path: str) -> Snapshot:
+    with open(path, 'rb') as fh:
+        return unpack(fh.read())
+
+
+def _words(data) -> array:
+    words = array('H')
+    words.frombytes(data)
+    if _SWAP:
+        words.byteswap()
+    return words
+
+
+def diff_memory(old: bytes, new: bytes) -> list[tuple[int, int, int]]:
+    """(адрес, старое слово, новое слово) для каждого изменившегося слова."""
+    if old == new:
+        return []
+    a, b = memoryview(old), memoryview(new)
+    out = []
+    for off in range(0, MEMORY_SIZE, PAGE_SIZE):
+        end = off + PAGE_SIZE
+        if a[off:end] == b[off:end]:
+            continue
+        for i, (x, y) in enumerate(zip(_words(a[off:end]), _words(b[off:end]))):
+            if x != y:
+                out.append((off + 2 * i, x, y))
+    return out
+
+
+def diff_pages(old: list[array], new: list[array]) -> list[tuple[int, int, int]]:
+    """Как diff_memory, но для списков страниц (MemoryImage.freeze / pages)."""
+    out = []
+    for p, (a, b) in enumerate(zip(old, new)):
+        if a is b or a == b:
+            continue
+        base = p * PAGE_SIZE
+        out += [(base + 2 * i, x, y) for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    return out
+
+
+def diff(old: Snapshot, new: Snapshot, words=None) -> list[str]:
+    """Строки различий: регистры, PSW, затем слова памяти по возрастанию
+    адреса. words — уже найденные различия памяти (иначе — diff_memory)."""
+    if words is None:
+        words = diff_memory(old.memory, new.memory)
+    lines = [f"R{r}: {x:06o} -> {y:06o}" for r, (x, y) in enumerate(zip(old.regs, new.regs)) if x != y]
+    if old.psw != new.psw:
+        lines.append(f"RS: {old.psw:03o} -> {new.psw:03o}")
+    lines += [f"{addr:06o}: {x:06o} -> {y:06o}" for addr, x, y in words]
+    return lines
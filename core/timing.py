@@ -0,0 +1,59 @@
+# core/timing.py
+"""Модель времени исполнения: такты на команду.
+
+Как в справочниках по PDP-11, время команды складывается из базового
+времени операции (все операнды в регистрах) и добавок за режимы адресации
+источника и приёмника. Добавка приёмника зависит от того, как команда
+с ним обращается: только читает (TST), только пишет (MOV, CLR) или
+читает и пишет (ADD, INC).
+
+Такты считаются один раз при декодировании и лежат в кеше декодирования
+рядом с обработчиком, так что цикл G только складывает готовые числа.
+Перевод в секунды — по частоте config.CPU_CLOCK_HZ.
+"""
+from .command_handlers import CommandHandlers
+
+# базовое время в тактах (операнды — регистры)
+BASE = {
+    'op_mov': 10, 'op_movb': 10, 'op_add': 10, 'op_sub': 10,
+    'op_clr': 10, 'op_com': 10, 'op_inc': 10, 'op_dec': 10, 'op_neg': 10, 'op_tst': 10,
+    'op_mfps': 14, 'op_mtps': 18,
+    'op_br': 10, 'op_bne': 10, 'op_beq': 10, 'op_bpl': 10, 'op_bmi': 10,
+    'op_jmp': 6,
+    'op_unknown': 10,
+}
+
+# добавка за режим адресации 0..7: чтение источника / приёмника
+SRC_MODE = (0, 6, 6, 12, 8, 14, 12, 18)
+# приёмник, который только пишется
+DST_WRITE = (0, 6, 6, 12, 8, 14, 12, 18)
+# приёмник, который читается и пишется (лишний цикл шины)
+DST_MODIFY = (0, 9, 9, 15, 11, 17, 15, 21)
+# JMP: вычисление адреса перехода (режим 0 недопустим)
+JMP_MODE = (0, 6, 9, 12, 9, 15, 12, 18)
+
+# как команда обращается с (последним) операндом-приёмником
+_WRITE_ONLY = frozenset({'op_mov', 'op_movb', 'op_clr'})
+_READ_ONLY = frozenset({'op_tst'})
+
+
+def cycles(word: int) -> int:
+    """Такты на команду word; для останова (слово 0) — 0."""
+    ent = CommandHandlers.entry(word)
+    name, specs = ent[0], ent[1]
+    if name is None:
+        return 0
+    total = BASE[name]
+    if name == 'op_jmp':
+        return total + JMP_MODE[specs[0][0]]
+    if len(specs) == 2:
+        total += SRC_MODE[specs[0][0]]
+    if specs:
+        mode = specs[-1][0]
+        if name in _READ_ONLY:
+            total += SRC_MODE[mode]
+        elif name in _WRITE_ONLY:
+            total += DST_WRITE[mode]
+        else:
+            total += DST_MODIFY[mode]
+    return total
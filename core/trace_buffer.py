@@ -0,0 +1,201 @@
+# core/trace_buffer.py
+"""Кольцевой буфер истории исполнения.
+
+Каждый шаг G записывается компактной записью в параллельные массивы
+фиксированной глубины: pc, слово команды, следующий pc, исполнительные
+адреса src/dst, PSW после команды и флаги. Текст строится только когда
+его просят (UI, команда HIST), а export() пишет буфер в двоичный файл
+для разбора вне эмулятора.
+
+Формат файла (little-endian):
+  заголовок  '<4sHHI'      — b'S36T', версия, размер записи, число записей;
+  запись     '<HHHHHBB'    — pc, word, next_pc, src_ea, dst_ea, psw, flags.
+Записи идут от старой к новой.
+"""
+import struct
+from array import array
+from collections import namedtuple
+
+from .command_handlers import CommandHandlers
+
+# flags записи
+F_SRC = 1       # src_ea действителен
+F_DST = 2       # dst_ea действителен
+F_ERROR = 4     # команда завершилась исключением
+F_JUMP = 8      # команда сама записала PC (переход выполнен)
+
+_MAGIC = b'S36T'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHI')
+_RECORD = struct.Struct('<HHHHHBB')
+
+# команды с байтовым вариантом под тем же обработчиком (бит 15)
+_BYTE_SUFFIX = {'op_clr', 'op_com', 'op_inc', 'op_dec', 'op_neg', 'op_tst'}
+_COND_BRANCH = {'op_bne', 'op_beq', 'op_bpl', 'op_bmi'}
+
+
+def describe(word: int, next_pc: int, dst_ea, flags: int) -> str:
+    """Текст команды так, как его показывает протокол G."""
+    ent = CommandHandlers.entry(word)
+    name = ent[0]
+    if name is None:
+        return "HALT"
+    if name == 'op_unknown':
+        return f"UNKNOWN {word:06o}"
+    mnem = name[3:].upper()
+    if name in _BYTE_SUFFIX and word & 0x8000:
+        return mnem + "B"
+    if name in ('op_mfps', 'op_mtps'):
+        return f"{mnem} R{word & 0o7}"
+    if name == 'op_br':
+        return f"BR {next_pc:06o}"
+    if name in _COND_BRANCH:
+        if flags & F_JUMP:
+            return f"{mnem} {next_pc:06o}"
+        return f"{mnem} (no branch)"
+    if name == 'op_jmp':
+        if dst_ea is not None:
+            return f"JMP {dst_ea:06o}"
+        return "JMP (invalid)"
+    return mnem
+
+
+class TraceRecord(namedtuple('TraceRecord', 'pc word next_pc src_ea dst_ea psw flags')):
+    """Одна запись истории; src_ea/dst_ea — None, если адреса нет."""
+    __slots__ = ()
+
+    @property
+    def text(self) -> str:
+        return describe(self.word, self.next_pc, self.dst_ea, self.flags)
+
+
+class TraceBuffer:
+    DEFAULT_DEPTH = 4096
+
+    def __init__(self, depth: int = DEFAULT_DEPTH):
+        self.resize(depth)
+
+    def resize(self, depth: int):
+        """Задаёт глубину буфера; история при этом очищается."""
+        depth = int(depth)
+        if depth < 1:
+            raise ValueError("Глубина истории должна быть > 0")
+        self.depth = depth
+        self.pc = array('H', bytes(2 * depth))
+        self.word = array('H', bytes(2 * depth))
+        self.next_pc = array('H', bytes(2 * depth))
+        self.src_ea = array('H', bytes(2 * depth))
+        self.dst_ea = array('H', bytes(2 * depth))
+        self.psw = array('B', bytes(depth))
+        self.flags = array('B', bytes(depth))
+        self._errors = {}   # слот -> текст исключения (только при F_ERROR)
+        self.count = 0      # всего записей с момента очистки
+
+    def clear(self):
+        self.count = 0
+        self._errors.clear()
+
+    def __len__(self):
+        return min(self.count, self.depth)
+
+    # ---------- Запись ----------
+    def record(self, pc: int, word: int, src, dst, next_pc: int, psw: int, flags: int = 0):
+        """flags — F_JUMP или 0. src/dst — объекты-операнды команды
+        (или None), их ea — адрес последнего обращения. Если src и dst —
+        один объект (например, (R1)+,(R1)+), оба поля получат адрес приёмника."""
+        i = self.count % self.depth
+        self.count += 1
+        self.pc[i] = pc
+        self.word[i] = word
+        self.next_pc[i] = next_pc
+        self.psw[i] = psw
+        f = flags
+        if src is not None and src.ea is not None:
+            self.src_ea[i] = src.ea
+            f |= F_SRC
+        if dst is not None and dst.ea is not None:
+            self.dst_ea[i] = dst.ea
+            f |= F_DST
+        self.flags[i] = f
+
+    def record_error(self, pc: int, word: int, message: str, psw: int):
+        i = self.count % self.depth
+        self.count += 1
+        self.pc[i] = pc
+        self.word[i] = word
+        self.next_pc[i] = pc
+        self.psw[i] = psw
+        self.flags[i] = F_ERROR
+        self._errors[i] = message
+
+    # ---------- Чтение ----------
+    def _slots(self, start: int = 0):
+        """Слоты записей с порядковыми номерами >= start, от старых к новым."""
+        first = max(start, self.count - self.depth, 0)
+        depth = self.depth
+        return [n % depth for n in range(first, self.count)]
+
+    def records(self, start: int = 0) -> list[TraceRecord]:
+        """Записи с порядковыми номерами >= start, от старых к новым."""
+        out = []
+        for i in self._slots(start):
+            f = self.flags[i]
+            out.append(TraceRecord(
+                self.pc[i], self.word[i], self.next_pc[i],
+                self.src_ea[i] if f & F_SRC else None,
+                self.dst_ea[i] if f & F_DST else None,
+                self.psw[i], f,
+            ))
+        return out
+
+    # ---------- Текст ----------
+    def _text(self, i: int) -> str:
+        f = self.flags[i]
+        return describe(self.word[i], self.next_pc[i], self.dst_ea[i] if f & F_DST else None, f)
+
+    def format_record(self, i: int, verbose: bool = False) -> str:
+        f = self.flags[i]
+        if f & F_ERROR:
+            return f"{self.pc[i]:06o}: Ошибка: {self._errors.get(i, '')}"
+        line = f"{self.next_pc[i]:06o}: {self._text(i)}"
+        if verbose:
+            src = f"{self.src_ea[i]:06o}" if f & F_SRC else "------"
+            dst = f"{self.dst_ea[i]:06o}" if f & F_DST else "------"
+            line = (f"{self.pc[i]:06o} {self.word[i]:06o}  {line:<26} "
+                    f"src={src} dst={dst} psw={self.psw[i]:03o}")
+        return line
+
+    def lines(self, start: int = 0, verbose: bool = False) -> list[str]:
+        return [self.format_record(i, verbose) for i in self._slots(start)]
+
+    def tail(self, n: int, verbose: bool = True) -> list[str]:
+        return self.lines(max(self.count - int(n), 0), verbose)
+
+    # ---------- Экспорт ----------
+    def export(self, path: str) -> int:
+        """Пишет историю в двоичный файл; возвращает число записей."""
+        slots = self._slots()
+        pack = _RECORD.pack
+        with open(path, 'wb') as fh:
+            fh.write(_HEADER.pack(_MAGIC, _VERSION, _RECORD.size, len(slots)))
+            fh.write(b''.join(
+                pack(self.pc[i], self.word[i], self.next_pc[i], self.src_ea[i],
+                     self.dst_ea[i], self.psw[i], self.flags[i])
+                for i in slots
+            ))
+        return len(slots)
+
+    @classmethod
+    def load(cls, path: str) -> 'TraceBuffer':
+        """Читает файл export() в новый буфер (тексты исключений не сохраняются)."""
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        magic, version, size, n = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION or size != _RECORD.size:
+            raise ValueError("Неверный формат файла истории")
+        buf = cls(max(n, 1))
+        for k, rec in enumerate(_RECORD.iter_unpack(data[_HEADER.size:_HEADER.size + n * size])):
+            (buf.pc[k], buf.word[k], buf.next_pc[k], buf.src_ea[k],
+             buf.dst_ea[k], buf.psw[k], buf.flags[k]) = rec
+        buf.count = n
+        return buf
@@ -1,36 +1,69 @@
 
 import sqlite3
+import sys
+from array import array
 from pathlib import Path
 from typing import Tuple
 
+from .memory import MemoryImage, PAGE_SHIFT, PAGE_SIZE, PAGE_COUNT
+
 class DatabaseManager:
     MIN_ADDR = 0o1000
+    # 1 — memory_bytes (байт как TEXT '01010101'), 2 — memory_pages (BLOB на страницу)
+    SCHEMA_VERSION = 2
 
-    def __init__(self, db_path: str | None = None, debug: bool = False):
+    def __init__(self, db_path: str | None = None, debug: bool = False, write_through: bool = False):
         default = str(Path(__file__).parent.parent / 'data' / 'migrations' / 'db.db')
         self.db_path = db_path or default
         self.debug = debug
+        # write_through=True — старый режим: каждая запись сразу уходит в БД
+        self.write_through = write_through
+        self.mem = MemoryImage()
 
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         need_init = not Path(self.db_path).exists()
 
-        self.conn = sqlite3.connect(self.db_path)
+        # соединением пользуются и поток UI, и поток исполнения G;
+        # доступ к нему сериализует CPU.lock
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA journal_mode=WAL;")
         self._ensure_schema()
+        self._migrate()
         self._ensure_registers()
         self._ensure_lowpage()
         self._ensure_psw()
+        self._load_memory()
         if need_init and self.debug:
             print("[DatabaseManager] created DB at", self.db_path)
 
+    def fork(self, registers, psw: int) -> 'DatabaseManager':
+        """Менеджер без БД для развилки машины (CPU.fork). Страницы памяти
+        общие с этим менеджером до первой записи (MemoryImage.fork),
+        регистры и PSW хранятся в самом объекте, на диск ничего не пишется;
+        грязными остаются страницы, изменённые после развилки."""
+        child = DatabaseManager.__new__(DatabaseManager)
+        child.db_path = None
+        child.debug = self.debug
+        child.write_through = False
+        child.conn = None
+        child.mem = self.mem.fork()
+        child._registers = [int(v) & 0xFFFF for v in registers]
+        child._psw = int(psw) & 0xFF
+        return child
+
     def _ensure_schema(self):
         cur = self.conn.cursor()
         cur.execute("""
-            CREATE TABLE IF NOT EXISTS memory_bytes(
-                addr_even INTEGER PRIMARY KEY,
-                hi TEXT NOT NULL CHECK(length(hi)=8),
-                lo TEXT NOT NULL CHECK(length(lo)=8)
+            CREATE TABLE IF NOT EXISTS schema_version(
+                id INTEGER PRIMARY KEY CHECK(id=0),
+                version INTEGER NOT NULL
+            );
+        """)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS memory_pages(
+                page INTEGER PRIMARY KEY CHECK(page BETWEEN 0 AND {PAGE_COUNT - 1}),
+                data BLOB NOT NULL CHECK(length(data)={PAGE_SIZE})
             );
         """)
         cur.execute("""
@@ -41,6 +74,52 @@ class DatabaseManager:
         """)
         self.conn.commit()
 
+    # ---------- Версия схемы / миграции ----------
+    def get_schema_version(self) -> int:
+        cur = self.conn.cursor()
+        cur.execute("SELECT version FROM schema_version WHERE id=0;")
+        row = cur.fetchone()
+        if row:
+            return int(row['version'])
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='memory_bytes';")
+        # старые db.db без таблицы версий считаем версией 1
+        return 1 if cur.fetchone() else self.SCHEMA_VERSION
+
+    def _set_schema_version(self, version: int):
+        self.conn.execute(
+            "INSERT INTO schema_version(id, version) VALUES(0, ?) "
+            "ON CONFLICT(id) DO UPDATE SET version=excluded.version;",
+            (int(version),)
+        )
+
+    def _migrate(self):
+        version = self.get_schema_version()
+        if version > self.SCHEMA_VERSION:
+            raise RuntimeError(f"Схема БД v{version} новее поддерживаемой v{self.SCHEMA_VERSION}")
+        migrated = version < self.SCHEMA_VERSION
+        while version < self.SCHEMA_VERSION:
+            getattr(self, f"_migrate_v{version}_to_v{version + 1}")()
+            version += 1
+        self._set_schema_version(version)
+        self.conn.commit()
+        if migrated:
+            # освобождаем место, занятое старыми таблицами
+            self.conn.execute("VACUUM;")
+
+    def _migrate_v1_to_v2(self):
+        mem = MemoryImage()
+        cur = self.conn.cursor()
+        cur.execute("SELECT addr_even, hi, lo FROM memory_bytes;")
+        for row in cur.fetchall():
+            mem.write_word(int(row['addr_even']), (self._from_bin8(row['hi']) << 8) | self._from_bin8(row['lo']))
+        cur.executemany(
+            "INSERT OR REPLACE INTO memory_pages(page, data) VALUES(?, ?);",
+            [(p, mem.page_bytes(p)) for p in mem.dirty_pages()]
+        )
+        cur.execute("DROP TABLE memory_bytes;")
+        if self.debug:
+            print(f"[DatabaseManager] migrated memory_bytes -> memory_pages ({len(mem.dirty_pages())} page(s))")
+
     def _ensure_registers(self):
         cur = self.conn.cursor()
         for r in range(8):
@@ -55,14 +134,12 @@ class DatabaseManager:
         base = int(self.MIN_ADDR)
         end = base + int(0o1777)
         cur = self.conn.cursor()
-        cur.execute("SELECT 1 FROM memory_bytes WHERE addr_even BETWEEN ? AND ? LIMIT 1;", (base, end))
-        if cur.fetchone() is None:
-            rows = []
-            a = base & ~1
-            while a <= end:
-                rows.append((a, '00000000', '00000000'))
-                a += 2
-            cur.executemany("INSERT OR IGNORE INTO memory_bytes(addr_even, hi, lo) VALUES(?, ?, ?);", rows)
+        pages = range(base >> PAGE_SHIFT, (end >> PAGE_SHIFT) + 1)
+        cur.executemany(
+            "INSERT OR IGNORE INTO memory_pages(page, data) VALUES(?, ?);",
+            [(p, bytes(PAGE_SIZE)) for p in pages]
+        )
+        if cur.rowcount:
             self.conn.commit()
             if self.debug:
                 print(f"[DatabaseManager] Initialized lowpage {base:o}..{end:o}")
@@ -92,13 +169,28 @@ class DatabaseManager:
             raise ValueError("Address out of range")
 
     def get_register_value(self, reg_num: int) -> int:
+        if self.conn is None:
+            return self._registers[int(reg_num)]
         cur = self.conn.cursor()
         cur.execute("SELECT value FROM registers WHERE reg=?;", (int(reg_num),))
         r = cur.fetchone()
         return int(r['value']) & 0xFFFF if r else 0
 
+    def get_registers(self) -> list[int]:
+        if self.conn is None:
+            return list(self._registers)
+        cur = self.conn.cursor()
+        cur.execute("SELECT reg, value FROM registers;")
+        values = [0] * 8
+        for row in cur.fetchall():
+            values[int(row['reg'])] = int(row['value']) & 0xFFFF
+        return values
+
     def set_register_value(self, reg_num: int, value: int):
         v = int(value) & 0xFFFF
+        if self.conn is None:
+            self._registers[int(reg_num)] = v
+            return
         self.conn.execute(
             "INSERT INTO registers(reg, value) VALUES(?, ?) "
             "ON CONFLICT(reg) DO UPDATE SET value=excluded.value;",
@@ -106,16 +198,58 @@ class DatabaseManager:
         )
         self.conn.commit()
 
+    # ---------- Образ памяти ----------
+    def _load_memory(self):
+        cur = self.conn.cursor()
+        cur.execute("SELECT page, data FROM memory_pages;")
+        for row in cur.fetchall():
+            self.mem.load_page(int(row['page']), row['data'])
+        self.mem.clear_dirty()
+
+    def flush(self, registers=None, psw: int | None = None):
+        """Точка синхронизации: грязные страницы памяти и (если переданы)
+        регистры/PSW записываются в БД одной транзакцией."""
+        if self.conn is None:
+            # развилка (fork): сохранять некуда
+            if registers is not None:
+                self._registers = [int(v) & 0xFFFF for v in registers]
+            if psw is not None:
+                self._psw = int(psw) & 0xFF
+            return
+        pages = self.mem.dirty_pages()
+        if not pages and registers is None and psw is None:
+            return
+        if pages:
+            self.conn.executemany(
+                "INSERT INTO memory_pages(page, data) VALUES(?, ?) "
+                "ON CONFLICT(page) DO UPDATE SET data=excluded.data;",
+                [(p, self.mem.page_bytes(p)) for p in pages]
+            )
+        if registers is not None:
+            self.conn.executemany(
+                "UPDATE registers SET value=? WHERE reg=?;",
+                [(int(v) & 0xFFFF, r) for r, v in enumerate(registers)]
+            )
+        if psw is not None:
+            self.conn.execute("UPDATE processor_state SET psw=? WHERE id=0;", (int(psw) & 0xFF,))
+        self.conn.commit()
+        self.mem.clear_dirty()
+
+    def close(self):
+        self.flush()
+        if self.conn is not None:
+            self.conn.close()
+
+    def _written(self):
+        if self.write_through:
+            self.flush()
+
     def get_memory_row(self, addr_even: int) -> dict | None:
 
         a = int(addr_even) & ~1
         self.validate_address(a)
-        cur = self.conn.cursor()
-        cur.execute("SELECT hi, lo FROM memory_bytes WHERE addr_even=?;", (a,))
-        row = cur.fetchone()
-        if row:
-            return {"hi": row["hi"], "lo": row["lo"]}
-        return None
+        hi, lo = self.get_memory_bytes(a)
+        return {"hi": self._to_bin8(hi), "lo": self._to_bin8(lo)}
 
     def set_memory_row(self, addr_even: int, hi: str, lo: str):
 
@@ -123,65 +257,79 @@ class DatabaseManager:
         self.validate_address(a)
         if len(hi) != 8 or len(lo) != 8:
             raise ValueError("hi/lo must be 8-bit binary strings")
-        self._ensure_row(a)
-        self.conn.execute(
-            "UPDATE memory_bytes SET hi=?, lo=? WHERE addr_even=?;",
-            (hi, lo, a)
-        )
-        self.conn.commit()
-
-    def _ensure_row(self, addr_even: int):
-        a = int(addr_even) & ~1
-        cur = self.conn.cursor()
-        cur.execute("SELECT 1 FROM memory_bytes WHERE addr_even=?;", (a,))
-        if cur.fetchone() is None:
-            cur.execute("INSERT INTO memory_bytes(addr_even, hi, lo) VALUES(?, '00000000', '00000000');", (a,))
-            self.conn.commit()
+        self.set_memory_bytes(a, self._from_bin8(hi), self._from_bin8(lo))
 
     def get_memory_bytes(self, addr_even: int) -> Tuple[int, int]:
         a = int(addr_even) & ~1
         self.validate_address(a)
-        cur = self.conn.cursor()
-        cur.execute("SELECT hi, lo FROM memory_bytes WHERE addr_even=?;", (a,))
-        row = cur.fetchone()
-        if row is None:
-            return 0, 0
-        return self._from_bin8(row['hi']), self._from_bin8(row['lo'])
+        w = self.mem.read_word(a)
+        return (w >> 8) & 0xFF, w & 0xFF
 
     def set_memory_bytes(self, addr_even: int, hi: int, lo: int):
         a = int(addr_even) & ~1
         self.validate_address(a)
-        self._ensure_row(a)
-        self.conn.execute(
-            "UPDATE memory_bytes SET hi=?, lo=? WHERE addr_even=?;",
-            (self._to_bin8(int(hi) & 0xFF), self._to_bin8(int(lo) & 0xFF), a)
-        )
-        self.conn.commit()
+        self.mem.write_word(a, ((int(hi) & 0xFF) << 8) | (int(lo) & 0xFF))
+        self._written()
 
     def get_word(self, addr_even: int) -> int:
-        hi, lo = self.get_memory_bytes(addr_even)
-        return ((hi << 8) | lo) & 0xFFFF
+        return self.mem.read_word(int(addr_even))
 
     def set_word(self, addr_even: int, value: int):
-        hi = (int(value) >> 8) & 0xFF
-        lo = int(value) & 0xFF
-        self.set_memory_bytes(addr_even, hi, lo)
+        self.mem.write_word(int(addr_even), int(value))
+        self._written()
+
+    def fill_words(self, addr_even: int, count: int, value: int):
+        """count слов подряд с addr_even заполняются value."""
+        self.mem.fill_words(int(addr_even) & ~1, count, int(value))
+        self._written()
+
+    def copy_words(self, src_even: int, dst_even: int, count: int):
+        """Копирует count слов (как memmove: сначала читает весь источник)."""
+        mem = self.mem
+        mem.write_words(int(dst_even) & ~1, mem.read_words(int(src_even) & ~1, count))
+        self._written()
+
+    @staticmethod
+    def _range(start_even: int, count: int) -> int:
+        a = int(start_even) & ~1
+        if count < 0 or a + 2 * count > 0x10000:
+            raise ValueError("Диапазон выходит за конец памяти")
+        return a
+
+    def read_range(self, start_even: int, count: int) -> array:
+        """count слов подряд с start_even — срезами по страницам, без чтения по слову."""
+        return self.mem.read_words(self._range(start_even, count), count)
+
+    def write_range(self, start_even: int, words):
+        """Пишет слова подряд с start_even (срезами по страницам); words —
+        array('H') (так отдаёт слова core.loader) пишется как есть, bytes —
+        слова little-endian, как в memory_image(); остальное — любая
+        последовательность целых, от них берутся младшие 16 бит."""
+        if isinstance(words, (bytes, bytearray, memoryview)):
+            data, words = words, array('H')
+            words.frombytes(data)
+            if sys.byteorder != 'little':
+                words.byteswap()
+        elif not (isinstance(words, array) and words.typecode == 'H'):
+            words = array('H', (int(w) & 0xFFFF for w in words))
+        self.mem.write_words(self._range(start_even, len(words)), words)
+        self._written()
+
+    def memory_image(self) -> bytes:
+        """Вся память одним блоком (64 КБ, слова little-endian)."""
+        return self.mem.to_bytes()
+
+    def load_memory_image(self, data: bytes):
+        """Заменяет всю память блоком memory_image()."""
+        self.mem.load_bytes(data)
+        self._written()
 
     def get_byte(self, addr: int) -> int:
-        a = int(addr) & 0xFFFF
-        base = a & ~1
-        hi, lo = self.get_memory_bytes(base)
-        return hi if (a & 1) else lo
+        return self.mem.read_byte(int(addr))
 
     def set_byte(self, addr: int, value: int):
-        a = int(addr) & 0xFFFF
-        base = a & ~1
-        hi, lo = self.get_memory_bytes(base)
-        if a & 1:
-            hi = int(value) & 0xFF
-        else:
-            lo = int(value) & 0xFF
-        self.set_memory_bytes(base, hi, lo)
+        self.mem.write_byte(int(addr), int(value))
+        self._written()
 
 
     def get_memory_value(self, addr_even: int) -> str:
@@ -212,12 +360,17 @@ class DatabaseManager:
         self.conn.commit()
 
     def get_psw(self) -> int:
+        if self.conn is None:
+            return self._psw
         cur = self.conn.cursor()
         cur.execute("SELECT psw FROM processor_state WHERE id=0;")
         row = cur.fetchone()
         return int(row["psw"]) if row else 0
 
     def set_psw(self, psw: int):
+        if self.conn is None:
+            self._psw = int(psw) & 0xFF
+            return
         cur = self.conn.cursor()
         cur.execute("UPDATE processor_state SET psw=? WHERE id=0;", (int(psw) & 0xFF,))
         self.conn.commit()
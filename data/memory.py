@@ -0,0 +1,149 @@
+import sys
+from array import array
+
+PAGE_SIZE = 512                       # байт на страницу
+PAGE_SHIFT = 9
+PAGE_WORDS = PAGE_SIZE // 2
+PAGE_COUNT = 0x10000 // PAGE_SIZE     # 128 страниц на 64 КБ
+
+_SWAP = sys.byteorder != 'little'     # в БД страницы хранятся little-endian
+
+
+class MemoryImage:
+    """Образ всего адресного пространства (64 КБ) в ОЗУ.
+
+    Память разбита на страницы по PAGE_SIZE байт (array('H') слов).
+    Каждая запись помечает страницу «грязной»; DatabaseManager
+    сбрасывает только такие страницы в точках синхронизации.
+
+    freeze() отдаёт список текущих страниц как неизменяемый снимок,
+    fork() — образ, у которого все страницы общие с этим. После них
+    страница копируется при первой записи в неё (own[p] == 0 — страница
+    общая и перед записью копируется), так что снимок и развилка стоят
+    копии только реально изменённых страниц.
+    """
+
+    def __init__(self):
+        self.pages = [array('H', bytes(PAGE_SIZE)) for _ in range(PAGE_COUNT)]
+        self.dirty = bytearray(PAGE_COUNT)
+        self.own = bytearray(b'\1' * PAGE_COUNT)
+
+    def freeze(self) -> list[array]:
+        """Текущие страницы; образ их больше не меняет (копирует при записи)."""
+        self.own = bytearray(PAGE_COUNT)
+        return list(self.pages)
+
+    def fork(self) -> 'MemoryImage':
+        """Копия образа, делящая с ним страницы до первой записи."""
+        child = MemoryImage.__new__(MemoryImage)
+        child.pages = self.freeze()
+        child.dirty = bytearray(PAGE_COUNT)
+        child.own = bytearray(PAGE_COUNT)
+        return child
+
+    def _unshare(self, p: int) -> array:
+        page = self.pages[p] = array('H', self.pages[p])
+        self.own[p] = 1
+        return page
+
+    # ---------- Слова / байты ----------
+    def read_word(self, addr: int) -> int:
+        a = addr & 0xFFFE
+        return self.pages[a >> PAGE_SHIFT][(a & 0x1FF) >> 1]
+
+    def write_word(self, addr: int, value: int):
+        a = addr & 0xFFFE
+        p = a >> PAGE_SHIFT
+        page = self.pages[p] if self.own[p] else self._unshare(p)
+        page[(a & 0x1FF) >> 1] = value & 0xFFFF
+        self.dirty[p] = 1
+
+    def read_byte(self, addr: int) -> int:
+        a = addr & 0xFFFF
+        w = self.pages[a >> PAGE_SHIFT][(a & 0x1FF) >> 1]
+        return (w >> 8) if (a & 1) else (w & 0xFF)
+
+    def write_byte(self, addr: int, value: int):
+        a = addr & 0xFFFF
+        p = a >> PAGE_SHIFT
+        page = self.pages[p] if self.own[p] else self._unshare(p)
+        i = (a & 0x1FF) >> 1
+        if a & 1:
+            page[i] = ((value & 0xFF) << 8) | (page[i] & 0x00FF)
+        else:
+            page[i] = (page[i] & 0xFF00) | (value & 0xFF)
+        self.dirty[p] = 1
+
+    # ---------- Диапазоны слов ----------
+    # addr — чётный, диапазон не переходит через конец памяти
+    def _chunks(self, addr: int, count: int):
+        """(страница, индекс в странице, слов, смещение в диапазоне) по страницам."""
+        done = 0
+        while done < count:
+            a = addr + 2 * done
+            i = (a & 0x1FF) >> 1
+            m = min(count - done, PAGE_WORDS - i)
+            yield a >> PAGE_SHIFT, i, m, done
+            done += m
+
+    def read_words(self, addr: int, count: int) -> array:
+        out = array('H')
+        for p, i, m, _ in self._chunks(addr, count):
+            out.extend(self.pages[p][i:i + m])
+        return out
+
+    def write_words(self, addr: int, words: array):
+        for p, i, m, j in self._chunks(addr, len(words)):
+            page = self.pages[p] if self.own[p] else self._unshare(p)
+            page[i:i + m] = words[j:j + m]
+            self.dirty[p] = 1
+
+    def fill_words(self, addr: int, count: int, value: int):
+        for p, i, m, _ in self._chunks(addr, count):
+            page = self.pages[p] if self.own[p] else self._unshare(p)
+            page[i:i + m] = array('H', [value & 0xFFFF]) * m
+            self.dirty[p] = 1
+
+    # ---------- Образ целиком ----------
+    def to_bytes(self) -> bytes:
+        """Вся память, 64 КБ слов little-endian (как страницы в БД)."""
+        return b''.join(self.page_bytes(p) for p in range(PAGE_COUNT))
+
+    def load_bytes(self, data: bytes):
+        """Заменяет всю память образом to_bytes(); грязными помечаются
+        только изменившиеся страницы."""
+        if len(data) != PAGE_COUNT * PAGE_SIZE:
+            raise ValueError(f"Образ памяти должен быть {PAGE_COUNT * PAGE_SIZE} байт")
+        words = array('H')
+        words.frombytes(data)
+        if _SWAP:
+            words.byteswap()
+        pages, dirty = self.pages, self.dirty
+        for p in range(PAGE_COUNT):
+            page = words[p * PAGE_WORDS:(p + 1) * PAGE_WORDS]
+            if page != pages[p]:
+                pages[p] = page
+                dirty[p] = 1
+                self.own[p] = 1
+
+    # ---------- Страницы ----------
+    def dirty_pages(self) -> list[int]:
+        return [p for p in range(PAGE_COUNT) if self.dirty[p]]
+
+    def clear_dirty(self):
+        self.dirty = bytearray(PAGE_COUNT)
+
+    def page_bytes(self, page: int) -> bytes:
+        data = self.pages[page]
+        if _SWAP:
+            data = array('H', data)
+            data.byteswap()
+        return data.tobytes()
+
+    def load_page(self, page: int, data: bytes):
+        words = array('H')
+        words.frombytes(bytes(data).ljust(PAGE_SIZE, b'\0')[:PAGE_SIZE])
+        if _SWAP:
+            words.byteswap()
+        self.pages[page] = words
+        self.own[page] = 1
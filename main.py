@@ -13,6 +13,12 @@ class MainWindow(QMainWindow):
         self.terminal_page = TerminalPage(self.cpu)
         self.setCentralWidget(self.terminal_page)
 
+    def closeEvent(self, event):
+        # завершение работы — останавливаем программу и сбрасываем образ памяти в БД
+        self.terminal_page.runner.shutdown()
+        self.cpu.shutdown()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication([])
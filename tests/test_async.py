@@ -0,0 +1,108 @@
+import asyncio
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# MOV #3,R0; DEC R0; BNE .-2; HALT
+COUNTDOWN = [0o012700, 3, 0o005300, 0o001376, 0]
+# INC R0; BR .-2
+FOREVER = [0o005200, 0o000776]
+
+
+def _cpu(words):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    cpu.detect_loops = False
+    for i, w in enumerate(words):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+def test_run_to_halt():
+    cpu = _cpu(COUNTDOWN)
+    assert asyncio.run(cpu.run(0o1000, yield_every=2)) == 'halt'
+    assert cpu.regs[0] == 0 and cpu.regs[7] == 0o1012
+    assert cpu.resume_pc is None
+    assert cpu.db.get_registers()[7] == 0o1012        # sync после запуска
+
+
+def test_run_step_limit_and_resume():
+    cpu = _cpu(FOREVER)
+
+    async def main():
+        assert await cpu.run(0o1000, max_steps=101, yield_every=10) == 'steps'
+        assert cpu.regs[0] == 51 and cpu.resume_pc == 0o1002
+        # addr=None — продолжить
+        assert await cpu.run(max_steps=1) == 'steps'
+        assert cpu.resume_pc == 0o1000
+
+    asyncio.run(main())
+
+
+def test_resume_without_interrupted_run():
+    with pytest.raises(RuntimeError):
+        asyncio.run(_cpu(COUNTDOWN).run())
+
+
+def test_cancel_leaves_run_resumable():
+    cpu = _cpu(FOREVER)
+    slices = []
+
+    async def main():
+        task = asyncio.create_task(cpu.run(0o1000, yield_every=100))
+        # другие задачи получают управление между порциями
+        while cpu.regs[0] < 1000:
+            slices.append(cpu.regs[0])
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert len(slices) > 5
+    assert cpu.stop_reason == 'break'
+    assert cpu.resume_pc in (0o1000, 0o1002)
+    assert cpu.resume_pc == cpu.regs[7]
+    assert cpu.regs[0] % 50 == 0
+    n = cpu.regs[0]
+    cpu.resume(4, 0)
+    assert cpu.regs[0] == n + 2
+
+
+def test_events_stream_every_instruction():
+    cpu = _cpu(COUNTDOWN)
+
+    async def main():
+        return [rec async for rec in cpu.events(0o1000, yield_every=2)]
+
+    records = asyncio.run(main())
+    assert [r.pc for r in records] == [0o1000, 0o1004, 0o1006, 0o1004, 0o1006, 0o1004, 0o1006]
+    assert [r.next_pc for r in records][-2:] == [0o1006, 0o1010]
+    assert cpu.stop_reason == 'halt'
+
+
+def test_closing_events_breaks_the_run():
+    cpu = _cpu(FOREVER)
+
+    async def main():
+        seen = 0
+        stream = cpu.events(0o1000, yield_every=8)
+        async for rec in stream:
+            seen += 1
+            if seen == 20:
+                break
+        await stream.aclose()
+        return seen
+
+    assert asyncio.run(main()) == 20
+    assert cpu.stop_reason == 'break'
+    assert cpu.resume_pc == cpu.regs[7]
+    # прерванный запуск продолжается командой C
+    cpu.execute("C N=10")
+    assert cpu.stop_reason == 'steps'
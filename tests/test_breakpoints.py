@@ -0,0 +1,139 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.breakpoints import Breakpoints, Condition
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# 1000: MOV #3,R0; 1004: MOV R0,@#2000; 1010: DEC R0; 1012: BNE 1004; 1014: HALT
+LOOP = [0o012700, 3, 0o010037, 0o2000, 0o005300, 0o001374, 0]
+
+
+def _cpu(words=LOOP, fusion=True):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.fusion = fusion
+    cpu.max_seconds = 0
+    for i, w in enumerate(words):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_breakpoint_stops_before_instruction_and_c_resumes(fusion):
+    cpu = _cpu(fusion=fusion)
+    assert cpu.execute("BP 1010") == "BP 001010"
+    out = cpu.execute("1000G")
+    assert "ОСТАНОВ: точка останова, PC=001010" in out
+    assert cpu.stop_reason == 'breakpoint'
+    assert cpu.regs[0] == 3 and cpu.db.get_word(0o2000) == 3
+    # C исполняет команду под точкой и останавливается на ней снова
+    cpu.execute("C")
+    assert cpu.stop_reason == 'breakpoint' and cpu.regs[0] == 2
+    cpu.execute("BC 1010")
+    cpu.execute("C")
+    assert cpu.stop_reason == 'halt' and cpu.regs[0] == 0
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_conditional_breakpoint(fusion):
+    cpu = _cpu(fusion=fusion)
+    assert cpu.execute("BP 1012 IF R0=1") == "BP 001012 IF R0=1"
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'breakpoint'
+    assert cpu.resume_pc == 0o1012 and cpu.regs[0] == 1
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_write_watch_stops_after_the_write(fusion):
+    cpu = _cpu(fusion=fusion)
+    cpu.execute("WP 2000 W IF V=1")
+    out = cpu.execute("1000G")
+    assert "ОСТАНОВ: запись 002000 = 000001, PC=001010" in out
+    assert cpu.stop_reason == 'watch'
+    assert cpu.db.get_word(0o2000) == 1
+    cpu.execute("C")
+    assert cpu.stop_reason == 'halt'
+
+
+def test_read_watch():
+    # MOV @#2000,R1; MOV R1,@#2002; HALT
+    cpu = _cpu([0o013701, 0o2000, 0o010137, 0o2002, 0])
+    cpu.db.set_word(0o2000, 0o123)
+    cpu.execute("WP 2002 R")
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'halt'            # запись не задевает точку чтения
+    cpu.execute("WP 2000 R")
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'watch'
+    assert cpu._watch_hit == ('R', 0o2000, 0o123)
+    assert cpu.resume_pc == 0o1004
+
+
+def test_memory_condition_and_psw_condition():
+    cpu = _cpu()
+    cpu.execute("BP 1010 IF @2000=2")
+    cpu.execute("1000G")
+    assert cpu.resume_pc == 0o1010 and cpu.regs[0] == 2
+    cpu.execute("BC")
+    # Z выставляет DEC R0 последнего прохода
+    cpu.execute("BP 1014 IF RS&4")
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'breakpoint' and cpu.regs[0] == 0
+
+
+def test_set_list_and_clear():
+    cpu = _cpu()
+    cpu.execute("BP 1004")
+    cpu.execute("WP 2000 RW IF V>2")
+    assert cpu.execute("BP") == "BP 001004\nWP 002000 RW IF V>2"
+    assert cpu.execute("WC 2000") == "BP 001004"
+    assert "Нет точки наблюдения 002000" in cpu.execute("WC 2000")
+    assert cpu.execute("BC") == "Точек останова нет"
+    assert not cpu.breakpoints.pc[0o1004] and not cpu.breakpoints.rd[0o2000 >> 1]
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'halt'
+
+
+def test_condition_parsing():
+    with pytest.raises(ValueError):
+        Condition("R8=1")
+    with pytest.raises(ValueError):
+        Condition("V=1", allow_value=False)
+    points = Breakpoints()
+    with pytest.raises(ValueError):
+        points.set_watch(0o2000, 'X')
+    assert Condition("r3 != 17").text == "R3!=17"
+
+
+def test_no_points_share_empty_maps():
+    a, b = Breakpoints(), Breakpoints()
+    assert a.pc is b.pc and a.rd is b.rd
+    a.set_break(0o1000)
+    assert a.pc is not b.pc and not b.pc[0o1000]
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+@pytest.mark.parametrize("mode, stops", [("R", False), ("W", True), ("RW", True)])
+@pytest.mark.parametrize("addr", [0o2000, 0o2001])
+def test_byte_write_is_not_a_read(fusion, mode, stops, addr):
+    # MOVB R0,@#addr; HALT
+    cpu = _cpu([0o110037, addr, 0], fusion)
+    cpu.set_register("R0", 0o252)
+    cpu.execute(f"WP 2000 {mode}")
+    cpu.execute("1000G")
+    assert cpu.stop_reason == ('watch' if stops else 'halt')
+    if stops:
+        assert cpu._watch_hit[0] == 'W'
+    assert cpu.db.get_byte(addr) == 0o252
+
+
+def test_byte_write_is_not_counted_as_read():
+    cpu = _cpu([0o110037, 0o2001, 0])
+    cpu.execute("PROF ON")
+    cpu.execute("1000G")
+    assert cpu.profiler.reads[0o2000 >> 1] == 0
+    assert cpu.profiler.writes[0o2000 >> 1] == 1
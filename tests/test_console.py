@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import ui.console_ui as console_ui
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _terminal(monkeypatch, path, commands, end):
+    """ConsoleTerminal с БД path; ввод — commands, затем исключение end."""
+    monkeypatch.setattr(console_ui, 'CPU',
+                        lambda **kw: CPU(db_manager=DatabaseManager(db_path=str(path))))
+    feed = iter(commands)
+
+    def fake_input(prompt=""):
+        for cmd in feed:
+            return cmd
+        raise end
+
+    monkeypatch.setattr('builtins.input', fake_input)
+    return console_ui.ConsoleTerminal()
+
+
+def _saved_word(path, addr):
+    db = DatabaseManager(db_path=str(path))
+    try:
+        return db.get_word(addr)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("end", [EOFError, KeyboardInterrupt])
+def test_memory_edits_are_saved_on_exit(monkeypatch, tmp_path, capsys, end):
+    path = tmp_path / "m.db"
+    term = _terminal(monkeypatch, path, ["2000/1234", "", "bad command"], end)
+    term.run()
+    assert _saved_word(path, 0o2000) == 0o1234
+    assert "Ошибка" in capsys.readouterr().out
+
+
+def test_quit(monkeypatch, tmp_path):
+    path = tmp_path / "m.db"
+    term = _terminal(monkeypatch, path, ["2000/7", "quit", "2000/5"], EOFError)
+    term.run()
+    assert _saved_word(path, 0o2000) == 7
+
+
+@pytest.mark.parametrize("end", [EOFError, KeyboardInterrupt])
+def test_registers_and_psw_are_saved_on_exit(monkeypatch, tmp_path, end):
+    path = tmp_path / "m.db"
+    # MOV #100000,R1; HALT; после запуска правятся R3 и PSW —
+    # их в БД ещё нет
+    commands = ["1000/012701", "1002/100000", "1004/0", "1000G", "R3/777", "RS/4"]
+    _terminal(monkeypatch, path, commands, end).run()
+    db = DatabaseManager(db_path=str(path))
+    try:
+        regs = db.get_registers()
+        assert (regs[1], regs[3], regs[7]) == (0o100000, 0o777, 0o1006)
+        assert db.get_psw() == 4
+    finally:
+        db.close()
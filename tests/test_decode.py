@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.command_handlers import CommandHandlers
+from core.processor import CPU
+from data.database import DatabaseManager
+
+_TWO = {0o01: 'op_mov', 0o11: 'op_movb', 0o06: 'op_add', 0o16: 'op_sub'}
+_ONE = {'050': 'op_clr', '051': 'op_com', '052': 'op_inc', '053': 'op_dec',
+        '054': 'op_neg', '057': 'op_tst', '067': 'op_mfps', '064': 'op_mtps'}
+_BRANCHES = [(0o000400, 0o000777, 'op_br'), (0o001000, 0o001377, 'op_bne'),
+             (0o001400, 0o001777, 'op_beq'), (0o100000, 0o100377, 'op_bpl'),
+             (0o100400, 0o100777, 'op_bmi')]
+
+
+def _words(mode, reg):
+    return 1 if mode >= 6 or (reg == 7 and mode in (2, 3)) else 0
+
+
+def _legacy(word):
+    """Разбор слова цепочкой проверок, как до таблицы диспетчеризации:
+    (имя обработчика, операнды (mode, reg, is_word), константы, extra_words)."""
+    if word == 0:
+        return None, (), (), 0
+    raw = f"{word:06o}"
+    name = _TWO.get(word >> 12)
+    if name:
+        sm, sr, dm, dr = (word >> 9) & 7, (word >> 6) & 7, (word >> 3) & 7, word & 7
+        is_word = name != 'op_movb'
+        return name, ((sm, sr, is_word), (dm, dr, is_word)), (), _words(sm, sr) + _words(dm, dr)
+    name = _ONE.get(raw[1:4])
+    if name:
+        mode, reg = (word >> 3) & 7, word & 7
+        if name in ('op_mfps', 'op_mtps'):
+            return name, (), (reg,), 0
+        return name, ((mode, reg, raw[0] == '0'),), (), _words(mode, reg)
+    for first, last, name in _BRANCHES:
+        if first <= word <= last:
+            offset = word & 0xFF
+            return name, (), ((offset - 0x100 if offset & 0x80 else offset) * 2,), 0
+    if 0o000100 <= word <= 0o000177:
+        mode, reg = (word >> 3) & 7, word & 7
+        return 'op_jmp', ((mode, reg, True),), (), _words(mode, reg)
+    return 'op_unknown', (), (raw,), 0
+
+
+def test_table_matches_legacy_dispatch():
+    bad = [f"{w:06o}" for w in range(0x10000) if CommandHandlers.entry(w) != _legacy(w)]
+    assert bad == []
+
+
+def test_decode_binds_shared_operands():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    # MOV (R1)+,@#2000
+    handler, args, extra = cpu.op.decode(0o012137)
+    assert handler == cpu.op.op_mov
+    assert extra == 1
+    assert args[0] is cpu.operand(2, 1, True)
+    assert args[1] is cpu.operand(3, 7, True)
+    # INCB R3 — байтовый операнд, тот же объект при повторном разборе
+    _, (dst,), _ = cpu.op.decode(0o105203)
+    assert not dst.is_word
+    assert cpu.op.decode(0o105203)[1][0] is dst
+
+
+def test_halt_and_unknown():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    assert cpu.op.decode(0) == (None, (), 0)
+    handler, args, extra = cpu.op.decode(0o007000)
+    assert handler == cpu.op.op_unknown
+    assert handler(0o1000, *args) == ("UNKNOWN 007000", 0)
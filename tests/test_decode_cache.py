@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _cpu(words):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    for i, w in enumerate(words):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+def test_run_fills_the_cache():
+    # MOV #5,R0; INC R0; HALT
+    cpu = _cpu([0o012700, 5, 0o005200, 0])
+    cpu.execute("1000G")
+    assert cpu._decoded[0o1000][3] == 0o012700
+    assert cpu._decoded[0o1004][3] == 0o005200
+    # слово #5 — часть команды с 1000, своей записи у него нет
+    assert 0o1002 not in cpu._decoded
+    assert cpu._code_refs[0o1002 >> 1] == 1
+
+
+def test_write_over_opcode():
+    # INC R0 -> DEC R0
+    cpu = _cpu([0o012700, 5, 0o005200, 0])
+    cpu.execute("1000G")
+    cpu.execute("1004/005300")
+    assert 0o1004 not in cpu._decoded
+    assert 0o1000 in cpu._decoded
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 4
+
+
+def test_write_into_extra_word():
+    # MOV #5,R0; MOV R0,@#2000; HALT — правим и #5, и адрес @#2000
+    cpu = _cpu([0o012700, 5, 0o010037, 0o2000, 0])
+    cpu.execute("1000G")
+    cpu.execute("1002/7")
+    assert 0o1000 not in cpu._decoded
+    assert 0o1004 in cpu._decoded
+    cpu.execute("1006/3000")
+    assert 0o1004 not in cpu._decoded
+    assert not any(cpu._code_refs[0o1000 >> 1:0o1010 >> 1])
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 7
+    assert cpu.db.get_word(0o3000) == 7 and cpu.db.get_word(0o2000) == 5
+
+
+def test_program_writes_own_next_instruction():
+    # MOV #005300,@#1006 (INC R0 -> DEC R0); 1006: INC R0; HALT
+    cpu = _cpu([0o012737, 0o005300, 0o1006, 0o005200, 0])
+    cpu.execute("1006G")
+    assert cpu.regs[0] == 1
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 0
+    assert cpu._decoded[0o1006][3] == 0o005300
+
+
+def test_write_before_an_instruction_keeps_it():
+    cpu = _cpu([0o005200, 0])
+    cpu.execute("1000G")
+    cpu.execute("776/1")
+    cpu.execute("1002/0")
+    assert 0o1000 in cpu._decoded
+
+
+def test_invalidate_code_clears_everything():
+    cpu = _cpu([0o012700, 5, 0o005200, 0])
+    cpu.execute("1000G")
+    cpu.invalidate_code()
+    assert not cpu._decoded
+    assert not any(cpu._code_refs)
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core import snapshot
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# 1000: MOV #2,R0; 1004: MOV R0,@#2000; 1010: DEC R0; 1012: BNE 1004; 1014: HALT
+LOOP = [0o012700, 2, 0o010037, 0o2000, 0o005300, 0o001374, 0]
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    for i, w in enumerate(LOOP):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.set_register("R7", 0o1000)
+    return cpu
+
+
+def test_diff_before_any_run():
+    assert "запусков ещё не было" in _cpu().execute("DIFF")
+
+
+def test_diff_after_run():
+    cpu = _cpu()
+    cpu.db.set_word(0o2000, 0o777)
+    cpu.execute("1000G")
+    assert cpu.execute("DIFF").split("\n") == [
+        "R7: 001000 -> 001016",
+        "RS: 000 -> 004",
+        "002000: 000777 -> 000001",
+    ]
+
+
+def test_diff_ignores_edits_after_the_run():
+    cpu = _cpu()
+    cpu.execute("1000G")
+    before = cpu.changes_since_run()
+    cpu.execute("2000/5")
+    cpu.execute("R3/7")
+    assert cpu.changes_since_run() == before
+
+
+def test_diff_after_steps():
+    cpu = _cpu()
+    cpu.execute("3S")
+    assert cpu.execute("DIFF").split("\n") == [
+        "R0: 000000 -> 000001",
+        "R7: 001000 -> 001012",
+        "002000: 000000 -> 000002",
+    ]
+    cpu.execute("2S")
+    # база — начало последнего S, а не первого
+    assert cpu.execute("DIFF").split("\n") == [
+        "R7: 001012 -> 001010",
+        "002000: 000002 -> 000001",
+    ]
+
+
+def test_run_that_changes_only_pc():
+    cpu = _cpu()
+    for i, w in enumerate([0o000240, 0]):  # NOP; HALT
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.execute("1000G")
+    assert cpu.execute("DIFF") == "R7: 001000 -> 001004"
+
+
+def test_diff_against_snapshot_files(tmp_path):
+    a, b = str(tmp_path / "a.snp"), str(tmp_path / "b.snp")
+    cpu = _cpu()
+    cpu.execute(f"SAVE {a}")
+    cpu.execute("1000G")
+    cpu.execute("3000/17")
+    cpu.execute(f"SAVE {b} Z")
+    expected = [
+        "R7: 001000 -> 001016",
+        "RS: 000 -> 004",
+        "002000: 000000 -> 000001",
+        "003000: 000000 -> 000017",
+    ]
+    assert cpu.execute(f"DIFF {a} {b}").split("\n") == expected
+    # с одним файлом — против текущего состояния
+    assert cpu.execute(f"DIFF {a}").split("\n") == expected
+    cpu.execute("3000/0")
+    assert cpu.execute(f"DIFF {a}").split("\n") == expected[:3]
+    assert cpu.execute(f"DIFF {b} {b}") == "Изменений нет"
+
+
+@pytest.mark.parametrize("addr", [0o776, 0o2000, 0o177776])
+def test_diff_pages_matches_full_diff(addr):
+    cpu = _cpu()
+    old = cpu.snapshot()
+    base = cpu.db.mem.freeze()
+    cpu.db.set_word(addr, 0o4321)
+    changed = snapshot.diff_pages(base, cpu.db.mem.pages)
+    assert snapshot.diff(old, cpu.snapshot(), changed) == snapshot.diff(old, cpu.snapshot())
+    assert snapshot.diff(old, cpu.snapshot()) == [f"{addr:06o}: 000000 -> 004321"]
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.flags import cc_add, cc_mov, cc_tst
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _cpu():
+    return CPU(db_manager=DatabaseManager(db_path=":memory:"))
+
+
+def _run(words, regs=(), psw=None):
+    """Программа с 1000 (в конце — останов), R0..Rn = regs, PSW = psw; G."""
+    cpu = _cpu()
+    for i, w in enumerate(list(words) + [0]):
+        cpu.execute(f"{0o1000 + 2 * i:o}/{w:o}")
+    for r, v in enumerate(regs):
+        cpu.execute(f"R{r}/{v:o}")
+    if psw is not None:
+        cpu.execute(f"RS/{psw:o}")
+    cpu.execute("1000G")
+    return cpu
+
+
+@pytest.mark.parametrize("words, regs, psw, expected", [
+    # ADD R1,R2: 1 + 177777 = 0 -> Z, C
+    ([0o060102], (0, 1, 0o177777), 0, 0o5),
+    # ... и MOV R3,R4 после неё: N Z V от MOV, C остаётся от ADD
+    ([0o060102, 0o010304], (0, 1, 0o177777, 5), 0, 0o1),
+    # MOV за MOV: C — тот, что был в PSW до запуска
+    ([0o012700, 0, 0o010001], (), 0o1, 0o5),
+    # TST R0 с отрицательным R0: N, C и V сброшены
+    ([0o005700], (0o100000,), 0o3, 0o10),
+    # INCB R0: 177 -> 200, N и V
+    ([0o105200], (0o177,), 0, 0o12),
+    # DEC R0 от 100000 -> 77777, V
+    ([0o005300], (0o100000,), 0, 0o2),
+    # старшие биты PSW (приоритет) признаки не трогают
+    ([0o005000], (), 0o340, 0o344),
+])
+def test_psw_after_run(words, regs, psw, expected):
+    assert _run(words, regs, psw).get_psw() == expected
+
+
+def test_branch_sees_pending_flags():
+    # MOV #3,R0; DEC R0; BNE .-2; — BNE читает Z от DEC, который ещё не в PSW
+    cpu = _run([0o012700, 3, 0o005300, 0o001376, 0o005201], (0, 0))
+    assert cpu.regs[0] == 0
+    assert cpu.regs[1] == 1
+    # последняя — INC R1 (результат 1): все признаки сброшены
+    assert cpu.get_psw() == 0
+
+
+def test_set_psw_drops_pending_flags():
+    cpu = _cpu()
+    cpu.set_cc(cc_tst, 0)
+    cpu.set_psw(0o10)
+    assert cpu.get_psw() == 0o10
+
+
+def test_mov_resolves_previous_record():
+    cpu = _cpu()
+    cpu.set_psw(0)
+    cpu.set_cc(cc_add, 0, 1, 0o177777)      # C = 1 ещё не посчитан
+    cpu.set_cc(cc_mov, 5)
+    assert cpu.get_psw() == 0o1
+
+
+def test_sync_writes_materialized_psw():
+    cpu = _run([0o060102], (0, 1, 0o177777), 0)
+    cpu.sync()
+    assert cpu.db.get_psw() == 0o5
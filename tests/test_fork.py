@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.database import DatabaseManager
+from data.memory import MemoryImage, PAGE_COUNT
+from core.processor import CPU
+
+# MOV #5,R0; MOV R0,@#2000; INC R1; HALT
+PROGRAM = [0o012700, 5, 0o010037, 0o2000, 0o005201, 0]
+
+
+def _base(path):
+    cpu = CPU(db_manager=DatabaseManager(db_path=str(path)))
+    cpu.max_seconds = 0
+    for i, w in enumerate(PROGRAM):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.db.set_word(0o2000, 0o1111)
+    cpu.set_register("R1", 0o10)
+    cpu.sync()
+    return cpu
+
+
+def test_fork_shares_pages_until_written():
+    mem = MemoryImage()
+    mem.write_word(0o2000, 1)
+    child = mem.fork()
+    assert all(a is b for a, b in zip(mem.pages, child.pages))
+    assert not any(mem.own) and not any(child.own)
+    child.write_word(0o2000, 2)
+    # копируется только записанная страница, и только у того, кто пишет
+    p = 0o2000 >> 9
+    assert child.pages[p] is not mem.pages[p]
+    assert sum(a is not b for a, b in zip(mem.pages, child.pages)) == 1
+    assert mem.read_word(0o2000) == 1 and child.read_word(0o2000) == 2
+    assert list(child.dirty_pages()) == [p]
+
+
+def test_parent_write_after_freeze_copies_the_page():
+    mem = MemoryImage()
+    mem.write_word(0o3000, 7)
+    frozen = mem.freeze()
+    page = mem.pages[0o3000 >> 9]
+    mem.write_word(0o3000, 8)
+    assert mem.pages[0o3000 >> 9] is not page
+    assert frozen[0o3000 >> 9][0] == 7
+    # повторная запись в ту же страницу уже не копирует её
+    page = mem.pages[0o3000 >> 9]
+    mem.write_word(0o3002, 9)
+    assert mem.pages[0o3000 >> 9] is page
+    assert sum(mem.own) == 1 and len(frozen) == PAGE_COUNT
+
+
+def test_fork_runs_independently(tmp_path):
+    parent = _base(tmp_path / "m.db")
+    child = parent.fork()
+    child.execute("1000G")
+    assert child.regs[0] == 5 and child.regs[1] == 0o11
+    assert child.db.get_word(0o2000) == 5
+    # родитель не видит ни памяти, ни регистров развилки
+    assert parent.db.get_word(0o2000) == 0o1111
+    assert parent.regs[0] == 0 and parent.regs[1] == 0o10
+
+    parent.execute("2000/4444")
+    parent.execute("R1/0")
+    assert child.db.get_word(0o2000) == 5 and child.regs[1] == 0o11
+
+
+def test_forks_of_one_base_do_not_see_each_other(tmp_path):
+    parent = _base(tmp_path / "m.db")
+    forks = [parent.fork() for _ in range(3)]
+    for i, child in enumerate(forks):
+        child.set_register("R1", i)
+        child.execute("1000G")
+    assert [c.regs[1] for c in forks] == [1, 2, 3]
+    forks[0].execute("2000/7")
+    assert [c.db.get_word(0o2000) for c in forks] == [7, 5, 5]
+
+
+def test_fork_keeps_modes_but_not_points(tmp_path):
+    parent = _base(tmp_path / "m.db")
+    parent.fusion = False
+    parent.max_steps = 123
+    parent.execute("BP 1004")
+    child = parent.fork()
+    assert not child.fusion and child.max_steps == 123
+    assert not child.breakpoints.has_breaks
+    assert child.history.depth == 1
+    child.execute("1000G")
+    assert child.stop_reason == 'halt'
+
+
+def test_child_shutdown_leaves_parent_database_alone(tmp_path):
+    path = tmp_path / "m.db"
+    parent = _base(path)
+    child = parent.fork()
+    child.execute("1000G")
+    child.execute("3000/1")
+    child.shutdown()
+    assert child.db.get_registers()[1] == 0o11
+    parent.shutdown()
+
+    again = DatabaseManager(db_path=str(path))
+    try:
+        assert again.get_word(0o2000) == 0o1111
+        assert again.get_word(0o3000) == 0
+        assert again.get_registers()[1] == 0o10
+    finally:
+        again.close()
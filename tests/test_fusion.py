@@ -0,0 +1,282 @@
+import random
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.fusion import FusedHandlers
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _cpu(words, fusion, regs=(), data=(), blocks=True):
+    """Программа с 1000 (в конце — останов), данные с 2000."""
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.fusion = fusion
+    cpu.compile_blocks = blocks
+    # останов по зацикливанию зависит от того, где цикл G сверяется
+    cpu.detect_loops = False
+    cpu.max_seconds = 0
+    for i, w in enumerate(list(words) + [0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    if data:
+        for i, w in enumerate(data):
+            cpu.db.set_word(0o2000 + 2 * i, w)
+    for r, v in enumerate(regs):
+        cpu.regs[r] = v
+    return cpu
+
+
+def _run(words, fusion, regs=(), data=(), limit=0, blocks=True):
+    """_cpu и G с 1000 с пределом limit."""
+    cpu = _cpu(words, fusion, regs, data, blocks)
+    cpu.run_at(0o1000, limit, 0)
+    return cpu
+
+
+def _state(cpu):
+    return (cpu.regs.tolist(), cpu.get_psw(), cpu.db.mem.to_bytes(), cpu.cycles,
+            cpu.stop_reason, cpu.resume_pc)
+
+
+def _same(words, **kw):
+    """Исполняет программу по одной команде и с суперкомандами; состояние,
+    включая такты, должно совпасть. Возвращает CPU второго запуска."""
+    plain = _run(words, False, **kw)
+    fast = _run(words, True, **kw)
+    assert _state(fast) == _state(plain)
+    return fast
+
+
+def _fused(cpu) -> bool:
+    return any(ent[7] > 1 for ent in cpu._fused.values())
+
+
+LIMITS = [0, 1, 2, 5, 16, 17, 100]
+
+
+@pytest.mark.parametrize("limit", LIMITS)
+def test_dec_bne(limit):
+    # DEC R0; BNE .-2; INC R1
+    cpu = _same([0o005300, 0o001376, 0o005201], regs=(100,), limit=limit)
+    if not limit:
+        assert cpu.regs[0] == 0 and cpu.regs[1] == 1
+        assert _fused(cpu)
+
+
+@pytest.mark.parametrize("limit", LIMITS)
+def test_tst_bne_scan(limit):
+    # TST (R1)+; BNE .-2 — поиск нулевого слова
+    data = list(range(1, 40)) + [0]
+    cpu = _same([0o005721, 0o001376], regs=(0, 0o2000), data=data, limit=limit)
+    if not limit:
+        assert cpu.regs[1] == 0o2000 + 2 * len(data)
+
+
+@pytest.mark.parametrize("limit", LIMITS)
+def test_tst_beq(limit):
+    # TST R0; BEQ +1; INC R1; DEC R0; BNE .-10
+    _same([0o005700, 0o001401, 0o005201, 0o005300, 0o001373], regs=(7,), limit=limit)
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_short_copy(count):
+    # MOV (R1)+,(R2)+; DEC R3; BNE .-4 — на массовое копирование не хватает итераций
+    cpu = _same([0o012122, 0o005303, 0o001375], regs=(0, 0o2000, 0o3000, count), data=[5, 6])
+    assert list(cpu.db.read_range(0o3000, count)) == [5, 6][:count]
+
+
+def test_copy_overwrites_its_own_dec_bne():
+    # MOV (R1)+,(R2)+ пишет поверх DEC R3 / BNE той же суперкоманды:
+    # остаток исполняется по новому коду, такты неисполненных не считаются
+    cpu = _same([0o012122, 0o005303, 0o001375],
+                regs=(0, 0o2000, 0o1002, 5), data=[0o005303, 0o005303, 0o000240, 0])
+    # второй MOV превращает BNE в DEC R3: 5 -> 4 -> 3 -> 2, затем останов
+    assert cpu.regs[3] == 2
+
+
+def test_clear_overwrites_its_own_dec_bne():
+    # CLR (R1)+ затирает DEC R3: дальше — останов
+    cpu = _same([0o005021, 0o005303, 0o001375], regs=(0, 0o1002, 0, 4))
+    assert cpu.regs[3] == 4
+
+
+def _random_program(rng):
+    words = []
+    for _ in range(rng.randrange(3, 12)):
+        r = rng.randrange(6)
+        k = rng.random()
+        if k < .25:
+            # DEC/BNE назад или вперёд
+            words += [0o005300 | r, 0o001000 | ((-rng.randrange(1, 6)) & 0xFF if rng.random() < .7 else rng.randrange(1, 4))]
+        elif k < .45:
+            words += [rng.choice([0o005700, 0o105700]) | (rng.choice([0, 1, 2, 3, 4]) << 3) | r,
+                      rng.choice([0o001000, 0o001400]) | rng.randrange(1, 6)]
+        elif k < .65:
+            words += [0o012000 | (2 << 9) | (rng.randrange(6) << 6) | (2 << 3) | rng.randrange(6),
+                      0o005300 | r, 0o001000 | ((-rng.randrange(2, 5)) & 0xFF)]
+        elif k < .8:
+            words += [0o012700 | r, rng.choice([3, 5, 0o2000, 0o1000 + 2 * rng.randrange(20), rng.randrange(65536)])]
+        else:
+            words += [rng.choice([0o005200, 0o005000, 0o005400, 0o105300]) | (rng.choice([0, 1, 2]) << 3) | r]
+    return words
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_programs(seed):
+    # указатели и в данные, и в сам код — самомодификация
+    rng = random.Random(seed)
+    for _ in range(50):
+        regs = [rng.choice([0o2000, 0o2000 + 2 * rng.randrange(32), 0o1000 + 2 * rng.randrange(10),
+                            rng.randrange(1, 40), rng.randrange(65536)]) for _ in range(6)]
+        data = [rng.choice([0, 0, rng.randrange(65536)]) for _ in range(64)]
+        _same(_random_program(rng), regs=regs, data=data, limit=rng.choice([1, 3, 7, 50, 333, 2000]))
+
+
+# ---------- Массовые циклы копирования и заполнения ----------
+
+@pytest.fixture
+def bulk(monkeypatch):
+    """Список итераций, исполненных массово (по одному числу на вызов)."""
+    done = []
+    real = FusedHandlers._bulk_done
+
+    def spy(self, pc, d, c, k, cycles):
+        done.append(k)
+        return real(self, pc, d, c, k, cycles)
+
+    monkeypatch.setattr(FusedHandlers, '_bulk_done', spy)
+    return done
+
+
+COPY = [0o012122, 0o005303, 0o001375]       # MOV (R1)+,(R2)+; DEC R3; BNE .-4
+CLEAR = [0o005021, 0o005302, 0o001375]      # CLR (R1)+; DEC R2; BNE .-4
+
+
+@pytest.mark.parametrize("limit", [0, 17, 100, 1500, 3001])
+def test_bulk_copy(bulk, limit):
+    data = list(range(1, 1001))
+    cpu = _same(COPY, regs=(0, 0o2000, 0o10000, len(data)), data=data, limit=limit)
+    if not limit:
+        assert bulk
+        assert list(cpu.db.read_range(0o10000, len(data))) == data
+
+
+@pytest.mark.parametrize("limit", [0, 17, 1500])
+def test_bulk_clear(bulk, limit):
+    cpu = _same(CLEAR, regs=(0, 0o2000, 1000), data=[0o177777] * 1001, limit=limit)
+    if not limit:
+        assert bulk
+        assert list(cpu.db.read_range(0o2000, 1001)) == [0] * 1000 + [0o177777]
+
+
+def test_overlapping_copy_is_not_bulk(bulk):
+    # приёмник на слово впереди источника: первое слово размножается
+    cpu = _same(COPY, regs=(0, 0o2000, 0o2002, 100), data=[7, 1, 2, 3])
+    assert not bulk
+    assert list(cpu.db.read_range(0o2000, 101)) == [7] * 101
+
+
+def test_copy_into_the_loop_is_not_bulk(bulk):
+    # приёмник накрывает сам цикл: копия NOP затирает MOV
+    data = [0o000240] * 10
+    _same(COPY, regs=(0, 0o2000, 0o776, 10), data=data)
+    assert not bulk
+
+
+def test_bulk_copy_over_cached_code(bulk):
+    # 1000: цикл копирования, 1006: BR 1020; код с 1020 исполнен заранее
+    # (INC R4) и массовая копия заменяет его на INC R5 x3 — исполнится новый
+    words = COPY + [0o000404, 0, 0, 0, 0, 0o005204, 0]
+    data = [0o005205] * 3 + [0]
+    states = []
+    for fusion in (False, True):
+        cpu = _cpu(words, fusion, data=data)
+        cpu.run_at(0o1020, 0, 0)
+        assert cpu.regs[4] == 1
+        cpu.regs[1], cpu.regs[2], cpu.regs[3] = 0o2000, 0o1020, len(data)
+        cpu.run_at(0o1000, 0, 0)
+        assert cpu.regs[5] == 3 and cpu.regs[4] == 1
+        states.append(_state(cpu))
+    assert states[0] == states[1]
+    assert bulk
+
+
+# ---------- Блоки ----------
+
+# MOV #5,R0; ADD R0,R1; INC R2; MOV R1,@#2000; SUB R2,R1; TST R1; DEC R0; BNE .-14
+STRAIGHT = [0o012700, 5, 0o060001, 0o005202, 0o010137, 0o2000, 0o160201, 0o005701,
+            0o005300, 0o001370]
+
+
+@pytest.mark.parametrize("limit", [0, 1, 3, 16, 17, 20])
+def test_block(limit):
+    cpu = _same(STRAIGHT, limit=limit)
+    if not limit:
+        assert cpu.compiler.compiled
+
+
+def test_block_matches_fusion_without_blocks():
+    plain = _run(STRAIGHT, True, blocks=False)
+    assert not plain.compiler.compiled
+    assert _state(_run(STRAIGHT, True)) == _state(plain)
+
+
+def test_block_rewrites_later_instruction():
+    # MOV #<INC R5>,@#1014 заменяет INC R1 дальше в том же блоке
+    cpu = _same([0o012737, 0o005205, 0o1014, 0o005200, 0o005200, 0o005200, 0o005201])
+    assert cpu.compiler.compiled
+    assert cpu.regs[5] == 1 and cpu.regs[1] == 0 and cpu.regs[0] == 3
+
+
+def test_block_rewritten_between_passes():
+    # цикл: блок INC R1 / MOV R3,(R2) / INC R0 / DEC R4 / BNE; первый проход
+    # переписывает INC R1 на NOP (R3) — второй исполняет уже новый код
+    words = [0o005201, 0o010312, 0o005200, 0o005304, 0o001373]
+    cpu = _same(words, regs=(0, 0, 0o1000, 0o000240, 3))
+    assert cpu.regs[1] == 1 and cpu.regs[0] == 3
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_programs_with_blocks(seed):
+    # как test_random_programs, но с ветвлениями назад и R0..R5, указывающими в код
+    rng = random.Random(100 + seed)
+    branches = (0o000400, 0o001000, 0o001400, 0o100000, 0o100400)
+    for _ in range(50):
+        words = _random_program(rng)
+        for i, w in enumerate(words):
+            if (w & 0o177400) in branches and rng.random() < .4:
+                words[i] = (w & 0o177400) | ((-rng.randrange(1, 10)) & 0xFF)
+        regs = [rng.choice([0o2000, 0o2000 + 2 * rng.randrange(32), 0o1000 + 2 * rng.randrange(len(words) + 2),
+                            rng.randrange(1, 40)]) for _ in range(6)]
+        data = [rng.choice([0, 0, rng.randrange(65536)]) for _ in range(64)]
+        _same(words, regs=regs, data=data, limit=rng.choice([17, 50, 333, 1000, 2000]))
+
+
+def test_write_into_extra_word_drops_blocks():
+    # адрес @#2000 команды MOV R1,@#2000 (1010) лежит внутри блоков с 1000 и 1004
+    cpu = _run(STRAIGHT, True)
+    assert {0o1000, 0o1004} <= set(cpu._fused)
+    cpu.execute("1012/3000")
+    assert 0o1010 not in cpu._decoded
+    assert 0o1000 not in cpu._fused and 0o1004 not in cpu._fused
+    assert 0o1012 >> 1 not in cpu._block_cover
+    cpu.run_at(0o1000, 0, 0)
+    plain = _run(STRAIGHT, False)
+    plain.execute("1012/3000")
+    plain.run_at(0o1000, 0, 0)
+    assert _state(cpu) == _state(plain)
+    assert cpu.db.get_word(0o3000) != 0
+
+
+def test_block_write_after_the_writer_drops_the_block():
+    # 1000: MOV #7,@#1014 — пишет в слово #5 команды MOV #5,R0 (1012) того же блока
+    words = [0o012737, 7, 0o1014, 0o005202, 0o005202, 0o012700, 5]
+    cpu = _same(words)
+    assert cpu.regs[0] == 7
+    # блок с 1000 выброшен; остаток исполнен новым блоком с 1006
+    assert 0o1000 not in cpu._fused
+    assert cpu._block_cover[0o1014 >> 1] == [0o1006]
+    assert cpu._decoded[0o1012][3] == 0o012700
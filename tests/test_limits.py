@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# INC R0; BR .-2
+COUNTER = [0o005200, 0o000776]
+# MOV (R1)+,(R2)+; DEC R3; BNE .-4; HALT — суперкоманда и массовое копирование
+COPY = [0o012122, 0o005303, 0o001375, 0]
+COUNT = 0o1000
+
+# предел меньше, равен и больше BLOCK_MAX, у границ сверок времени и далеко за ними
+LIMITS = [1, 2, 3, 15, 16, 17, 18, 100, 1023, 1024, 1025, 1500]
+
+
+def _cpu(words, fusion, **regs):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.fusion = fusion
+    cpu.max_seconds = 0
+    for i, w in enumerate(words):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    for name, v in regs.items():
+        cpu.set_register(name, v)
+    return cpu
+
+
+def _copy_cpu(fusion):
+    cpu = _cpu(COPY, fusion, R1=0o2000, R2=0o20000, R3=COUNT)
+    for i, w in enumerate(range(1, COUNT + 1)):
+        cpu.db.set_word(0o2000 + 2 * i, w)
+    return cpu
+
+
+def _copy_state_after(n):
+    """R1, R2, R3 и PC копирования после n команд, n < 3 * COUNT."""
+    k, r = divmod(n, 3)
+    moved = k + (r >= 1)
+    return [0o2000 + 2 * moved, 0o20000 + 2 * moved, COUNT - k - (r == 2), 0o1000 + 2 * r]
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+@pytest.mark.parametrize("n", LIMITS)
+def test_counter_stops_after_exactly_n(fusion, n):
+    cpu = _cpu(COUNTER, fusion)
+    cpu.run_at(0o1000, n, 0)
+    assert cpu.stop_reason == 'steps'
+    assert cpu.regs[0] == (n + 1) // 2
+    assert cpu.resume_pc == cpu.regs[7] == (0o1002 if n % 2 else 0o1000)
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+@pytest.mark.parametrize("n", LIMITS)
+def test_copy_stops_after_exactly_n(fusion, n):
+    cpu = _copy_cpu(fusion)
+    cpu.run_at(0o1000, n, 0)
+    assert cpu.stop_reason == 'steps'
+    r1, r2, r3, pc = _copy_state_after(n)
+    assert [cpu.regs[1], cpu.regs[2], cpu.regs[3], cpu.resume_pc] == [r1, r2, r3, pc]
+    moved = (r2 - 0o20000) // 2
+    assert list(cpu.db.read_range(0o20000, moved + 1)) == list(range(1, moved + 1)) + [0]
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_global_max_steps(fusion):
+    cpu = _cpu(COUNTER, fusion)
+    cpu.max_steps = 1001
+    out = cpu.execute("1000G")
+    assert "предел шагов" in out
+    assert cpu.regs[0] == 501
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_continue_resumes_where_limit_stopped(fusion):
+    cpu = _copy_cpu(fusion)
+    cpu.run_at(0o1000, 17, 0)
+    done = 17
+    for n in (1, 2, 40, 1000):
+        cpu.resume(n, 0)
+        done += n
+        assert cpu.stop_reason == 'steps'
+        assert [cpu.regs[1], cpu.regs[2], cpu.regs[3], cpu.resume_pc] == _copy_state_after(done)
+    cpu.resume(0, 0)
+    assert cpu.stop_reason == 'halt'
+    assert cpu.resume_pc is None
+    assert cpu.regs[3] == 0
+    assert list(cpu.db.read_range(0o20000, COUNT)) == list(range(1, COUNT + 1))
@@ -0,0 +1,99 @@
+import sys
+from array import array
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.loader import parse_binary, parse_listing, read_program
+from core.processor import CPU
+from data.database import DatabaseManager
+
+LISTING = """\
+; счётчик
+1000/012700          ; MOV #3,R0
+1002/3
+1004: 005300 001376  # DEC R0; BNE .-2
+      000000
+2000:
+177777
+1
+"""
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    return cpu
+
+
+def test_listing_forms():
+    runs = parse_listing(LISTING)
+    assert runs == [(0o1000, array('H', [0o012700, 3, 0o005300, 0o001376, 0])),
+                    (0o2000, array('H', [0o177777, 1]))]
+
+
+def test_listing_out_of_order_addresses():
+    runs = parse_listing("2000/1\n1000/2\n1002/3\n2002/4\n")
+    assert runs == [(0o2000, array('H', [1])), (0o1000, array('H', [2, 3])),
+                    (0o2002, array('H', [4]))]
+
+
+@pytest.mark.parametrize("text, message", [
+    ("012700\n", "строка 1: слова без адреса"),
+    ("1000/012789\n", "строка 1: слово '012789' — не восьмеричное число"),
+    ("1000/200000\n", "строка 1: слово 200000 больше 177777"),
+    ("\n1001/1\n", "строка 2: нечётный адрес 001001"),
+    ("177776: 1 2\n", "строка 1: выход за конец памяти"),
+])
+def test_listing_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_listing(text)
+
+
+def test_binary_is_little_endian():
+    assert parse_binary(bytes([0o300, 0o25, 1, 0]), 0o1000) == [(0o1000, array('H', [0o012700, 1]))]
+    assert parse_binary(b'', 0o1000) == []
+
+
+@pytest.mark.parametrize("data, addr", [(b'\0\0', 0o1001), (b'\0', 0o1000), (b'\0\0\0\0', 0o177776)])
+def test_binary_errors(data, addr):
+    with pytest.raises(ValueError):
+        parse_binary(data, addr)
+
+
+def test_prog_command_loads_listing(tmp_path):
+    path = tmp_path / "p.lst"
+    path.write_text(LISTING, encoding='utf-8')
+    cpu = _cpu()
+    assert cpu.execute(f"PROG {path}") == f"PROG {path}: 7 слов, 001000..001010, 002000..002002"
+    assert list(cpu.db.read_range(0o1000, 5)) == [0o012700, 3, 0o005300, 0o001376, 0]
+    cpu.execute("1000G")
+    assert cpu.stop_reason == 'halt' and cpu.regs[0] == 0
+
+
+def test_prog_command_loads_binary(tmp_path):
+    path = tmp_path / "p.bin"
+    words = array('H', [0o012700, 3, 0o005300, 0o001376, 0])
+    path.write_bytes(b''.join(w.to_bytes(2, 'little') for w in words))
+    cpu = _cpu()
+    assert cpu.execute(f"PROG {path} 3000") == f"PROG {path}: 5 слов, 003000..003010"
+    assert list(cpu.db.read_range(0o3000, 5)) == list(words)
+    assert read_program(str(path), 0o3000) == [(0o3000, words)]
+
+
+def test_load_replaces_cached_code():
+    cpu = _cpu()
+    cpu.load_words(parse_listing("1000: 005200 000000"))      # INC R0; HALT
+    cpu.execute("1000G")
+    cpu.load_words(parse_listing("1000: 005300"))             # DEC R0
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 0
+
+
+def test_load_checks_the_whole_listing_first():
+    cpu = _cpu()
+    with pytest.raises(RuntimeError):
+        cpu.load_words(parse_listing("2000/1\n160000/2\n"))
+    assert cpu.db.get_word(0o2000) == 0
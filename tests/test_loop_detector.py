@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.loop_detector import LoopDetector
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _cpu(words, fusion=True):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.fusion = fusion
+    cpu.detect_loops = True
+    cpu.max_seconds = 0
+    for i, w in enumerate(list(words) + [0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+@pytest.mark.parametrize("words", [
+    [0o000777],                         # BR .
+    [0o005200, 0o005300, 0o000775],     # INC R0; DEC R0; BR .-4
+    [0o005137, 0o2000, 0o000775],       # COM @#2000; BR .-4 — память с периодом 2
+    [0o012700, 0o10, 0o005300, 0o001376, 0o000773],     # пустой цикл задержки по кругу
+])
+def test_repeating_state_is_a_loop(words, fusion):
+    cpu = _cpu(words, fusion)
+    cpu.run_at(0o1000, 1_000_000, 0)
+    assert cpu.stop_reason == 'loop'
+    assert cpu.resume_pc is not None
+    assert "зациклилась" in cpu.stop_note()
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+@pytest.mark.parametrize("words", [
+    [0o005200, 0o000776],               # INC R0; BR .-2 — счётчик в регистре
+    [0o005237, 0o2000, 0o000775],       # INC @#2000; BR .-4 — счётчик в памяти
+])
+def test_progressing_program_is_not_a_loop(words, fusion):
+    cpu = _cpu(words, fusion)
+    cpu.run_at(0o1000, 100_000, 0)
+    assert cpu.stop_reason == 'steps'
+
+
+def test_detection_can_be_switched_off():
+    cpu = _cpu([0o000777])
+    cpu.detect_loops = False
+    cpu.run_at(0o1000, 10_000, 0)
+    assert cpu.stop_reason == 'steps'
+
+
+def test_reference_memory_is_not_changed_by_later_writes():
+    cpu = _cpu([])
+    detector = LoopDetector()
+    assert not detector.check(cpu)          # опорный снимок
+    cpu.db.set_word(0o2000, 5)
+    assert not detector.check(cpu)          # регистры те же, память — нет
+    cpu.db.set_word(0o2000, 0)
+    assert detector.check(cpu)              # всё как в опорном снимке
+    assert detector.checks == 3
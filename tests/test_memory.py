@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data.database import DatabaseManager
+
+
+def _reopen(path):
+    db = DatabaseManager(db_path=str(path))
+    try:
+        return [db.get_word(a) for a in (0o1000, 0o2000, 0o177776)]
+    finally:
+        db.close()
+
+
+def test_writes_reach_the_file_only_on_flush(tmp_path):
+    path = tmp_path / "m.db"
+    db = DatabaseManager(db_path=str(path))
+    db.set_word(0o1000, 0o12345)
+    db.set_word(0o177776, 0o177777)
+    assert db.get_word(0o1000) == 0o12345
+    assert _reopen(path) == [0, 0, 0]
+    db.flush()
+    assert _reopen(path) == [0o12345, 0, 0o177777]
+    db.close()
+
+
+def test_only_dirty_pages_are_written(tmp_path):
+    path = tmp_path / "m.db"
+    db = DatabaseManager(db_path=str(path))
+    db.set_word(0o1000, 1)
+    db.set_byte(0o2001, 0o377)
+    assert db.mem.dirty_pages() == [0o1000 >> 9, 0o2000 >> 9]
+    db.flush()
+    assert db.mem.dirty_pages() == []
+    db.close()
+    assert _reopen(path) == [1, 0o177400, 0]
+
+
+def test_close_flushes(tmp_path):
+    path = tmp_path / "m.db"
+    db = DatabaseManager(db_path=str(path))
+    db.set_word(0o2000, 0o777)
+    db.close()
+    assert _reopen(path) == [0, 0o777, 0]
+
+
+def test_write_through(tmp_path):
+    path = tmp_path / "m.db"
+    db = DatabaseManager(db_path=str(path), write_through=True)
+    db.set_word(0o2000, 5)
+    assert _reopen(path) == [0, 5, 0]
+    db.close()
+
+
+def test_bytes_and_words_share_the_image():
+    db = DatabaseManager(db_path=":memory:")
+    db.set_word(0o2000, 0o123456)
+    assert db.get_byte(0o2000) == 0o123456 & 0xFF
+    assert db.get_byte(0o2001) == 0o123456 >> 8
+    db.set_byte(0o2000, 0)
+    assert db.get_word(0o2000) == 0o123400
+    assert db.get_memory_bytes(0o2000) == (0o247, 0)
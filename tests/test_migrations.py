@@ -0,0 +1,77 @@
+import sqlite3
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from data.database import DatabaseManager
+
+
+def _v1_db(path, words):
+    """БД старой схемы (v1): байты памяти строками '01010101', без таблицы версий."""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE memory_bytes(
+            addr_even INTEGER PRIMARY KEY,
+            hi TEXT NOT NULL CHECK(length(hi)=8),
+            lo TEXT NOT NULL CHECK(length(lo)=8)
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE registers(
+            reg INTEGER PRIMARY KEY CHECK(reg BETWEEN 0 AND 7),
+            value INTEGER NOT NULL CHECK(value BETWEEN 0 AND 65535)
+        );
+    """)
+    conn.executemany("INSERT INTO memory_bytes(addr_even, hi, lo) VALUES(?, ?, ?);",
+                     [(a, f"{w >> 8:08b}", f"{w & 0xFF:08b}") for a, w in words.items()])
+    conn.executemany("INSERT INTO registers(reg, value) VALUES(?, ?);",
+                     [(r, 0o100 + r) for r in range(8)])
+    conn.commit()
+    conn.close()
+
+
+def _tables(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")}
+    finally:
+        conn.close()
+
+
+def test_v1_memory_bytes_migrated_to_pages(tmp_path):
+    path = str(tmp_path / "db.db")
+    # слова в разных страницах, в том числе на границе страницы и в конце памяти
+    words = {0o1000: 0o012701, 0o1776: 0o177777, 0o2000: 0o000401, 0o157776: 0o123456}
+    _v1_db(path, words)
+
+    db = DatabaseManager(db_path=path)
+    assert db.get_schema_version() == DatabaseManager.SCHEMA_VERSION
+    for addr, w in words.items():
+        assert db.get_word(addr) == w
+    assert db.get_word(0o1002) == 0
+    assert db.get_registers() == [0o100 + r for r in range(8)]
+    db.close()
+
+    tables = _tables(path)
+    assert "memory_bytes" not in tables
+    assert {"memory_pages", "schema_version"} <= tables
+
+    # повторное открытие уже ничего не мигрирует и видит те же слова
+    db = DatabaseManager(db_path=path)
+    for addr, w in words.items():
+        assert db.get_word(addr) == w
+    db.close()
+
+
+def test_newer_schema_is_rejected(tmp_path):
+    path = str(tmp_path / "db.db")
+    DatabaseManager(db_path=path).close()
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE schema_version SET version=? WHERE id=0;", (DatabaseManager.SCHEMA_VERSION + 1,))
+    conn.commit()
+    conn.close()
+    with pytest.raises(RuntimeError):
+        DatabaseManager(db_path=path)
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.operands import Operand, operand_class
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# 2000: 002004  2002: 002006  2004: 011064 (байты 064 / 022)  2006: 000222
+DATA = [0o2004, 0o2006, 0o011064, 0o222]
+
+
+def _run(words, r1=0, r2=0):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    for i, w in enumerate(list(words) + [0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    for i, w in enumerate(DATA):
+        cpu.db.set_word(0o2000 + 2 * i, w)
+    cpu.regs[1] = r1
+    cpu.regs[2] = r2
+    cpu.execute("1000G")
+    assert cpu.regs[7] == 0o1000 + 2 * len(words) + 2   # остановился на HALT
+    return cpu
+
+
+@pytest.mark.parametrize("words, r1, r2, r1_after", [
+    ([0o010102], 5, 5, 5),                          # MOV R1,R2
+    ([0o011102], 0o2006, 0o222, 0o2006),            # MOV (R1),R2
+    ([0o012102], 0o2004, 0o011064, 0o2006),         # MOV (R1)+,R2
+    ([0o013102], 0o2000, 0o011064, 0o2002),         # MOV @(R1)+,R2
+    ([0o014102], 0o2006, 0o011064, 0o2004),         # MOV -(R1),R2
+    ([0o015102], 0o2002, 0o011064, 0o2000),         # MOV @-(R1),R2
+    ([0o016102, 4], 0o2002, 0o222, 0o2002),         # MOV 4(R1),R2
+    ([0o017102, 2], 0o2000, 0o222, 0o2000),         # MOV @2(R1),R2
+    ([0o012702, 0o123], 0, 0o123, 0),               # MOV #123,R2
+    ([0o013702, 0o2006], 0, 0o222, 0),              # MOV @#2006,R2
+    ([0o016702, 0o1000], 0, 0o011064, 0),           # MOV 2004(PC),R2: 1004 + 1000
+    ([0o017702, 0o774], 0, 0o011064, 0),            # MOV @2000(PC),R2
+    ([0o112102], 0o2004, 0o064, 0o2005),            # MOVB (R1)+,R2 — шаг 1
+    ([0o114102], 0o2006, 0o022, 0o2005),            # MOVB -(R1),R2 — старший байт
+    ([0o113702, 0o2005], 0, 0o022, 0),              # MOVB @#2005,R2
+])
+def test_source_modes(words, r1, r2, r1_after):
+    cpu = _run(words, r1)
+    assert cpu.regs[2] == r2
+    assert cpu.regs[1] == r1_after
+
+
+@pytest.mark.parametrize("words, r2, addr, value", [
+    ([0o010122], 0o3000, 0o3000, 0o77),             # MOV R1,(R2)+
+    ([0o010142], 0o3002, 0o3000, 0o77),             # MOV R1,-(R2)
+    ([0o010162, 6], 0o2772, 0o3000, 0o77),          # MOV R1,6(R2)
+    ([0o010137, 0o3000], 0, 0o3000, 0o77),          # MOV R1,@#3000
+    ([0o110137, 0o2005], 0, 0o2004, 0o037464),      # MOVB R1,@#2005 — только старший байт
+])
+def test_destination_modes(words, r2, addr, value):
+    cpu = _run(words, 0o77, r2)
+    assert cpu.db.get_word(addr) == value
+
+
+def test_movb_to_register_keeps_high_byte():
+    cpu = _run([0o112102], 0o2004, 0o177400)
+    assert cpu.regs[2] == 0o177464
+
+
+def test_operand_objects_are_shared_and_see_register_writes():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    op = cpu.operand(2, 1, True)
+    assert cpu.operand(2, 1, True) is op
+    assert cpu.operand(2, 1, False) is not op
+    cpu.set_register("R1", 0o2000)
+    assert op.address(0o1000) == 0o2000
+    assert cpu.regs[1] == 0o2002
+
+
+_ACCESS = ('read', 'fetch', 'store', 'write', 'address')
+
+
+def test_every_operand_class_implements_the_contract():
+    classes = {operand_class(mode, reg, is_word)
+               for mode in range(8) for reg in range(8) for is_word in (True, False)}
+    assert Operand not in classes
+    for cls in classes:
+        # операнд в памяти задаёт _address(); регистровый — весь доступ сам
+        own = cls._address is not Operand._address
+        whole = all(getattr(cls, name) is not getattr(Operand, name) for name in _ACCESS)
+        assert own or whole, cls.__name__
+
+
+def test_base_operand_has_no_address():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    with pytest.raises(NotImplementedError):
+        Operand(cpu, 1, 0, True).read(0o1000)
@@ -0,0 +1,94 @@
+import json
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.command_handlers import CommandHandlers
+from core.processor import CPU
+from core.profiler import Profiler
+from data.database import DatabaseManager
+
+# 1000: MOV #3,R0; 1004: MOV @#2000,R1; 1010: MOV R1,@#2002; 1014: DEC R0;
+# 1016: BNE 1004; 1020: HALT
+LOOP = [0o012700, 3, 0o013701, 0o2000, 0o010137, 0o2002, 0o005300, 0o001372, 0]
+
+
+def _run():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    for i, w in enumerate(LOOP):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    assert cpu.execute("PROF ON") == "PROF ON"
+    cpu.execute("1000G")
+    return cpu
+
+
+def test_counts():
+    prof = _run().profiler
+    assert prof.steps == 13
+    assert prof.pc_counts[0o1000] == 1
+    assert [prof.pc_counts[a] for a in (0o1004, 0o1010, 0o1014, 0o1016)] == [3] * 4
+    assert prof.pc_counts[0o1002] == 0 and prof.pc_counts[0o1020] == 0
+    assert prof.word_counts[0o005300] == 3 and prof.word_counts[0o012700] == 1
+    # обращения операндов, включая слова #n и @#a после команды;
+    # выборка самих команд сюда не попадает
+    assert prof.reads[0o2000 >> 1] == 3 and prof.writes[0o2002 >> 1] == 3
+    assert prof.reads[0o1002 >> 1] == 1 and prof.reads[0o1006 >> 1] == 3
+    assert sum(prof.reads) == 10 and sum(prof.writes) == 3
+
+
+def test_mnemonics_and_handlers():
+    prof = _run().profiler
+    assert {k: c for k, (c, ns) in prof.mnemonics().items()} == {'MOV': 7, 'DEC': 3, 'BNE': 3}
+    assert {k: c for k, (c, ns) in prof.handlers().items()} == {'op_mov': 7, 'op_dec': 3, 'op_bne': 3}
+
+
+def test_report_and_reset():
+    cpu = _run()
+    out = cpu.execute("PROF 3").split("\n")
+    assert out[0] == "Профиль: 13 команд"
+    assert "  001010          3  23.08%  MOV R1,@#002002" in out
+    assert out[out.index("Команды:") + 1] == "  MOV               7  53.85%"
+    assert "  002002 r=0 w=3" in out
+    assert cpu.execute("PROF RESET") == "PROF RESET"
+    assert cpu.execute("PROF") == "Профиль пуст"
+
+
+def test_dump(tmp_path):
+    path = tmp_path / "p.json"
+    cpu = _run()
+    cpu.execute(f"PROF SAVE {path}")
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['steps'] == 13
+    assert data['pc'] == {'001000': 1, '001004': 3, '001010': 3, '001014': 3, '001016': 3}
+    assert data['mem_reads'] == {'001002': 1, '001006': 3, '001012': 3, '002000': 3}
+    assert data['mem_writes'] == {'002002': 3}
+    assert data['handlers']['op_dec']['count'] == 3
+
+
+def test_off_restores_plain_memory_path():
+    cpu = _run()
+    assert cpu.execute("PROF OFF") == "PROF OFF"
+    assert cpu.execute("PROF") == "Профилировщик выключен (PROF ON)"
+    assert '_mem_read_word' not in cpu.__dict__
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 0 and cpu.stop_reason == 'halt'
+
+
+def test_fresh_profiler_is_empty():
+    prof = Profiler()
+    assert prof.report(lambda a: 0) == ["Профиль пуст"]
+    assert prof.handlers() == {}
+
+
+def test_handlers_of_words_not_yet_in_the_table(monkeypatch):
+    # таблица заполняется группами по мере декодирования; отчёт по
+    # счётчикам (например, из другого процесса) не должен на это полагаться
+    table = [None] * 0x10000
+    table[0] = CommandHandlers.entry(0)
+    monkeypatch.setattr(CommandHandlers, '_table', table)
+    prof = Profiler()
+    prof.count(0o1000, 0o062737, 100)       # ADD #n,@#a
+    prof.count(0o1006, 0, 10)               # HALT
+    assert prof.handlers() == {'op_add': [1, 100], 'halt': [1, 10]}
@@ -0,0 +1,96 @@
+import sys
+from array import array
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _db():
+    return DatabaseManager(db_path=":memory:")
+
+
+@pytest.mark.parametrize("start, count", [
+    (0o1000, 1), (0o1776, 2), (0o776, 0o402), (0o1000, 0o400), (0o176000, 0o1000), (0, 0),
+])
+def test_range_round_trip_across_pages(start, count):
+    db = _db()
+    words = [(0o1001 * i + 7) & 0xFFFF for i in range(count)]
+    db.write_range(start, words)
+    assert list(db.read_range(start, count)) == words
+    # по слову — то же самое, соседи не задеты
+    assert [db.get_word(start + 2 * i) for i in range(count)] == words
+    if start:
+        assert db.get_word(start - 2) == 0
+    if start + 2 * count < 0x10000:
+        assert db.get_word(start + 2 * count) == 0
+
+
+def test_write_range_marks_every_touched_page_dirty():
+    db = _db()
+    db.mem.clear_dirty()
+    db.write_range(0o1774, [1, 2, 3, 4])
+    assert db.mem.dirty_pages() == [1, 2]
+
+
+@pytest.mark.parametrize("words, expected", [
+    (array('H', [1, 2, 0o177777]), [1, 2, 0o177777]),
+    ([1, 0o200002, -1], [1, 2, 0o177777]),
+    (range(1, 3), [1, 2]),
+    ((w for w in (5, 6)), [5, 6]),
+    (b'\1\0\2\0', [1, 2]),
+])
+def test_write_range_accepts_sequences(words, expected):
+    db = _db()
+    db.write_range(0o2000, words)
+    assert list(db.read_range(0o2000, len(expected) + 1)) == expected + [0]
+
+
+def test_write_range_takes_word_arrays_as_they_are(monkeypatch):
+    db = _db()
+    seen = []
+    monkeypatch.setattr(db.mem, 'write_words', lambda addr, words: seen.append(words))
+    words = array('H', [1, 2, 3])
+    db.write_range(0o2000, words)
+    assert seen[0] is words
+
+
+def test_write_range_bytes_are_little_endian_words():
+    db = _db()
+    db.write_range(0o2000, bytes([0o300, 0o25, 1, 0]))
+    assert list(db.read_range(0o2000, 2)) == [0o012700, 1]
+    with pytest.raises(ValueError):
+        db.write_range(0o2000, b'\1')
+
+
+@pytest.mark.parametrize("start, count", [(0o177776, 2), (0o177000, 0o401), (0o1000, -1)])
+def test_range_past_end_of_memory(start, count):
+    db = _db()
+    with pytest.raises(ValueError):
+        db.read_range(start, count)
+    if count >= 0:
+        with pytest.raises(ValueError):
+            db.write_range(start, [0] * count)
+
+
+def test_dump_command():
+    cpu = CPU(db_manager=_db())
+    cpu.db.write_range(0o1770, range(1, 12))
+    assert cpu.execute("1770,2012/") == (
+        "001770/ 000001 000002 000003 000004 000005 000006 000007 000010\n"
+        "002010/ 000011 000012")
+    # LF продолжает со слова за концом дампа
+    assert cpu.execute("") == "000013"
+    assert cpu.execute("2000,2000/") == "002000/ 000005"
+    # нечётные границы округляются вниз до слова
+    assert cpu.execute("1771,1773/") == "001770/ 000001 000002"
+
+
+def test_dump_errors():
+    cpu = CPU(db_manager=_db())
+    assert "Конец диапазона меньше начала" in cpu.execute("2000,1000/")
+    assert cpu.execute("157000,160000/") == "BUS ERROR"
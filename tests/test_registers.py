@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _saved(path):
+    db = DatabaseManager(db_path=str(path))
+    try:
+        return db.get_registers(), db.get_psw()
+    finally:
+        db.close()
+
+
+def test_registers_reach_the_database_on_sync(tmp_path):
+    path = tmp_path / "m.db"
+    cpu = CPU(db_manager=DatabaseManager(db_path=str(path)))
+    cpu.execute("R3/1234")
+    cpu.execute("RS/17")
+    assert cpu.execute("R3/") == "R3/ 001234"
+    assert cpu.get_psw() == 0o17
+    assert _saved(path) == ([0] * 8, 0)
+    cpu.sync()
+    assert _saved(path) == ([0, 0, 0, 0o1234, 0, 0, 0, 0], 0o17)
+    cpu.shutdown()
+
+
+def test_run_syncs_registers_and_psw(tmp_path):
+    path = tmp_path / "m.db"
+    cpu = CPU(db_manager=DatabaseManager(db_path=str(path)))
+    # MOV #100000,R1; HALT
+    for i, w in enumerate([0o012701, 0o100000, 0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.execute("1000G")
+    regs, psw = _saved(path)
+    assert regs[1] == 0o100000 and regs[7] == 0o1006
+    assert psw == 0o10
+    cpu.shutdown()
+
+
+def test_new_cpu_loads_saved_state(tmp_path):
+    path = tmp_path / "m.db"
+    cpu = CPU(db_manager=DatabaseManager(db_path=str(path)))
+    cpu.execute("R5/777")
+    cpu.execute("RS/4")
+    cpu.shutdown()
+    again = CPU(db_manager=DatabaseManager(db_path=str(path)))
+    assert again.regs[5] == 0o777
+    assert again.get_psw() == 4
+    again.shutdown()
@@ -0,0 +1,85 @@
+import sys
+import threading
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from data.database import DatabaseManager
+from utils import config
+
+# INC R0; BR .-2
+FOREVER = [0o005200, 0o000776]
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_steps = 0
+    cpu.max_seconds = 0
+    cpu.detect_loops = False
+    for i, w in enumerate(FOREVER):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+def test_progress_reports_steps_and_pc():
+    cpu = _cpu()
+    seen = []
+    cpu.run_at(0o1000, 4 * config.TIME_CHECK_EVERY, 0, lambda steps, pc: seen.append((steps, pc)))
+    assert len(seen) >= 2
+    assert [s for s, _ in seen] == sorted(s for s, _ in seen)
+    assert all(pc in (0o1000, 0o1002) for _, pc in seen)
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_stop_from_another_thread(fusion):
+    cpu = _cpu()
+    cpu.fusion = fusion
+    started = threading.Event()
+
+    def progress(steps, pc):
+        started.set()
+
+    worker = threading.Thread(target=cpu.run_at, args=(0o1000, 0, 0, progress))
+    worker.start()
+    assert started.wait(10)
+    cpu.request_stop()
+    worker.join(10)
+    assert not worker.is_alive()
+    assert cpu.stop_reason == 'break'
+    assert cpu.resume_pc == cpu.regs[7]
+    assert "ОСТАНОВ: по запросу" in cpu.stop_note()
+    # C продолжает с того же места
+    n = cpu.regs[0]
+    cpu.execute("C N=2")
+    assert cpu.regs[0] == n + 1
+
+
+def test_console_waits_for_the_run():
+    # execute из другого потока ждёт, пока запуск отпустит lock
+    cpu = _cpu()
+    started = threading.Event()
+    worker = threading.Thread(target=cpu.run_at, args=(0o1000, 0, 0, lambda s, pc: started.set()))
+    worker.start()
+    assert started.wait(10)
+    cpu.request_stop()
+    assert cpu.execute("R7/") == f"R7/ {cpu.resume_pc:06o}"
+    worker.join(10)
+
+
+def test_stop_during_steps():
+    cpu = _cpu()
+    cpu.set_register("R7", 0o1000)
+    real = cpu._run_loop
+
+    def run_loop(*args, **kw):
+        real(*args, **kw)
+        if cpu.regs[0] == 3:
+            cpu.request_stop()
+
+    cpu._run_loop = run_loop
+    out = cpu.execute("100S").split("\n")
+    assert out[-1].startswith("ОСТАНОВ: по запросу")
+    assert cpu.stop_reason == 'break' and cpu.regs[0] == 3
@@ -0,0 +1,110 @@
+import struct
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core import snapshot
+from core.processor import CPU
+from data.database import DatabaseManager
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    return cpu
+
+
+def _busy_cpu():
+    """Машина с программой, данными по всей памяти и ненулевыми R0..R7 и PSW."""
+    cpu = _cpu()
+    # MOV #3,R0; DEC R0; BNE .-2; HALT
+    for i, w in enumerate([0o012700, 3, 0o005300, 0o001376, 0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    for i, w in enumerate(range(0o100)):
+        cpu.db.set_word(0o2000 + 2 * i, w)
+    cpu.db.set_word(0o1776, 0o123456)          # граница страниц
+    cpu.db.set_word(0o177776, 0o177777)        # последнее слово памяти
+    for r in range(7):
+        cpu.regs[r] = 0o11111 * (r + 1)
+    cpu.regs[7] = 0o1000
+    cpu.set_psw(0o345)
+    return cpu
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_pack_unpack_round_trip(compress):
+    snap = _busy_cpu().snapshot()
+    data = snapshot.pack(snap, compress)
+    back = snapshot.unpack(data)
+    assert bytes(back.memory) == bytes(snap.memory)
+    assert list(back.regs) == list(snap.regs)
+    assert back.psw == snap.psw
+    flags = struct.unpack_from('<4sHH', data)[2]
+    assert bool(flags & snapshot.F_ZLIB) == compress
+
+
+def test_compressed_snapshot_is_smaller():
+    snap = _busy_cpu().snapshot()
+    assert len(snapshot.pack(snap, True)) < len(snapshot.pack(snap, False)) // 10
+
+
+@pytest.mark.parametrize("z", ["", " Z"])
+def test_save_and_load_commands(tmp_path, z):
+    path = tmp_path / "m.snp"
+    cpu = _busy_cpu()
+    before = cpu.snapshot()
+    assert cpu.execute(f"SAVE {path}{z}").startswith(f"SAVE {path}:")
+
+    # всё меняем: запуск, правки памяти и регистров
+    cpu.execute("1000G")
+    cpu.db.set_word(0o2000, 7)
+    cpu.set_register("R5", 0)
+    cpu.set_psw(0)
+
+    assert cpu.execute(f"LOAD {path}") == f"LOAD {path}: PC=001000"
+    after = cpu.snapshot()
+    assert bytes(after.memory) == bytes(before.memory)
+    assert after.regs == before.regs
+    assert after.psw == before.psw
+
+    # восстановленная программа исполняется заново, а не из старого кеша
+    cpu.execute("1000G")
+    assert cpu.regs[0] == 0 and cpu.stop_reason == 'halt'
+
+
+def test_load_into_another_machine(tmp_path):
+    path = str(tmp_path / "m.snp")
+    src = _busy_cpu()
+    src.save_snapshot(path, compress=True)
+    dst = _cpu()
+    dst.load_snapshot(path)
+    assert snapshot.diff(src.snapshot(), dst.snapshot()) == []
+    dst.sync()
+    assert dst.db.get_registers() == src.regs.tolist()
+
+
+def test_corrupt_files_are_rejected():
+    data = snapshot.pack(_busy_cpu().snapshot(), True)
+    with pytest.raises(ValueError):
+        snapshot.unpack(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        snapshot.unpack(data[:-10])
+    with pytest.raises(ValueError):
+        snapshot.unpack(data[:8])
+    newer = bytearray(data)
+    struct.pack_into('<H', newer, 4, 99)
+    with pytest.raises(ValueError):
+        snapshot.unpack(bytes(newer))
+
+
+def test_diff():
+    cpu = _busy_cpu()
+    old = cpu.snapshot()
+    cpu.db.set_word(0o2002, 0o777)
+    cpu.regs[3] = 0
+    new = cpu.snapshot()
+    assert snapshot.diff(old, new) == [f"R3: {0o44444:06o} -> 000000", "002002: 000001 -> 000777"]
+    assert snapshot.diff(new, new) == []
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.processor import CPU
+from data.database import DatabaseManager
+
+# 1000: MOV #2,R0; 1004: MOV R0,@#2000; 1010: DEC R0; 1012: BNE 1004; 1014: HALT
+LOOP = [0o012700, 2, 0o010037, 0o2000, 0o005300, 0o001374, 0]
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    for i, w in enumerate(LOOP):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.set_register("R7", 0o1000)
+    return cpu
+
+
+def test_single_step_shows_changed_register():
+    cpu = _cpu()
+    assert cpu.execute("S") == "001000: MOV #000002,R0            R0 000000->000002"
+    assert cpu.regs[7] == 0o1004
+    assert cpu.stop_reason == 'steps' and cpu.resume_pc == 0o1004
+
+
+def test_steps_show_memory_and_psw_changes():
+    cpu = _cpu()
+    cpu.execute("S")
+    lines = cpu.execute("6S").split("\n")
+    assert lines == [
+        "001004: MOV R0,@#002000           002000 000000->000002",
+        "001010: DEC R0                    R0 000002->000001",
+        "001012: BNE 001004",
+        "001004: MOV R0,@#002000           002000 000002->000001",
+        "001010: DEC R0                    R0 000001->000000, Z 0->1",
+        "001012: BNE 001004",
+    ]
+    # HALT кончает nS раньше срока
+    assert cpu.execute("3S") == "001014: HALT"
+    assert cpu.stop_reason == 'halt'
+
+
+def test_rewrite_of_same_value_is_not_shown():
+    # MOV R0,@#2000 с тем же значением, что уже лежит в памяти
+    cpu = _cpu()
+    cpu.db.set_word(0o2000, 2)
+    cpu.execute("S")
+    assert cpu.execute("S") == "001004: MOV R0,@#002000"
+
+
+def test_step_stops_at_breakpoint_and_c_continues():
+    cpu = _cpu()
+    cpu.execute("BP 1012")
+    out = cpu.execute("5S").split("\n")
+    assert len(out) == 4
+    assert out[-1] == "ОСТАНОВ: точка останова, PC=001012 (C — продолжить)"
+    cpu.execute("BC")
+    cpu.execute("C")
+    assert cpu.stop_reason == 'halt' and cpu.regs[0] == 0
+
+
+
+def test_step_count_is_decimal():
+    cpu = _cpu()
+    cpu.db.write_range(0o1000, [0o005200] * 12 + [0])   # INC R0 x12; HALT
+    assert len(cpu.execute("10S").split("\n")) == 10
+    assert cpu.regs[0] == 10
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from core.timing import cycles
+from data.database import DatabaseManager
+from utils import config
+
+
+@pytest.mark.parametrize("word, expected", [
+    (0, 0),                 # HALT
+    (0o010102, 10),         # MOV R1,R2
+    (0o012700, 16),         # MOV #n,R0: (R7)+ источника
+    (0o013737, 34),         # MOV @#a,@#b
+    (0o005000, 10),         # CLR R0
+    (0o005010, 16),         # CLR (R0): только запись
+    (0o005210, 19),         # INC (R0): чтение и запись
+    (0o005710, 16),         # TST (R0): только чтение
+    (0o105210, 19),         # INCB (R0)
+    (0o060001, 10),         # ADD R0,R1
+    (0o066061, 37),         # ADD 2(R0),4(R1)
+    (0o001376, 10),         # BNE
+    (0o000110, 12),         # JMP (R0)
+    (0o000167, 18),         # JMP a(PC)
+    (0o106700, 14),         # MFPS R0
+    (0o007000, 10),         # неизвестная команда
+])
+def test_cycles(word, expected):
+    assert cycles(word) == expected
+
+
+def _cpu():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    cpu.max_seconds = 0
+    # MOV #3,R0; DEC R0; BNE .-2; HALT
+    for i, w in enumerate([0o012700, 3, 0o005300, 0o001376, 0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_run_sums_cycles(fusion):
+    cpu = _cpu()
+    cpu.fusion = fusion
+    cpu.execute("1000G")
+    assert cpu.cycles == 16 + 3 * (10 + 10)
+
+
+def test_continue_keeps_counting():
+    cpu = _cpu()
+    cpu.execute("1000G N=3")
+    assert cpu.cycles == 36
+    cpu.execute("C")
+    assert cpu.cycles == 76
+    # новый G считает заново
+    cpu.execute("1000G N=1")
+    assert cpu.cycles == 16
+
+
+def test_timing_note(monkeypatch):
+    cpu = _cpu()
+    cpu.execute("1000G")
+    assert cpu.timing_note() == "\nВремя: 76 тактов ≈ 19.0 мкс"
+    cpu.cycles = 40_000
+    assert cpu.timing_note() == "\nВремя: 40000 тактов ≈ 10.000 мс"
+    monkeypatch.setattr(config, 'SHOW_TIMING', False)
+    assert cpu.timing_note() == ""
+    assert "Время" not in cpu.execute("1000G")
@@ -0,0 +1,95 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from data.database import DatabaseManager
+from utils.logger import Tracer, parse_level
+
+# MOV #1,@#2000; HALT
+STORE = [0o012737, 1, 0o2000, 0]
+
+
+def _cpu(words, **levels):
+    lines = []
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"),
+              tracer=Tracer(sink=lines.append, **levels))
+    for i, w in enumerate(words):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    return cpu, lines
+
+
+def test_everything_off_by_default(capsys):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"))
+    for i, w in enumerate(STORE):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.execute("1000G")
+    assert capsys.readouterr().out == ""
+    assert cpu.execute("TRACE") == "TRACE fetch=0 mem=0 psw=0 resolve=0 branch=0"
+
+
+def test_memory_category():
+    cpu, lines = _cpu(STORE, mem=1)
+    cpu.execute("1000G")
+    assert lines == [
+        "[MEM    ] READ  logical 1002 -> phys 1002 : 000001 (hi=000 lo=001)",
+        "[MEM    ] READ  logical 1004 -> phys 1004 : 002000 (hi=004 lo=000)",
+        "[MEM    ] WRITE logical 2000 -> phys 2000 : 000001 (hi=000 lo=001)",
+    ]
+
+
+def test_branch_category():
+    # CLR R0; BEQ +1; HALT; HALT
+    cpu, lines = _cpu([0o005000, 0o001401, 0, 0], branch=1)
+    cpu.execute("1000G")
+    assert len(lines) == 1 and lines[0].startswith("[BRANCH ]")
+    assert cpu.regs[7] == 0o1010
+
+
+def test_trace_command_sets_levels():
+    cpu, lines = _cpu(STORE)
+    assert cpu.execute("TRACE mem VERBOSE") == "TRACE fetch=0 mem=2 psw=0 resolve=0 branch=0"
+    assert cpu.execute("TRACE all 1") == "TRACE fetch=1 mem=1 psw=1 resolve=1 branch=1"
+    assert cpu.execute("TRACE all off") == "TRACE fetch=0 mem=0 psw=0 resolve=0 branch=0"
+    assert "Неизвестная категория" in cpu.execute("TRACE disk")
+    cpu.execute("1000G")
+    assert lines == []
+
+
+def test_levels():
+    assert parse_level(True) == 1 and parse_level("verbose") == 2 and parse_level("0") == 0
+    with pytest.raises(ValueError):
+        parse_level(3)
+    tr = Tracer(fetch='ON')
+    assert tr.levels() == {'fetch': 1, 'mem': 0, 'psw': 0, 'resolve': 0, 'branch': 0}
+
+
+def test_default_sink_is_stdout(capsys):
+    Tracer().emit('psw', "psw=000")
+    assert capsys.readouterr().out == "[PSW    ] psw=000\n"
+
+
+@pytest.mark.parametrize("fusion", [False, True])
+def test_fetch_line_for_every_executed_instruction(fusion):
+    # MOV #3,R0; DEC R0; BNE .-2; HALT — 8 команд, включая HALT
+    cpu, lines = _cpu([0o012700, 3, 0o005300, 0o001376, 0], fetch=1)
+    cpu.fusion = fusion
+    for _ in range(2):
+        lines.clear()
+        cpu.execute("1000G")
+        assert [line.split()[3] for line in lines] == \
+            ['1000', '1004', '1006', '1004', '1006', '1004', '1006', '1010']
+        assert cpu.regs[0] == 0
+    assert lines[0] == "[FETCH  ] logical 1000 -> phys 1000 : 012700 (hi=025 lo=300)"
+    # кеш декодирования при этом ведётся как обычно
+    assert cpu._code_refs[0o1004 >> 1] == 1
+
+
+def test_fetch_line_for_each_step():
+    cpu, lines = _cpu([0o005200, 0o000776], fetch=1)
+    cpu.set_register("R7", 0o1000)
+    cpu.execute("5S")
+    assert len(lines) == 5
@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+# Путь на один уровень выше папки tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from core.processor import CPU
+from core.trace_buffer import F_DST, F_JUMP, F_SRC, TraceBuffer
+from data.database import DatabaseManager
+
+# 1000: MOV #2,R0; 1004: MOV R0,@#2000; 1010: DEC R0; 1012: BNE 1004; 1014: HALT
+LOOP = [0o012700, 2, 0o010037, 0o2000, 0o005300, 0o001374, 0]
+
+
+def _run(depth=None):
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"), debug=True)
+    cpu.max_seconds = 0
+    if depth:
+        cpu.history.resize(depth)
+    for i, w in enumerate(LOOP):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.execute("1000G")
+    return cpu
+
+
+def test_records_of_a_run():
+    recs = _run().history.records()
+    assert [r.pc for r in recs] == [0o1000, 0o1004, 0o1010, 0o1012, 0o1004, 0o1010, 0o1012]
+    mov = recs[1]
+    assert (mov.word, mov.next_pc, mov.dst_ea) == (0o010037, 0o1010, 0o2000)
+    assert mov.flags & F_DST and not mov.flags & F_JUMP
+    assert recs[3].flags & F_JUMP and recs[3].text == "BNE 001004"
+    assert not recs[6].flags & F_JUMP and recs[6].text == "BNE (no branch)"
+    assert recs[5].psw == 4                        # Z после последнего DEC
+
+
+def test_ring_keeps_newest():
+    history = _run(depth=3).history
+    assert history.count == 7 and len(history) == 3
+    assert [r.pc for r in history.records()] == [0o1004, 0o1010, 0o1012]
+    assert [r.pc for r in history.records(6)] == [0o1012]
+    assert history.tail(1, verbose=False) == ["001014: BNE (no branch)"]
+
+
+def test_export_load_round_trip(tmp_path):
+    path = str(tmp_path / "h.s36t")
+    history = _run(depth=5).history
+    assert history.export(path) == 5
+    back = TraceBuffer.load(path)
+    assert back.count == 5 and back.depth == 5
+    assert back.records() == history.records()
+    assert back.lines(verbose=True) == history.lines(verbose=True)
+
+
+def test_hist_save_command(tmp_path):
+    path = str(tmp_path / "h.s36t")
+    cpu = _run()
+    assert cpu.execute(f"HIST SAVE {path}") == f"HIST SAVE {path}: 7 зап."
+    assert TraceBuffer.load(path).records() == cpu.history.records()
+
+
+def test_steps_are_not_recorded_without_debug():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"), debug=False)
+    cpu.max_seconds = 0
+    cpu.db.write_range(0o1000, LOOP)
+    cpu.execute("1000G")
+    assert cpu.history.count == 0
+    assert cpu.execute("HIST") == "История пуста (запись шагов — HIST ON)"
+
+
+def test_empty_export(tmp_path):
+    path = str(tmp_path / "h.s36t")
+    assert TraceBuffer(8).export(path) == 0
+    back = TraceBuffer.load(path)
+    assert back.count == 0 and back.records() == []
+
+
+def test_bad_file_is_rejected(tmp_path):
+    path = tmp_path / "h.s36t"
+    TraceBuffer(8).export(str(path))
+    data = path.read_bytes()
+    path.write_bytes(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        TraceBuffer.load(str(path))
+
+
+def test_source_and_destination_addresses():
+    cpu = CPU(db_manager=DatabaseManager(db_path=":memory:"), debug=True)
+    cpu.max_seconds = 0
+    # MOV (R1)+,(R2)+; HALT
+    for i, w in enumerate([0o012122, 0]):
+        cpu.db.set_word(0o1000 + 2 * i, w)
+    cpu.set_register("R1", 0o2000)
+    cpu.set_register("R2", 0o3000)
+    cpu.execute("1000G")
+    (rec,) = cpu.history.records()
+    assert rec.flags & F_SRC and rec.flags & F_DST
+    assert (rec.src_ea, rec.dst_ea) == (0o2000, 0o3000)
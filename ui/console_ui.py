@@ -1,31 +1,57 @@
 from core.processor import CPU
 
 class ConsoleTerminal:
-    def __init__(self):
-        self.cpu = CPU(db_manager=None, db_debug=True, debug=True)
+    def __init__(self, trace: dict | None = None):
+        self.cpu = CPU(db_manager=None, db_debug=True)
+        # trace={'mem': 1, 'branch': 2} — начальные уровни трассировки
+        for category, level in (trace or {}).items():
+            self.cpu.trace.set_level(category, level)
     def run(self):
         print("Терминал 'Сфера-36' (восьмеричная система)")
         print("Форматы команд:")
         print("  XXXX/YYYYY - запись/команда (005203 - COM R3)")
         print("  XXXX/      - чтение памяти/регистра")
         print("  Rn/        - чтение регистра (R0-R7)")
-        print("  XXXXG[cond]- выполнение с адреса")
+        print("  XXXX,YYYY/ - дамп памяти с XXXX по YYYY")
+        print("  XXXXG[cond]- выполнение с адреса; XXXXG N=шагов T=секунд — свои пределы")
+        print("  S, nS      - один / n шагов с текущего PC (n десятичное; изменения регистров, PSW, памяти)")
+        print("  C [N=] [T=]- продолжить после останова по пределу")
+        print("  LIMIT [N=] [T=] - глобальные пределы запуска (0 — без ограничения)")
         print("  XXXX/0     - установка маркера остановки")
+        print("  TRACE [кат] [ON|OFF|2] - трассировка: fetch, mem, psw, resolve, branch, all")
+        print("  BP адр [IF усл], BC [адр] - точки останова; WP адр [R|W|RW] [IF усл], WC [адр] - наблюдение")
+        print("  PROF ON|OFF|RESET, PROF [n], PROF SAVE файл - профилировщик")
+        print("  HIST [n]   - последние n шагов G; HIST ON|OFF - запись шагов (выключена: G быстрее)")
+        print("  HIST DEPTH n, HIST SAVE файл - глубина истории, выгрузка в файл")
+        print("  PROG файл [адр] - загрузка программы: листинг (адр/слово, адр: слова) или двоичный образ с адр")
+        print("  SAVE файл [Z], LOAD файл - снимок памяти, регистров и PSW (Z — сжать)")
+        print("  DIFF [снимок [снимок]] - что изменил последний G/C/S; отличия от снимка / между снимками")
+        print("  Адреса и слова — восьмеричные; счётчики (nS, N=, T=, HIST n, PROF n) — десятичные")
         print("  quit       - выход\n")
 
-        while True:
-            try:
-                cmd = input("> ").strip()
+        try:
+            while True:
+                try:
+                    cmd = input("> ").strip()
+                except EOFError:
+                    # конец ввода (Ctrl+D, файл на stdin) — как quit
+                    print()
+                    break
                 if not cmd:
                     continue
-                    
-                result = self.cpu.execute(cmd)
-                
+                try:
+                    result = self.cpu.execute(cmd)
+                except Exception as e:
+                    print(f"Ошибка: {e}")
+                    continue
+
                 if result == "QUIT":
                     break
-                    
                 if result:
                     print(result)
-                
-            except Exception as e:
-                print(f"Ошибка: {e}")
\ No newline at end of file
+        except KeyboardInterrupt:
+            print()
+        finally:
+            # любой выход (quit, конец ввода, Ctrl+C) сбрасывает в БД
+            # правки памяти, которые пока есть только в образе в ОЗУ
+            self.cpu.shutdown()
@@ -7,6 +7,8 @@ from PySide6.QtGui import QFont, QTextCursor, QTextOption
 from PySide6.QtCore import Qt, QTimer, QEvent
 import re
 
+from ui.program_runner import ProgramRunner
+
 
 class TerminalPage(QWidget):
     def __init__(self, cpu, prompt="> ", parent=None):
@@ -51,12 +53,25 @@ class TerminalPage(QWidget):
         self.btn_show_manip = QPushButton("Показать манипулятор")
         self.btn_show_flags = QPushButton("Показать слово состояния процессора")
         self.btn_theme = QPushButton("Сменить тему")
+        self.btn_stop = QPushButton("Стоп")
+        self.btn_stop.setEnabled(False)
+        self.status_label = QLabel("")
         btn_layout.addWidget(self.btn_show_manip)
         btn_layout.addWidget(self.btn_show_flags)
         btn_layout.addWidget(self.btn_theme)
+        btn_layout.addWidget(self.btn_stop)
+        btn_layout.addWidget(self.status_label, 1)
         layout.addLayout(btn_layout)
 
         self.btn_theme.clicked.connect(self.toggle_theme)
+        self.btn_stop.clicked.connect(self.stop_program)
+
+        # G / C исполняются в отдельном потоке; пока runner.busy, к CPU не обращаемся
+        self.runner = ProgramRunner(cpu, self)
+        self.runner.worker.progress.connect(self._on_run_progress)
+        self.runner.worker.trace.connect(self._append_lines)
+        self.runner.worker.finished.connect(self._on_run_finished)
+        self.runner.worker.failed.connect(self._on_run_failed)
 
         # state
         self.history = []           # список строк (старые в начале, новые в конце)
@@ -140,6 +155,21 @@ class TerminalPage(QWidget):
         self._trim_history()
         self._refresh_terminal()
 
+    def _append_lines(self, lines: list):
+        """Как _append_line для пачки строк, но с одной перерисовкой."""
+        added = False
+        for text in lines:
+            if not text or str(text).strip() == "":
+                continue
+            t = str(text).rstrip()
+            if self.history and self.history[-1].strip() == t.strip():
+                continue
+            self.history.append(t)
+            added = True
+        if added:
+            self._trim_history()
+            self._refresh_terminal()
+
     def _append_inline(self, inline_part: str):
         """Дописать результат в ту же строку-эхо.
         inline_part должен начинаться с пробела, если нужен пробел между командой и результатом,
@@ -180,6 +210,11 @@ class TerminalPage(QWidget):
 
     # ---------- обработка Enter ----------
     def process_command(self):
+        if self.runner.busy:
+            # CPU занят программой — ввод остаётся в строке до её окончания
+            self.status_label.setText("выполняется программа (Стоп / Esc — прервать)")
+            return
+
         raw = (self.input_line.text() or "")
         raw_stripped = raw.strip()
 
@@ -218,6 +253,12 @@ class TerminalPage(QWidget):
     # ---------- обработка клавиш '/' и 'G' (instant) ----------
     def eventFilter(self, obj, event):
         if obj is self.input_line and event.type() == QEvent.KeyPress:
+            if self.runner.busy:
+                if event.key() == Qt.Key_Escape:
+                    self.stop_program()
+                    return True
+                # мгновенные '/' и 'G' читают CPU — пока он занят, это обычный ввод
+                return False
             k = event.text()
             # instant read on '/'
             if k == "/":
@@ -253,7 +294,7 @@ class TerminalPage(QWidget):
                     return True
                 # PSW
                 if cur.upper() == "RS":
-                    val = self.cpu.db.get_psw()
+                    val = self.cpu.get_psw()
                     pre = f"RS/{val:03o}"
                     self._prefill = {'type': 'psw', 'text': pre}
                     self.input_line.setText(f"{pre} ")
@@ -277,15 +318,10 @@ class TerminalPage(QWidget):
                         self._append_line("BUS ERROR")
                         self.input_line.clear()
                         return True
-                    # run immediately
-                    self.cpu._set_pc(addr)
-                    out = self.cpu._run_program()
-                    r7 = self.cpu.get_register("R7")
-                    # show echo+R7 inline (we didn't call process_command, so add echo here)
-                    self._append_echo(f"{addr:06o}G {r7:06o}")
-                    if out:
-                        for line in out.splitlines():
-                            self._append_line(line)
+                    # run immediately (we didn't call process_command, so add echo here;
+                    # R7 is appended inline when the run finishes)
+                    self._append_echo(f"{addr:06o}G")
+                    self._start_run({'type': 'EXEC_AT', 'addr': addr})
                     self.input_line.clear()
                     return True
                 return False
@@ -358,9 +394,9 @@ class TerminalPage(QWidget):
             self.last_addr = None
 
         elif pre['type'] == 'psw':
-            old = self.cpu.db.get_psw()
-            self.cpu.db.set_psw(ival & 0xFF)
-            new = self.cpu.db.get_psw()
+            old = self.cpu.get_psw()
+            self.cpu.set_psw(ival & 0xFF)
+            new = self.cpu.get_psw()
             self._replace_last_with_echo(f"RS/{old:03o} {new:03o}")
 
         self._prefill = None
@@ -417,20 +453,12 @@ class TerminalPage(QWidget):
             if addr > max_addr:
                 self._append_inline(" BUS ERROR")
                 return
-            self.cpu._set_pc(addr)
-            out = self.cpu._run_program()
-            r7 = self.cpu.get_register("R7")
-            self._append_inline(f" {r7:06o}")
-            if out:
-                for line in out.splitlines():
-                    self._append_line(line)
-            self.last_addr = None
-            self.last_reg = None
+            self._start_run({'type': 'EXEC_AT', 'addr': addr})
             return
 
         # PSW_READ
         if self._re_psw_read.match(s):
-            val = self.cpu.db.get_psw()
+            val = self.cpu.get_psw()
             self._append_inline(f" {val:03o}")
             return
 
@@ -488,14 +516,78 @@ class TerminalPage(QWidget):
             except Exception:
                 self._append_inline(" ???")
                 return
-            old = self.cpu.db.get_psw()
-            self.cpu.db.set_psw(val & 0xFF)
-            new = self.cpu.db.get_psw()
+            old = self.cpu.get_psw()
+            self.cpu.set_psw(val & 0xFF)
+            new = self.cpu.get_psw()
             self._replace_last_with_echo(f"RS/{old:03o} {new:03o}")
             return
 
-        # Unknown
-        self._append_inline(" Неизвестная команда")
+        # прочие консольные команды (TRACE и т.п.) — через CPU.execute
+        try:
+            parsed = self.cpu.parser.parse(s)
+        except ValueError:
+            self._append_inline(" Неизвестная команда")
+            return
+        # G с пределами и C — тоже в потоке исполнения
+        if parsed['type'] == 'EXEC_AT':
+            addr = int(parsed['addr'], 8)
+            if addr > int('157776', 8):
+                self._append_inline(" BUS ERROR")
+                return
+            self._start_run({'type': 'EXEC_AT', 'addr': addr,
+                             'steps': parsed['steps'], 'seconds': parsed['seconds']})
+            return
+        if parsed['type'] == 'CONTINUE':
+            self._start_run({'type': 'CONTINUE',
+                             'steps': parsed['steps'], 'seconds': parsed['seconds']})
+            return
+        # S / nS и PROG тоже исполняют программу (или грузят файл) — не в потоке GUI
+        if parsed['type'] in ('STEP', 'PROGRAM'):
+            self._start_run({'type': 'COMMAND', 'text': s})
+            return
+        result = self.cpu.execute(s)
+        if result:
+            for line in str(result).splitlines():
+                self._append_line(line)
+
+    # ---------- исполнение программы (поток runner) ----------
+    def _start_run(self, req: dict):
+        self.last_addr = None
+        self.last_reg = None
+        if not self.runner.start(req):
+            self._append_inline(" занято")
+            return
+        self.btn_stop.setEnabled(True)
+        self.status_label.setText("выполняется…")
+
+    def stop_program(self):
+        self.runner.stop()
+
+    def _on_run_progress(self, steps: int, pc: int):
+        self.status_label.setText(f"шагов: {steps}  PC={pc:06o}")
+
+    def _on_run_finished(self, req: dict, r7: int, lines: list, note: str):
+        self.btn_stop.setEnabled(False)
+        self.status_label.setText("")
+        if req['type'] == 'COMMAND':
+            for line in lines:
+                self._append_line(line)
+            return
+        if self.history and self.history[-1].startswith(">"):
+            self._append_inline(f" {r7:06o}")
+        else:
+            # эхо уже ушло вверх под строками трассировки
+            label = f"{req['addr']:06o}G" if req['type'] == 'EXEC_AT' else "C"
+            self._append_line(f"{label} {r7:06o}")
+        self._append_lines(lines + note.splitlines())
+
+    def _on_run_failed(self, req: dict, message: str):
+        self.btn_stop.setEnabled(False)
+        self.status_label.setText("")
+        if message == "BUS ERROR":
+            self._append_inline(" BUS ERROR")
+        else:
+            self._append_line(f"Ошибка: {message}")
 
     # ---------- line feed ----------
     def line_feed(self):
@@ -0,0 +1,101 @@
+# ui/program_runner.py
+"""Исполнение G / C, S / nS и PROG вне потока GUI.
+
+ProgramRunner держит один рабочий QThread. Запуск отдаётся ему сигналом,
+ход исполнения и новые строки истории возвращаются сигналами не чаще
+раза в кадр (~60 Гц), поэтому окно остаётся отзывчивым. Пока busy,
+терминал не обращается к CPU; stop() просит CPU остановиться, и запуск
+можно продолжить командой C. S / nS и PROG идут через CPU.execute
+(запрос 'COMMAND'), их вывод возвращается в finished вместо хвоста истории.
+"""
+import time
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+FRAME = 1 / 60      # не чаще раза в кадр
+TAIL_LINES = 25     # столько строк истории видно в терминале
+
+
+class RunWorker(QObject):
+    progress = Signal(int, int)         # шагов, PC
+    trace = Signal(list)                # новые строки истории
+    finished = Signal(dict, int, list, str)   # запрос, R7, хвост истории (у COMMAND — вывод), время и пометка об останове
+    failed = Signal(dict, str)
+
+    def __init__(self, cpu):
+        super().__init__()
+        self.cpu = cpu
+        self._seen = 0
+        self._next_emit = 0.0
+
+    @Slot(dict)
+    def run(self, req: dict):
+        cpu = self.cpu
+        history = cpu.history
+        self._seen = history.count
+        self._next_emit = 0.0
+        try:
+            if req['type'] == 'COMMAND':
+                result = cpu.execute(req['text'])
+                self.finished.emit(req, cpu.get_register("R7"), str(result or "").splitlines(), "")
+                return
+            if req['type'] == 'CONTINUE':
+                cpu.resume(req.get('steps'), req.get('seconds'), progress=self._progress)
+            else:
+                cpu.run_at(req['addr'], req.get('steps'), req.get('seconds'), progress=self._progress)
+        except Exception as e:
+            self.failed.emit(req, str(e))
+            return
+        lines = history.lines(max(self._seen, history.count - TAIL_LINES))
+        self.finished.emit(req, cpu.get_register("R7"), lines, (cpu.timing_note() + cpu.stop_note()).strip())
+
+    def _progress(self, steps: int, pc: int):
+        # вызывается из цикла CPU в рабочем потоке
+        now = time.monotonic()
+        if now < self._next_emit:
+            return
+        self._next_emit = now + FRAME
+        self.progress.emit(steps, pc)
+        history = self.cpu.history
+        if self.cpu.debug and history.count > self._seen:
+            self.trace.emit(history.lines(max(self._seen, history.count - TAIL_LINES)))
+            self._seen = history.count
+
+
+class ProgramRunner(QObject):
+    _submit = Signal(dict)
+
+    def __init__(self, cpu, parent=None):
+        super().__init__(parent)
+        self.cpu = cpu
+        self.busy = False
+        self._thread = QThread(self)
+        self.worker = RunWorker(cpu)
+        self.worker.moveToThread(self._thread)
+        self._submit.connect(self.worker.run)
+        # подключаем раньше страницы: к её обработчику busy уже сброшен
+        self.worker.finished.connect(self._done)
+        self.worker.failed.connect(self._done)
+        self._thread.start()
+
+    def start(self, req: dict) -> bool:
+        """req — {'type': 'EXEC_AT', 'addr': int} или {'type': 'CONTINUE'},
+        плюс необязательные 'steps' / 'seconds', или {'type': 'COMMAND',
+        'text': str} — консольная команда целиком. False, если уже идёт запуск."""
+        if self.busy:
+            return False
+        self.busy = True
+        self._submit.emit(req)
+        return True
+
+    def stop(self):
+        if self.busy:
+            self.cpu.request_stop()
+
+    def shutdown(self):
+        self.stop()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _done(self, *args):
+        self.busy = False
@@ -0,0 +1,30 @@
+# utils/config.py
+"""Глобальные настройки эмулятора по умолчанию.
+
+CPU копирует их при создании; на лету меняются командой LIMIT,
+для одного запуска — параметрами G (1000G N=50000 T=2).
+"""
+
+# пределы одного запуска G; 0 — без ограничения
+MAX_STEPS = 100_000         # команд
+MAX_SECONDS = 5.0           # секунд реального времени
+
+# раз в столько команд (степень двойки) цикл G проверяет часы,
+# запрос останова и сообщает о ходе исполнения
+TIME_CHECK_EVERY = 1024
+
+# останавливать запуск, когда полное состояние машины (регистры, PSW,
+# память) повторилось — программа зациклилась (core.loop_detector)
+DETECT_LOOPS = True
+
+# модель времени (core.timing): частота тактов реальной машины, Гц,
+# и печатать ли оценку времени после G / C
+CPU_CLOCK_HZ = 4_000_000
+SHOW_TIMING = True
+
+# суперкоманды (core.fusion) в цикле G; False — строго по одной команде,
+# для сверки с эталонным исполнением
+FUSION = True
+# компиляция линейных участков в функции (core.block_compiler); работает
+# вместе со слиянием, при FUSION = False не используется
+BLOCKS = True
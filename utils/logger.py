@@ -0,0 +1,67 @@
+# utils/logger.py
+"""Трассировка эмулятора по категориям.
+
+Уровень каждой категории хранится атрибутом Tracer (0 — выключена).
+Место вызова проверяет уровень до того, как строить сообщение:
+
+    if tr.mem:
+        tr.emit('mem', f"read {addr:06o} -> {val:06o}")
+
+поэтому выключенная категория стоит одной проверки атрибута —
+без форматирования строк и вызовов функций.
+"""
+
+CATEGORIES = ('fetch', 'mem', 'psw', 'resolve', 'branch')
+
+OFF, ON, VERBOSE = 0, 1, 2
+_LEVEL_NAMES = {'OFF': OFF, 'ON': ON, 'VERBOSE': VERBOSE}
+
+
+def parse_level(level) -> int:
+    if isinstance(level, bool):
+        return ON if level else OFF
+    if isinstance(level, int):
+        lvl = level
+    else:
+        s = str(level).strip().upper()
+        lvl = _LEVEL_NAMES[s] if s in _LEVEL_NAMES else int(s)
+    if not (OFF <= lvl <= VERBOSE):
+        raise ValueError(f"Уровень трассировки должен быть {OFF}..{VERBOSE}")
+    return lvl
+
+
+class Tracer:
+    __slots__ = CATEGORIES + ('sink',)
+
+    def __init__(self, sink=None, **levels):
+        # sink(line) — куда писать строки; по умолчанию stdout
+        self.sink = sink
+        for c in CATEGORIES:
+            setattr(self, c, OFF)
+        for c, lvl in levels.items():
+            self.set_level(c, lvl)
+
+    def set_level(self, category: str, level=ON):
+        cat = category.strip().lower()
+        lvl = parse_level(level)
+        if cat == 'all':
+            targets = CATEGORIES
+        elif cat in CATEGORIES:
+            targets = (cat,)
+        else:
+            raise ValueError(f"Неизвестная категория трассировки: {category}")
+        for c in targets:
+            setattr(self, c, lvl)
+
+    def levels(self) -> dict:
+        return {c: getattr(self, c) for c in CATEGORIES}
+
+    def describe(self) -> str:
+        return " ".join(f"{c}={getattr(self, c)}" for c in CATEGORIES)
+
+    def emit(self, category: str, message: str):
+        line = f"[{category.upper():<7}] {message}"
+        if self.sink is None:
+            print(line)
+        else:
+            self.sink(line)